@@ -0,0 +1,371 @@
+"""
+Runs the performance benchmarks and writes their results as JSON.
+
+The report server is emulated by a local HTTP server and the database is a SQLite file, unless a
+``--database-url`` (e.g. a throwaway local Postgres) is given, so the suite runs anywhere without
+credentials. Secrets come from a generated YAML secrets file.
+
+Run the suite with
+
+    python -m benchmarks.run_benchmarks --output results.json
+
+and compare two versions with
+
+    python -m benchmarks.run_benchmarks --output new.json --baseline old.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import text
+
+from benchmarks.ssrs_emulator import SSRSEmulator
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_VERSION = 1
+
+DEFAULT_ROWS = 100000
+DEFAULT_LATENCY = 0.05  # seconds the emulated report server spends rendering
+DEFAULT_BATCH_SIZES = (100, 1000, 10000)
+DEFAULT_REPEAT = 5
+DEFAULT_REGRESSION_THRESHOLD = 0.2  # a median this much slower than the baseline is a regression
+
+COLUMNS = ('event_id', 'mrn', 'department', 'arrival_time', 'acuity', 'disposition', 'provider', 'notes')
+
+
+def measure(name: str, run: Callable[[], Optional[Dict[str, float]]], repeat: int,
+            parameters: Optional[Dict[str, Any]] = None, setup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """
+    Times a benchmark and measures its peak Python memory.
+
+    The timed runs are made without ``tracemalloc``, which slows allocation-heavy code down
+    considerably; one extra traced run measures the peak memory.
+
+    Args:
+        name (str): The name of the benchmark.
+        run (callable): Performs one run; may return amounts processed, e.g. ``{'rows': 1000}``, which are
+            turned into throughputs.
+        repeat (int): The number of timed runs.
+        parameters (dict, optional): The benchmark parameters, recorded with the result.
+        setup (callable, optional): Called before every run, outside the timing.
+
+    Returns:
+        dict: The result, with the min, median and max seconds, throughputs based on the median and the peak memory.
+    """
+    seconds, amounts = [], {}
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        amounts = run() or {}
+        seconds.append(time.perf_counter() - started)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        run()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(seconds)
+    return {
+        'name': name,
+        'parameters': parameters or {},
+        'runs': repeat,
+        'seconds': {'min': min(seconds), 'median': median, 'max': max(seconds)},
+        'throughput': {f"{unit}_per_second": amount / median for unit, amount in amounts.items() if median > 0},
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+@contextlib.contextmanager
+def stand_in_secrets(directory: str) -> Iterator[str]:
+    """
+    Points the secret manager factory at a generated config.ini and YAML secrets file.
+
+    Args:
+        directory (str): Where the files are written.
+
+    Yields:
+        str: The path of the generated config.ini.
+    """
+    from config_management import factory
+
+    secrets_path = os.path.join(directory, 'secrets.yml')
+    with open(secrets_path, 'w') as file:
+        file.write("ssrs_credentials:\n  domain: BENCH\n  username: benchmark\n  password: benchmark\n")
+    config_path = os.path.join(directory, 'config.ini')
+    with open(config_path, 'w') as file:
+        file.write(f"[General]\nSECRET_MANAGER = YAML\nSECRET_CACHE_TTL = 300\n\n[YAML]\nSECRETS_PATH = {secrets_path}\n")
+
+    original_path = factory.CONFIG_PATH
+    factory.CONFIG_PATH = config_path
+    factory.reset_secret_manager()
+    try:
+        yield config_path
+    finally:
+        factory.reset_secret_manager()
+        factory.CONFIG_PATH = original_path
+
+
+def bench_secret_manager(directory: str, repeat: int) -> List[Dict[str, Any]]:
+    """
+    Measures the cost of resolving the first secret, in process and in a fresh interpreter.
+
+    Args:
+        directory (str): A scratch directory.
+        repeat (int): The number of timed runs.
+
+    Returns:
+        list: The in-process result, where every run starts from a reset factory and config registry,
+            and the cold-process result, which includes importing the factory and the backend.
+    """
+    from config_management import factory
+    from config_management.config_registry import config_registry
+
+    with stand_in_secrets(directory) as config_path:
+        def reset() -> None:
+            factory.reset_secret_manager()
+            config_registry.invalidate()
+
+        def first_secret() -> None:
+            factory.get_secret_manager().get_secret('ssrs_credentials', 'username')
+
+        results = [measure('secret_manager_first_secret', first_secret, repeat, setup=reset)]
+
+        script = ("import time; started = time.perf_counter()\n"
+                  "from config_management import factory\n"
+                  f"factory.CONFIG_PATH = {config_path!r}\n"
+                  "factory.get_secret_manager().get_secret('ssrs_credentials', 'username')\n"
+                  "print(time.perf_counter() - started)\n")
+        seconds = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, '-c', script], cwd=REPOSITORY_ROOT, check=True,
+                                    capture_output=True, text=True).stdout
+            seconds.append(float(output.strip().splitlines()[-1]))
+        results.append({
+            'name': 'secret_manager_cold_process',
+            'parameters': {},
+            'runs': repeat,
+            'seconds': {'min': min(seconds), 'median': statistics.median(seconds), 'max': max(seconds)},
+            'throughput': {},
+            'peak_memory_bytes': None,
+        })
+    return results
+
+
+def bench_ssrs_extract(directory: str, rows: int, latency: float, repeat: int) -> List[Dict[str, Any]]:
+    """
+    Measures ``SSRSExtractor.extract`` downloading a report from the emulated report server.
+
+    Args:
+        directory (str): A scratch directory for the downloaded reports.
+        rows (int): The number of rows in the report.
+        latency (float): The emulated render time in seconds.
+        repeat (int): The number of timed runs.
+
+    Returns:
+        list: One result per output format available in this environment.
+    """
+    from etl.plugins.extractors.ssrs_extractor_plugin.plugin import SSRSExtractor
+    from etl.utilities import columnar_writer
+
+    output_formats = ['csv'] + (['parquet'] if columnar_writer.pa is not None else [])
+    results = []
+    with stand_in_secrets(directory), SSRSEmulator(rows=rows, latency=latency) as emulator:
+        extractor = SSRSExtractor()
+        extractor.BASE_URL = emulator.url
+        extractor.cache = None
+        try:
+            for output_format in output_formats:
+                def extract() -> Dict[str, float]:
+                    extractor.extract('ed_events', output_path=directory, filename=f'ed_events.{output_format}',
+                                      output_format=output_format)
+                    return {'rows': rows, 'bytes': len(emulator.body)}
+
+                results.append(measure('ssrs_extract', extract, repeat,
+                                       {'rows': rows, 'latency': latency, 'output_format': output_format,
+                                        'chunk_size': extractor.chunk_size}))
+        finally:
+            extractor.close()
+    return results
+
+
+def bench_sqlalchemy_load(directory: str, rows: int, batch_sizes: Sequence[int], repeat: int,
+                          database_url: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Measures ``SQLAlchemyLoader.load`` inserting rows in batches of several sizes.
+
+    Args:
+        directory (str): A scratch directory for the SQLite database.
+        rows (int): The number of rows loaded per run.
+        batch_sizes (sequence): The batch sizes to measure.
+        repeat (int): The number of timed runs per batch size.
+        database_url (str, optional): The database to load into; a SQLite file by default. The
+            ``bench_events`` table is dropped and recreated.
+
+    Returns:
+        list: One result per batch size.
+    """
+    from etl.plugins.loaders.sql_alchemy_loader_plugin.plugin import SQLAlchemyLoader
+    from etl.utilities.engine_registry import engine_registry
+
+    database_url = database_url or f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+    data = [(index, f"{index:08d}", f"ED{index % 12}", '2023-09-27 00:00:00', index % 5 + 1, 'Admitted',
+             f"Provider {index % 97}", f"Note for event {index}") for index in range(rows)]
+
+    results = []
+    for batch_size in batch_sizes:
+        loader = SQLAlchemyLoader(database_url, mode='batch', batch_size=batch_size)
+
+        def recreate_table() -> None:
+            with loader.engine.begin() as connection:
+                connection.execute(text("DROP TABLE IF EXISTS bench_events"))
+                connection.execute(text(f"CREATE TABLE bench_events ({', '.join(f'{name} TEXT' for name in COLUMNS)})"))
+
+        def load() -> Dict[str, float]:
+            loader.load(iter(data), table='bench_events', columns=COLUMNS)
+            return {'rows': rows}
+
+        results.append(measure('sqlalchemy_load', load, repeat,
+                               {'rows': rows, 'batch_size': batch_size, 'dialect': loader.engine.dialect.name},
+                               setup=recreate_table))
+        loader.close()
+    engine_registry.dispose(database_url)
+    return results
+
+
+def run_benchmarks(rows: int = DEFAULT_ROWS,
+                   latency: float = DEFAULT_LATENCY,
+                   batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+                   repeat: int = DEFAULT_REPEAT,
+                   database_url: Optional[str] = None,
+                   only: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Runs the benchmark suite.
+
+    Args:
+        rows (int): The number of rows extracted and loaded per run.
+        latency (float): The emulated report render time in seconds.
+        batch_sizes (sequence): The loader batch sizes to measure.
+        repeat (int): The number of timed runs per benchmark.
+        database_url (str, optional): The database to load into; a SQLite file by default.
+        only (sequence, optional): Run only these benchmarks: ``secrets``, ``ssrs`` and/or ``load``.
+
+    Returns:
+        dict: The results, along with the environment they were measured in.
+    """
+    only = set(only or ('secrets', 'ssrs', 'load'))
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix='dsr_benchmarks_') as directory:
+        if 'secrets' in only:
+            results += bench_secret_manager(directory, repeat)
+        if 'ssrs' in only:
+            results += bench_ssrs_extract(directory, rows, latency, repeat)
+        if 'load' in only:
+            results += bench_sqlalchemy_load(directory, rows, batch_sizes, repeat, database_url)
+    return {
+        'version': RESULTS_VERSION,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'environment': environment(),
+        'results': results,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Describes the machine and code version the benchmarks ran on."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPOSITORY_ROOT, check=True,
+                                capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(),
+            'cpu_count': os.cpu_count()}
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    """Identifies a benchmark result across runs by its name and parameters."""
+    return result['name'] + json.dumps(result['parameters'], sort_keys=True)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compares the median times of two result files.
+
+    Args:
+        baseline (dict): The results of the reference version.
+        current (dict): The results of the version under test.
+        threshold (float): The relative slowdown above which a benchmark counts as a regression.
+
+    Returns:
+        list: For every benchmark present in both, its name, parameters, both medians, the relative
+            change (positive is slower) and whether it regressed.
+    """
+    reference = {result_key(result): result for result in baseline['results']}
+    comparisons = []
+    for result in current['results']:
+        previous = reference.get(result_key(result))
+        if previous is None:
+            continue
+        before, after = previous['seconds']['median'], result['seconds']['median']
+        change = (after - before) / before if before > 0 else 0.0
+        comparisons.append({'name': result['name'], 'parameters': result['parameters'], 'baseline_median': before,
+                            'median': after, 'change': change, 'regression': change > threshold})
+    return comparisons
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', help="file the JSON results are written to (default: stdout)")
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help="rows extracted and loaded per run")
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY, help="emulated report render time in seconds")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=list(DEFAULT_BATCH_SIZES), help="loader batch sizes")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="timed runs per benchmark")
+    parser.add_argument('--database-url', help="database to load into instead of a SQLite file")
+    parser.add_argument('--only', nargs='+', choices=('secrets', 'ssrs', 'load'), help="benchmarks to run")
+    parser.add_argument('--baseline', help="earlier results to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.rows, args.latency, args.batch_sizes, args.repeat, args.database_url, args.only)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    for result in results['results']:
+        throughput = ', '.join(f"{value:,.0f} {unit.replace('_', ' ')}" for unit, value in result['throughput'].items())
+        print(f"{result['name']} {json.dumps(result['parameters'], sort_keys=True)}: "
+              f"median {result['seconds']['median']:.4f}s{f' ({throughput})' if throughput else ''}", file=sys.stderr)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as file:
+        comparisons = compare(json.load(file), results, args.threshold)
+    for comparison in comparisons:
+        flag = 'REGRESSION' if comparison['regression'] else 'ok'
+        print(f"{flag:>10} {comparison['name']} {json.dumps(comparison['parameters'], sort_keys=True)}: "
+              f"{comparison['baseline_median']:.4f}s -> {comparison['median']:.4f}s ({comparison['change']:+.1%})",
+              file=sys.stderr)
+    return 1 if any(comparison['regression'] for comparison in comparisons) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""A local HTTP server answering report requests like an SSRS CSV render."""
+
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DEFAULT_ROWS = 100000
+DEFAULT_CHUNK_SIZE = 64 * 1024  # bytes written to the socket at a time
+
+
+def render_csv(rows: int) -> bytes:
+    """
+    Renders a deterministic CSV report resembling an ED events extract.
+
+    Args:
+        rows (int): The number of data rows.
+
+    Returns:
+        bytes: The report, with a UTF-8 byte order mark and a header row like SSRS renders.
+    """
+    lines = ["EventID,MRN,Department,ArrivalTime,Acuity,Disposition,Provider,Notes"]
+    for index in range(rows):
+        lines.append(f"{index},{index * 7919 % 100000000:08d},ED{index % 12},"
+                     f"2023-09-27 {index // 3600 % 24:02d}:{index // 60 % 60:02d}:{index % 60:02d},"
+                     f"{index % 5 + 1},{('Admitted', 'Discharged', 'Transferred')[index % 3]},"
+                     f"Provider {index % 97},\"Note for event {index}, follow-up {index % 4}\"")
+    return '\ufeff'.encode('utf-8') + '\r\n'.join(lines).encode('utf-8') + b'\r\n'
+
+
+class SSRSEmulator:
+    """
+    Serves the same CSV render for every report URL, after a configurable render delay.
+
+    The server runs on a background thread and needs no authentication, so ``requests_ntlm``
+    sends plain requests to it; NTLM handshakes are therefore not part of what it measures.
+
+    Attributes:
+        rows (int): The number of data rows in every render.
+        latency (float): Seconds waited before answering, standing in for the report rendering.
+        chunk_size (int): Bytes written to the socket at a time.
+        requests (int): The number of reports served so far.
+    """
+
+    def __init__(self, rows: int = DEFAULT_ROWS, latency: float = 0.0, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 host: str = '127.0.0.1', port: int = 0) -> None:
+        self.rows = rows
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.body = render_csv(rows)
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """The ``ReportServer`` URL to configure the extractor with."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/ReportServer"
+
+    def _handler(self):
+        emulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep connections alive like IIS does
+
+            def do_GET(self):
+                emulator.requests += 1
+                if emulator.latency:
+                    time.sleep(emulator.latency)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/csv; charset=utf-8')
+                self.send_header('Content-Length', str(len(emulator.body)))
+                self.end_headers()
+                view = memoryview(emulator.body)
+                for start in range(0, len(view), emulator.chunk_size):
+                    self.wfile.write(view[start:start + emulator.chunk_size])
+
+            def log_message(self, format, *args):
+                pass  # keep benchmark output clean
+
+        return Handler
+
+    def start(self) -> 'SSRSEmulator':
+        """Starts serving on the background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='ssrs-emulator', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the server and closes its socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'SSRSEmulator':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
@@ -1,6 +1,7 @@
 """Module defining an abstract base class for secret management."""
 
 from abc import ABC, abstractmethod
+from typing import Dict
 
 
 class AbstractSecretManager(ABC):
@@ -40,3 +41,20 @@ class AbstractSecretManager(ABC):
                 by a concrete subclass.
         """
         pass
+
+    def get_secrets(self, section: str) -> Dict[str, str]:
+        """Retrieve every key of a section (or structured secret) in one call.
+
+        Managers that can return several keys per round trip override this,
+        which lets ``CachedSecretManager`` batch lookups of the same section.
+
+        Args:
+            section (str): The section or secret holding the keys.
+
+        Returns:
+            dict: The keys of the section and their values.
+
+        Raises:
+            NotImplementedError: If the manager cannot fetch a whole section.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support fetching a whole section.")
@@ -1,14 +1,31 @@
-import boto3
+import json
+from typing import Dict, Optional
+
 from .abstract_manager import AbstractSecretManager
 
 class AWSSecretManager(AbstractSecretManager):
     """AWS-specific implementation of the secret manager using AWS Secrets Manager service."""
     
     def __init__(self, region_name="us-west-2"):
+        # Imported here so that selecting another backend never pays for loading boto3
+        import boto3
         self.client = boto3.client('secretsmanager', region_name=region_name)
 
-    def get_secret(self, key: str) -> str:
-        """Retrieve a secret value from AWS Secrets Manager associated with a given key."""
+    def get_secret(self, key: str, field: Optional[str] = None) -> str:
+        """Retrieve a secret value from AWS Secrets Manager associated with a given key.
+
+        Args:
+            key (str): The name or ARN of the secret.
+            field (str, optional): For secrets stored as a JSON object, the field to return.
+
+        Returns:
+            str: The secret string, or the value of ``field`` within it.
+        """
+        if field is not None:
+            secrets = self.get_secrets(key)
+            if field not in secrets:
+                raise ValueError(f"Field '{field}' not found in secret '{key}'.")
+            return secrets[field]
         try:
             response = self.client.get_secret_value(SecretId=key)
             if 'SecretString' in response:
@@ -18,6 +35,27 @@ class AWSSecretManager(AbstractSecretManager):
             # Handle exceptions, possibly re-raise or log them
             raise e
 
+    def get_secrets(self, key: str) -> Dict[str, str]:
+        """Retrieve every field of a secret stored as a JSON object with one API call.
+
+        Args:
+            key (str): The name or ARN of the secret.
+
+        Returns:
+            dict: The fields of the secret and their values.
+
+        Raises:
+            ValueError: If the secret is not a JSON object.
+        """
+        secret = self.get_secret(key)
+        try:
+            secrets = json.loads(secret)
+        except (TypeError, ValueError):
+            secrets = None
+        if not isinstance(secrets, dict):
+            raise ValueError(f"Secret '{key}' is not a JSON object.")
+        return secrets
+
     def set_secret(self, key: str, value: str) -> None:
         """Set a secret value in AWS Secrets Manager for a given key."""
         try:
@@ -0,0 +1,178 @@
+"""Module providing a caching wrapper around any secret manager."""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config_management.abstract_manager import AbstractSecretManager
+
+DEFAULT_SECRET_TTL = 300.0  # seconds a fetched secret is served from memory
+
+
+class CachedSecretManager(AbstractSecretManager):
+    """
+    Wraps a secret manager and serves repeated lookups from memory.
+
+    Secrets are cached per lookup key (the positional arguments of ``get_secret``) and expire
+    ``ttl`` seconds after they were fetched. When the wrapped manager can return a whole section
+    at once (see ``AbstractSecretManager.get_secrets``), a miss on ``(section, key)`` fetches and
+    caches every key of the section in one call, so e.g. the domain, username and password of a
+    JSON secret in AWS Secrets Manager cost a single round trip.
+
+    Rotated credentials are picked up when their entry expires, or immediately through
+    ``refresh`` once a downstream system rejected them. If a refresh fails, an expired value is
+    still served for up to ``stale_if_error`` seconds, so a throttled or briefly unreachable
+    secret store does not fail every worker at once.
+
+    Attributes:
+        manager (AbstractSecretManager): The wrapped secret manager.
+        ttl (float): Seconds for which a fetched secret is served.
+        stale_if_error (float): Seconds past expiry for which a secret is served when refreshing it fails.
+    """
+
+    def __init__(self,
+                 manager: AbstractSecretManager,
+                 ttl: float = DEFAULT_SECRET_TTL,
+                 stale_if_error: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.manager = manager
+        self.ttl = ttl
+        self.stale_if_error = stale_if_error
+        self._clock = clock
+        self._entries: Dict[Tuple, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self._batch_supported = True
+        self._stats = {'hits': 0, 'misses': 0, 'fetches': 0, 'stale': 0}
+
+    def get_secret(self, *key: str) -> Any:
+        """
+        Returns a secret, fetching it from the wrapped manager on a miss or after expiry.
+
+        Args:
+            *key (str): The lookup arguments of the wrapped manager, e.g. ``section, key``.
+
+        Returns:
+            The secret value.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry[1]:
+                self._stats['hits'] += 1
+                return entry[0]
+            self._stats['misses'] += 1
+            key_lock = self._key_locks.setdefault(key[:1] if len(key) == 2 else key, threading.Lock())
+
+        # Only one thread fetches a given secret (or section); the others wait and reuse its result
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and self._clock() < entry[1]:
+                    return entry[0]
+            try:
+                return self._fetch(key)
+            except Exception:
+                if entry is not None and self._clock() < entry[1] + self.stale_if_error:
+                    logging.warning(f"Refreshing secret {key[0]!r} failed, serving the cached value.", exc_info=True)
+                    with self._lock:
+                        self._stats['stale'] += 1
+                    return entry[0]
+                raise
+
+    def get_secrets(self, section: str) -> Dict[str, Any]:
+        """
+        Returns every key of a section, fetching the section in one call where the wrapped manager allows.
+
+        Args:
+            section (str): The section (or JSON secret) to return.
+
+        Returns:
+            dict: The keys of the section and their values.
+        """
+        secrets = self.manager.get_secrets(section)
+        self._store({(section, name): value for name, value in secrets.items()})
+        return dict(secrets)
+
+    def _fetch(self, key: Tuple) -> Any:
+        """Fetches ``key`` from the wrapped manager, together with the rest of its section if possible."""
+        if len(key) == 2 and self._batch_supported:
+            section, name = key
+            try:
+                secrets = self.manager.get_secrets(section)
+            except NotImplementedError:
+                self._batch_supported = False
+            else:
+                self._store({(section, field): value for field, value in secrets.items()})
+                if name not in secrets:
+                    raise ValueError(f"Key '{name}' not found in secret '{section}'.")
+                return secrets[name]
+
+        value = self.manager.get_secret(*key)
+        self._store({key: value})
+        return value
+
+    def _store(self, values: Dict[Tuple, Any]) -> None:
+        expires_at = self._clock() + self.ttl
+        with self._lock:
+            self._stats['fetches'] += 1
+            for key, value in values.items():
+                self._entries[key] = (value, expires_at)
+
+    def set_secret(self, *args: str) -> None:
+        """
+        Sets a secret through the wrapped manager and drops the cached value.
+
+        Args:
+            *args (str): The arguments of the wrapped manager's ``set_secret``, ending with the value.
+        """
+        self.manager.set_secret(*args)
+        self.invalidate(*args[:-1])
+
+    def invalidate(self, *key: str) -> None:
+        """
+        Drops cached secrets so the next lookup fetches them again.
+
+        Args:
+            *key (str): The lookup arguments of one secret, or a section name to drop all of its
+                keys. Without arguments the whole cache is cleared.
+        """
+        with self._lock:
+            if not key:
+                self._entries.clear()
+                return
+            for cached in list(self._entries):
+                if cached[:len(key)] == key:
+                    del self._entries[cached]
+
+    def refresh(self, *key: str) -> bool:
+        """
+        Fetches a secret again right away, e.g. after the system it unlocks rejected it as rotated.
+
+        Args:
+            *key (str): The lookup arguments of the secret.
+
+        Returns:
+            bool: True if the secret changed since it was cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            # Expire the entry instead of dropping it, so ``stale_if_error`` still applies
+            if entry is not None:
+                self._entries[key] = (entry[0], self._clock())
+        value = self.get_secret(*key)
+        return entry is None or value != entry[0]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns hit/miss counters and the hit ratio since the cache was created.
+
+        Returns:
+            dict: The ``hits``, ``misses``, ``fetches``, ``stale`` and ``hit_ratio`` of the cache.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
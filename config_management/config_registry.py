@@ -0,0 +1,134 @@
+"""Process-wide cache of parsed INI and YAML configuration files."""
+
+import os
+import logging
+import threading
+import configparser
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import yaml
+
+
+class ConfigRegistry:
+    """
+    Parses each configuration file once and hands out the parsed document on every later load.
+
+    Entries are keyed on the absolute path (and the parser options), and remember the file's
+    modification time, inode and size. Each load costs a single ``os.stat``; the file is parsed
+    again only when one of those changed, e.g. because it was edited or atomically replaced.
+
+    The returned documents are shared by every caller that loads the same file, so they must be
+    treated as read-only; copy them before modifying.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[Hashable, Tuple[Optional[Tuple[int, int, int]], Any]] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'loads': 0}
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+    def _get(self, key: Hashable, path: str, parse) -> Any:
+        signature = self._signature(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._stats['hits'] += 1
+                return entry[1]
+
+        logging.debug(f"Reading configuration from: {path}")
+        document = parse()
+        with self._lock:
+            self._stats['loads'] += 1
+            self._entries[key] = (signature, document)
+        return document
+
+    def load_ini(self, path: str, interpolation: bool = True) -> configparser.ConfigParser:
+        """
+        Returns a parsed INI file.
+
+        Like ``ConfigParser.read``, a missing file yields an empty parser; it is read as soon as it
+        appears.
+
+        Args:
+            path (str): The path of the INI file.
+            interpolation (bool): Whether ``%(name)s`` references are expanded; disable it for files
+                holding raw values such as passwords.
+
+        Returns:
+            configparser.ConfigParser: The parsed file.
+        """
+        path = os.path.abspath(path)
+
+        def parse() -> configparser.ConfigParser:
+            config = configparser.ConfigParser() if interpolation else configparser.ConfigParser(interpolation=None)
+            config.read(path)
+            return config
+
+        return self._get(('ini', path, interpolation), path, parse)
+
+    def load_yaml(self, path: str) -> Any:
+        """
+        Returns a parsed YAML file.
+
+        Args:
+            path (str): The path of the YAML file.
+
+        Returns:
+            The parsed document.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        path = os.path.abspath(path)
+
+        def parse() -> Any:
+            with open(path, 'r') as file:
+                return yaml.safe_load(file)
+
+        return self._get(('yaml', path), path, parse)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """
+        Drops cached documents so they are parsed again on the next load.
+
+        Args:
+            path (str, optional): The file to drop. Without it, every file is dropped.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            path = os.path.abspath(path)
+            for key in [key for key in self._entries if key[1] == path]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns how often documents were served from the registry and how often files were parsed.
+
+        Returns:
+            dict: The ``hits`` and ``loads`` of the registry.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+# The registry shared by every module in the process
+config_registry = ConfigRegistry()
+
+
+def load_ini(path: str, interpolation: bool = True) -> configparser.ConfigParser:
+    """Returns a parsed INI file from the process-wide registry, see ``ConfigRegistry.load_ini``."""
+    return config_registry.load_ini(path, interpolation=interpolation)
+
+
+def load_yaml(path: str) -> Any:
+    """Returns a parsed YAML file from the process-wide registry, see ``ConfigRegistry.load_yaml``."""
+    return config_registry.load_yaml(path)
@@ -1,8 +1,12 @@
+import threading
 import configparser
 from pathlib import Path
-from abc import ABC, abstractmethod
 from importlib import import_module
-from typing import Type, Dict
+from typing import Type, Dict, Optional
+
+from config_management.abstract_manager import AbstractSecretManager
+from config_management.config_registry import config_registry
+from config_management.cached_manager import CachedSecretManager, DEFAULT_SECRET_TTL
 
 # --- Mapping for Dynamic Imports ---
 
@@ -14,48 +18,45 @@ manager_module_map = {
         'INI': ('config_management.ini_manager', 'INISecretManager')
     }
 
+CONFIG_PATH = Path(__file__).parent.parent / 'config.ini'
+
+# The process-wide secret manager, created on first use by get_secret_manager()
+_secret_manager: Optional[AbstractSecretManager] = None
+_secret_manager_lock = threading.Lock()
+
 
 # --- Configuration Loading ---
 
+def read_config() -> configparser.ConfigParser:
+    """Return the parsed config.ini, re-reading the file only after it changed."""
+    return config_registry.load_ini(str(CONFIG_PATH))
+
+
 def load_configuration() -> str:
     """Load and return the SECRET_MANAGER value from the configuration file."""
-    config = configparser.ConfigParser()
-    config_path = Path(__file__).parent.parent / 'config.ini'
-    print(f"Reading configuration from: {config_path}")
-    config.read(str(config_path))
+    config = read_config()
 
     try:
         manager = config['General']['SECRET_MANAGER']
     except KeyError:
         raise ValueError("SECRET_MANAGER is not defined in the config.ini file.")
-    
+
     if manager not in manager_module_map.keys():
         supported_managers = ', '.join(manager_module_map.keys())
         raise ValueError(f"Unsupported SECRET_MANAGER value: {manager}. Supported values are: {supported_managers}")
-    
-    return manager
-
 
-# --- Abstract Base Class ---
-
-class AbstractSecretManager(ABC):
-    """Abstract base class that defines methods for managing secrets."""
-
-    @abstractmethod
-    def get_secret(self, key: str) -> str:
-        """Retrieve secret for a given key."""
-        pass
-
-    @abstractmethod
-    def set_secret(self, key: str, value: str):
-        """Set a secret for a given key."""
-        pass
+    return manager
 
 
 # --- Factory Function ---
 
 def get_secret_manager() -> AbstractSecretManager:
-    """Return an instance of the secret manager based on the configuration.
+    """Return the process-wide secret manager, creating it on the first call.
+
+    The configuration is read and the backend module imported only when a secret is first
+    needed, so importing modules that use secrets stays cheap. Every later call returns the
+    same instance. The manager is wrapped in a ``CachedSecretManager`` unless
+    ``SECRET_CACHE_TTL`` in the ``[General]`` section is set to 0.
 
     Returns:
         AbstractSecretManager: An instance of a concrete secret manager implementation.
@@ -63,16 +64,38 @@ def get_secret_manager() -> AbstractSecretManager:
     Raises:
         ValueError: If the specified secret manager in the configuration is not supported.
     """
+    global _secret_manager
+    if _secret_manager is None:
+        with _secret_manager_lock:
+            if _secret_manager is None:
+                _secret_manager = _create_secret_manager()
+    return _secret_manager
+
+
+def _create_secret_manager() -> AbstractSecretManager:
     SECRET_MANAGER = load_configuration()
 
     module_name, class_name = manager_module_map[SECRET_MANAGER]
     ManagerClass = getattr(import_module(module_name), class_name)
 
+    local_config = read_config()
     if SECRET_MANAGER == "YAML":
-        # Initialize a ConfigParser object
-        local_config = configparser.ConfigParser()
-        config_path = Path(__file__).parent.parent / 'config.ini'  # Assuming factory.py is still in 'config_management' directory
-        local_config.read(str(config_path))
         secrets_path = local_config['YAML']['SECRETS_PATH']
-        return ManagerClass(filepath=secrets_path)
-    return ManagerClass()
+        manager = ManagerClass(filepath=secrets_path)
+    else:
+        manager = ManagerClass()
+
+    # Serve repeated lookups from memory; a TTL of 0 disables the cache
+    ttl = local_config.getfloat('General', 'SECRET_CACHE_TTL', fallback=DEFAULT_SECRET_TTL)
+    if ttl <= 0:
+        return manager
+    stale_if_error = local_config.getfloat('General', 'SECRET_CACHE_STALE_IF_ERROR', fallback=0.0)
+    return CachedSecretManager(manager, ttl=ttl, stale_if_error=stale_if_error)
+
+
+def reset_secret_manager() -> None:
+    """Forget the secret manager and parsed configuration, so the next call re-reads config.ini."""
+    global _secret_manager
+    with _secret_manager_lock:
+        _secret_manager = None
+        config_registry.invalidate(str(CONFIG_PATH))
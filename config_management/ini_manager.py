@@ -1,5 +1,6 @@
-import configparser
+import copy
 from config_management.abstract_manager import AbstractSecretManager
+from config_management.config_registry import config_registry, load_ini
 
 class INISecretManager(AbstractSecretManager):
     """
@@ -11,8 +12,7 @@ class INISecretManager(AbstractSecretManager):
 
     def __init__(self) -> None:
         """Initialize the INI Secret Manager."""
-        self.config = configparser.ConfigParser()
-        self.config.read('../secrets.ini')
+        self.config = load_ini('../secrets.ini')
 
     def get_secret(self, key: str) -> str:
         """
@@ -40,8 +40,12 @@ class INISecretManager(AbstractSecretManager):
             key (str): The key for which the secret should be set.
             value (str): The secret value to be set.
         """
-        if 'Secrets' not in self.config:
-            self.config['Secrets'] = {}
-        self.config['Secrets'][key] = value
+        # The loaded parser is shared through the config registry, so change a copy of it
+        config = copy.deepcopy(self.config)
+        if 'Secrets' not in config:
+            config['Secrets'] = {}
+        config['Secrets'][key] = value
         with open('../secrets.ini', 'w') as configfile:
-            self.config.write(configfile)
+            config.write(configfile)
+        self.config = config
+        config_registry.invalidate('../secrets.ini')
@@ -1,5 +1,7 @@
+import copy
 import yaml
 from config_management.abstract_manager import AbstractSecretManager
+from config_management.config_registry import config_registry, load_yaml
 
 class YAMLSecretManager(AbstractSecretManager):
     """
@@ -12,8 +14,7 @@ class YAMLSecretManager(AbstractSecretManager):
     def __init__(self, filepath: str) -> None:
         """Initialize the YAML Secret Manager."""
         self.filepath = filepath
-        with open(self.filepath, 'r') as file:
-            self.config = yaml.safe_load(file)
+        self.config = load_yaml(self.filepath)
 
     def get_secret(self, section: str, key: str) -> str:
         """
@@ -34,6 +35,24 @@ class YAMLSecretManager(AbstractSecretManager):
         except KeyError:
             raise ValueError(f"Section '{section}' or Key '{key}' not found in {self.filepath}.")
 
+    def get_secrets(self, section: str) -> dict:
+        """
+        Retrieve every key and value of a section.
+
+        Args:
+            section (str): The section in the YAML file.
+
+        Returns:
+            dict: The keys of the section and their values.
+
+        Raises:
+            ValueError: If the section is not found in the file.
+        """
+        try:
+            return dict(self.config[section])
+        except (KeyError, TypeError):
+            raise ValueError(f"Section '{section}' not found in {self.filepath}.")
+
     def set_secret(self, section: str, key: str, value: str) -> None:
         """
         Set a value for a given section and key in the YAML file.
@@ -43,8 +62,12 @@ class YAMLSecretManager(AbstractSecretManager):
             key (str): The key for which the value should be set.
             value (str): The value to be set.
         """
-        if section not in self.config:
-            self.config[section] = {}
-        self.config[section][key] = value
+        # The loaded document is shared through the config registry, so change a copy of it
+        config = copy.deepcopy(self.config) if self.config is not None else {}
+        if section not in config:
+            config[section] = {}
+        config[section][key] = value
         with open(self.filepath, 'w') as file:
-            yaml.safe_dump(self.config, file)
+            yaml.safe_dump(config, file)
+        self.config = config
+        config_registry.invalidate(self.filepath)
@@ -1,7 +1,19 @@
 from abc import ABC, abstractmethod
 
+from etl.utilities.metrics import instrument
+from etl.utilities.profiling import profile
+from etl.utilities.watermark_store import WatermarkStore
+
 class BaseExtractor(ABC):
 
+    def __init_subclass__(cls, **kwargs):
+        """Records timings and counters of every extractor's connect, extract and extract_batches calls (and of their
+        asynchronous aextract and aextract_batches counterparts), and profiles them on demand."""
+        super().__init_subclass__(**kwargs)
+        for method_name in ('connect', 'extract', 'extract_batches', 'aextract', 'aextract_batches'):
+            instrument(cls, method_name)
+            profile(cls, method_name)
+
     @abstractmethod
     def connect(self):
         """Establish a connection to the data source."""
@@ -17,20 +29,46 @@ class BaseExtractor(ABC):
         """Extract data from the source."""
         pass
 
+    def extract_batches(self, batch_size=10000, **kwargs):
+        """Extract data from the source as an iterator of record batches, for streaming pipelines."""
+        raise NotImplementedError(f"{type(self).__name__} does not support batch extraction.")
+
     @abstractmethod
     def preview(self, n=5):
         """Preview a subset of the data (default: first 5 records)."""
         pass
 
-    @abstractmethod
-    def set_extraction_point(self, point):
-        """Sets a starting point for incremental extraction."""
-        pass
+    def set_extraction_point(self, point, source='default'):
+        """Sets a starting point for incremental extraction, persisted in the watermark store."""
+        self.get_watermark_store().set(type(self).__name__, source, point)
 
-    @abstractmethod
-    def get_last_extraction_point(self):
-        """Retrieves the last extraction point."""
-        pass
+    def get_last_extraction_point(self, source='default'):
+        """Retrieves the last extraction point, or None if nothing has been extracted yet."""
+        return self.get_watermark_store().get(type(self).__name__, source)
+
+    def defer_extraction_point(self, point, source='default'):
+        """Holds an extraction point back until the data extracted up to it has been loaded, see commit_extraction_points."""
+        if getattr(self, 'pending_extraction_points', None) is None:
+            self.pending_extraction_points = {}
+        self.pending_extraction_points[source] = point
+
+    def commit_extraction_points(self):
+        """Persists the deferred extraction points; call once every batch extracted has been loaded."""
+        pending = getattr(self, 'pending_extraction_points', None) or {}
+        while pending:
+            source, point = next(iter(pending.items()))
+            self.set_extraction_point(point, source)
+            del pending[source]
+
+    def discard_extraction_points(self):
+        """Drops the deferred extraction points, e.g. because loading the extracted batches failed."""
+        self.pending_extraction_points = {}
+
+    def get_watermark_store(self):
+        """Returns the store holding this extractor's extraction points, creating the default one if needed."""
+        if getattr(self, 'watermark_store', None) is None:
+            self.watermark_store = WatermarkStore()
+        return self.watermark_store
 
     @abstractmethod
     def set_query(self, query):
@@ -1,7 +1,17 @@
 from abc import ABC, abstractmethod
 
+from etl.utilities.metrics import instrument
+from etl.utilities.profiling import profile
+
 class BaseLoader(ABC):
 
+    def __init_subclass__(cls, **kwargs):
+        """Records timings and counters of every loader's connect and load calls, and profiles them on demand."""
+        super().__init_subclass__(**kwargs)
+        for method_name in ('connect', 'load'):
+            instrument(cls, method_name)
+            profile(cls, method_name)
+
     @abstractmethod
     def connect(self):
         """Establish a connection to the destination."""
@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+
+class BaseTransformer(ABC):
+
+    @abstractmethod
+    def transform(self, batch):
+        """Transform one record batch; returns the transformed batch, or None to drop it."""
+        pass
+
+    def transform_batches(self, batches):
+        """Transform an iterator of record batches, skipping the batches that were dropped."""
+        for batch in batches:
+            batch = self.transform(batch)
+            if batch is not None:
+                yield batch
+
+    def get_metadata(self):
+        """Retrieves metadata about the transformed data."""
+        return {}
+
+    def __call__(self, batch):
+        return self.transform(batch)
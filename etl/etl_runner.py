@@ -0,0 +1,348 @@
+"""Streaming extract -> transform -> load pipeline runner."""
+
+import os
+import time
+import queue
+import logging
+import threading
+import collections
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from etl.base.base_extractor import BaseExtractor
+from etl.base.base_loader import BaseLoader
+from etl.utilities import arrow_batches
+from etl.utilities.arrow_batches import to_arrow, from_arrow, serialize_table, deserialize_table
+
+DEFAULT_QUEUE_SIZE = 4  # batches buffered between two consecutive stages
+
+_END = object()  # marks the end of the batch stream on a queue
+
+_worker_transform: Any = None  # the transform of a ProcessPoolStage, set once in every worker process
+
+
+def _default_mp_context() -> Any:
+    # Forking copies the pipeline's other threads' locks (and pyarrow's thread pools) in whatever state they are in
+    return multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+class PipelineError(Exception):
+    """Exception raised when a pipeline stage fails; the original error is chained as its cause."""
+
+
+def _init_worker(transform: Any) -> None:
+    global _worker_transform
+    _worker_transform = transform
+
+
+def _encode(batch: Any) -> Tuple[Optional[str], Any]:
+    # Tabular batches cross the process boundary as Arrow IPC buffers, anything else is pickled
+    if arrow_batches.pa is not None:
+        try:
+            table, kind = to_arrow(batch)
+        except TypeError:
+            return None, batch
+        return kind, serialize_table(table)
+    return None, batch
+
+
+def _decode(payload: Tuple[Optional[str], Any]) -> Any:
+    kind, data = payload
+    return data if kind is None else from_arrow(deserialize_table(data), kind)
+
+
+def _transform_in_worker(payload: Tuple[Optional[str], Any]) -> Tuple[Optional[Tuple[Optional[str], Any]], float]:
+    started = time.perf_counter()
+    kind, data = payload
+    if kind is not None and hasattr(_worker_transform, 'transform_table'):
+        # Arrow transformers work on the table itself, sparing the round trip through the original kind
+        result = _worker_transform.transform_table(deserialize_table(data))
+        encoded = (kind, serialize_table(result)) if result is not None else None
+    else:
+        apply = _worker_transform.transform if hasattr(_worker_transform, 'transform') else _worker_transform
+        result = apply(_decode(payload))
+        encoded = _encode(result) if result is not None else None
+    return encoded, time.perf_counter() - started
+
+
+class ProcessPoolStage:
+    """
+    Runs a CPU-bound transform stage on a pool of worker processes, side-stepping the GIL.
+
+    Wrap a transform in a ``ProcessPoolStage`` and pass it to ``PipelineRunner`` like any other
+    transform. Batches are handed to the workers round-robin, at most ``max_in_flight`` at a time,
+    and the results come back in input order when ``ordered`` is set, or as soon as they are ready
+    otherwise.
+
+    Tabular batches (row dicts, Arrow, pandas or column mappings) travel between processes as Arrow
+    IPC buffers, which are written and mapped column by column instead of pickling every row. An
+    Arrow transformer receives the Arrow table directly; any other transform receives the batch in
+    its original kind. Other batches, such as the paths of files to parse, are pickled as they are,
+    so an extractor yielding file paths shards whole files across the workers.
+
+    The transform is pickled once into every worker, so it must be picklable (a module-level
+    function or object). Each worker holds its own copy, so state kept by the transform (e.g.
+    ``Deduplicate(across_batches=True)``) only covers the batches that worker saw.
+
+    Workers are started with the ``forkserver`` method (``spawn`` where it is unavailable) unless
+    ``mp_context`` says otherwise: the pool is created while the pipeline's other threads, and
+    pyarrow's thread pools, are running, and a worker forked from such a process can deadlock.
+
+    Attributes:
+        transform: The transform run in the workers.
+        max_workers (int): The number of worker processes.
+        ordered (bool): Whether results keep the order of the incoming batches.
+        max_in_flight (int): The number of batches submitted but not yet collected.
+        stats (dict): The number of ``batches`` transformed and the ``worker_seconds`` spent on them in the last run.
+    """
+
+    def __init__(self,
+                 transform: Union[Callable[[Any], Any], Any],
+                 max_workers: Optional[int] = None,
+                 ordered: bool = True,
+                 max_in_flight: Optional[int] = None,
+                 mp_context: Any = None) -> None:
+        self.transform = transform
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.ordered = ordered
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        if self.max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1.")
+        self.mp_context = mp_context or _default_mp_context()
+        self.stats: Dict[str, Any] = {'batches': 0, 'worker_seconds': 0.0}
+        self.__name__ = f"process_pool({getattr(transform, '__name__', None) or type(transform).__name__})"
+
+    def map(self, batches: Iterable[Any]) -> Iterator[Any]:
+        """
+        Transforms batches on the worker processes.
+
+        Args:
+            batches (Iterable): The incoming batches; they are consumed only as fast as workers free up.
+
+        Yields:
+            The transformed batches; batches the transform dropped are skipped.
+
+        Raises:
+            Exception: The first error raised by the transform in a worker.
+        """
+        self.stats = {'batches': 0, 'worker_seconds': 0.0}
+        executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self.mp_context,
+                                       initializer=_init_worker, initargs=(self.transform,))
+        pending: Deque[Any] = collections.deque()
+        try:
+            for batch in batches:
+                pending.append(executor.submit(_transform_in_worker, _encode(batch)))
+                # Hand on whatever is finished already, and wait only while the window is full
+                while pending and (len(pending) >= self.max_in_flight or self.__ready(pending)):
+                    result = self.__collect(pending)
+                    if result is not None:
+                        yield result
+            while pending:
+                result = self.__collect(pending)
+                if result is not None:
+                    yield result
+        finally:
+            # Drop queued batches if the consumer stopped early or a worker failed
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def __ready(self, pending: Deque[Any]) -> bool:
+        if self.ordered:
+            return pending[0].done()
+        return any(future.done() for future in pending)
+
+    def __collect(self, pending: Deque[Any]) -> Any:
+        if self.ordered:
+            future = pending[0]
+        else:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            future = next(future for future in pending if future in done)
+        pending.remove(future)
+        encoded, seconds = future.result()
+        self.stats['batches'] += 1
+        self.stats['worker_seconds'] += seconds
+        return _decode(encoded) if encoded is not None else None
+
+
+class PipelineRunner:
+    """
+    Streams record batches from an extractor through transform stages into a loader.
+
+    Every stage runs in its own thread and hands batches to the next one over a bounded queue. A
+    stage that gets ahead blocks once the queue in front of it is full, so at most ``queue_size``
+    batches wait between two stages and memory use is bounded by the queue depth and batch size
+    rather than by the size of the dataset, while the network download, the transforms and the
+    database inserts overlap in time.
+
+    The extractor's deferred extraction points (see ``BaseExtractor.defer_extraction_point``) are
+    committed only after the last batch has been loaded, and dropped if any stage fails.
+
+    Batches are passed through untouched, so any batch type works as long as the transforms and the
+    loader agree on it. Transforms are callables taking a batch and returning the transformed batch
+    (or None to drop it), or objects with such a ``transform`` method. Wrap CPU-bound transforms in a
+    ``ProcessPoolStage`` to spread their batches over several processes.
+
+    Attributes:
+        extractor (BaseExtractor): The source; its ``extract_batches`` method produces the batches.
+        loader (BaseLoader): The destination; ``load`` is called once per batch.
+        transforms (list): The transform stages, applied in order.
+        queue_size (int): The number of batches buffered between two stages.
+    """
+
+    def __init__(self,
+                 extractor: BaseExtractor,
+                 loader: BaseLoader,
+                 transforms: Sequence[Union[Callable[[Any], Any], Any]] = (),
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 extract_options: Optional[Dict[str, Any]] = None,
+                 load_options: Optional[Dict[str, Any]] = None) -> None:
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1.")
+        self.extractor = extractor
+        self.loader = loader
+        self.transforms = list(transforms)
+        self.queue_size = queue_size
+        self.extract_options = extract_options or {}
+        self.load_options = load_options or {}
+        self.stats: Dict[str, Any] = {}
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Runs the pipeline until the extractor is exhausted or a stage fails.
+
+        Returns:
+            dict: The number of batches extracted and loaded, the wall-clock seconds and the seconds
+                each stage spent working (as opposed to waiting on its queues).
+
+        Raises:
+            PipelineError: If any stage raised; the remaining stages are stopped.
+        """
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        stage_names = ['extract'] + [self._stage_name(index, transform) for index, transform in enumerate(self.transforms)] + ['load']
+        busy = {name: 0.0 for name in stage_names}
+        counts = {'extracted': 0, 'loaded': 0}
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.transforms) + 1)]
+
+        def put(target: queue.Queue, item: Any) -> bool:
+            # Wait for room, but give up as soon as another stage failed
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(source: queue.Queue) -> Any:
+            while not stop.is_set():
+                try:
+                    return source.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _END
+
+        def fail(error: BaseException) -> None:
+            errors.append(error)
+            stop.set()
+
+        def extract_stage() -> None:
+            batches = None
+            try:
+                batches = iter(self.extractor.extract_batches(**self.extract_options))
+                while True:
+                    started = time.monotonic()
+                    batch = next(batches, _END)
+                    busy['extract'] += time.monotonic() - started
+                    if batch is _END or not put(queues[0], batch):
+                        break
+                    counts['extracted'] += 1
+            except BaseException as error:
+                fail(error)
+            finally:
+                # Release the source (e.g. an open HTTP response) if the pipeline stopped early
+                if hasattr(batches, 'close'):
+                    batches.close()
+                put(queues[0], _END)
+
+        def transform_stage(index: int, transform: Any) -> None:
+            name = stage_names[index + 1]
+            if isinstance(transform, ProcessPoolStage):
+                return process_pool_stage(index, transform)
+            apply = transform.transform if hasattr(transform, 'transform') else transform
+            try:
+                while True:
+                    batch = get(queues[index])
+                    if batch is _END:
+                        break
+                    started = time.monotonic()
+                    batch = apply(batch)
+                    busy[name] += time.monotonic() - started
+                    if batch is not None and not put(queues[index + 1], batch):
+                        break
+            except BaseException as error:
+                fail(error)
+            finally:
+                put(queues[index + 1], _END)
+
+        def process_pool_stage(index: int, stage: ProcessPoolStage) -> None:
+            results = stage.map(iter(lambda: get(queues[index]), _END))
+            try:
+                for batch in results:
+                    if not put(queues[index + 1], batch):
+                        break
+            except BaseException as error:
+                fail(error)
+            finally:
+                results.close()
+                # The workers run in parallel, so their combined time can exceed the wall-clock time
+                busy[stage_names[index + 1]] = stage.stats['worker_seconds']
+                put(queues[index + 1], _END)
+
+        threads = [threading.Thread(target=extract_stage, name='pipeline-extract', daemon=True)]
+        threads += [threading.Thread(target=transform_stage, args=(index, transform), name=f'pipeline-{stage_names[index + 1]}', daemon=True)
+                    for index, transform in enumerate(self.transforms)]
+
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+
+        # The loader runs on the calling thread, draining the last queue
+        try:
+            while True:
+                batch = get(queues[-1])
+                if batch is _END:
+                    break
+                load_started = time.monotonic()
+                self.loader.load(batch, **self.load_options)
+                busy['load'] += time.monotonic() - load_started
+                counts['loaded'] += 1
+        except BaseException as error:
+            fail(error)
+        finally:
+            for thread in threads:
+                thread.join()
+
+        # Incremental extractors move their watermark only once every batch they produced is loaded
+        if errors:
+            getattr(self.extractor, 'discard_extraction_points', lambda: None)()
+        else:
+            getattr(self.extractor, 'commit_extraction_points', lambda: None)()
+
+        self.stats = {
+            'batches_extracted': counts['extracted'],
+            'batches_loaded': counts['loaded'],
+            'seconds': time.monotonic() - started,
+            'busy_seconds': busy,
+        }
+        if errors:
+            raise PipelineError(f"Pipeline stage failed: {errors[0]}") from errors[0]
+
+        logging.info(f"Pipeline loaded {counts['loaded']} batches in {self.stats['seconds']:.1f}s "
+                     f"(busy: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in busy.items()) + ")")
+        return self.stats
+
+    @staticmethod
+    def _stage_name(index: int, transform: Any) -> str:
+        name = getattr(transform, '__name__', None) or type(transform).__name__
+        return f"transform[{index}]:{name}"
@@ -0,0 +1,648 @@
+# extractors/async_ssrs_extractor.py
+import io
+import os
+import csv
+import time
+import asyncio
+import tempfile
+import contextlib
+import weakref
+from datetime import timedelta
+from urllib.parse import urlsplit
+from typing import Optional, Dict, List, Tuple, Iterable, AsyncIterator, Union, Any
+
+try:
+    import httpx
+    import aiofiles
+    import aiofiles.os
+    from httpx_ntlm import HttpNtlmAuth
+except ImportError:  # httpx, httpx-ntlm and aiofiles are only needed for asynchronous extraction
+    httpx = None
+
+from etl.utilities.metrics import metrics_registry
+from etl.utilities.columnar_writer import write_columnar, require_pyarrow, COLUMNAR_FORMATS, FILE_EXTENSIONS
+from etl.utilities.extraction_cache import ExtractionCache
+from etl.plugins.extractors.ssrs_extractor_plugin.plugin import (SSRSExtractor, SSRSRequestError, ExtractionResult,
+                                                                 RETRYABLE_EXCEPTIONS, DEFAULT_BATCH_SIZE)
+
+DEFAULT_CONNECT_TIMEOUT = 30.0  # seconds; reads are not timed out since reports can render for a long time
+COLUMNAR_QUEUE_DEPTH = 4  # downloaded chunks waiting for the columnar converter before the download pauses
+
+# Render slots shared by every asynchronous extractor on an event loop, keyed on report server host, with their size
+_server_slots: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Tuple[asyncio.Semaphore, int]]]' = weakref.WeakKeyDictionary()
+
+
+def require_async_http() -> None:
+    """
+    Raises a helpful error if the libraries asynchronous extraction depends on are not installed.
+
+    Raises:
+        ImportError: If httpx, httpx-ntlm or aiofiles cannot be imported.
+    """
+    if httpx is None:
+        raise ImportError("AsyncSSRSExtractor requires httpx, httpx-ntlm and aiofiles. "
+                          "Install them with 'pip install httpx httpx-ntlm aiofiles'.")
+
+
+class AsyncSSRSExtractor(SSRSExtractor):
+    """
+    Asynchronous extractor for SSRS (SQL Server Reporting Services).
+
+    A sibling of ``SSRSExtractor`` for event loops: reports are requested over an ``httpx.AsyncClient``
+    with NTLM authentication and streamed to disk with ``aiofiles``, so a single loop can drive
+    hundreds of parameterized renders without a thread per report. Configuration, credentials, URL
+    building, parameter overrides, incremental watermarks, retries and the extraction cache are the
+    ones of ``SSRSExtractor`` (see its config.yml), and watermarks are shared with it.
+
+    It is still an ``SSRSExtractor``: ``extract``, ``extract_batches`` and ``extract_many`` keep their
+    synchronous behaviour over a requests session, so ``PipelineRunner`` and other callers of the
+    extractor contract can use it unchanged. Their coroutine counterparts are ``aextract``,
+    ``aextract_batches`` (an asynchronous iterator) and ``aextract_many``.
+
+    No more than ``ssrs.async_max_concurrency`` renders (``ssrs.max_concurrency`` by default) run
+    against a report server at once per event loop. The client is bound to the event loop it was
+    first used on; release it with ``await extractor.aclose()`` or ``async with``.
+    """
+
+    def __init__(self):
+        """
+        Initializes the AsyncSSRSExtractor from the SSRSExtractor configuration.
+
+        Raises:
+            ImportError: If httpx, httpx-ntlm or aiofiles are not installed.
+        """
+        require_async_http()
+        super().__init__()
+        self.async_max_concurrency = int(self.config['ssrs'].get('async_max_concurrency') or self.max_concurrency)
+        self.retry_policy.retry_on_exceptions = RETRYABLE_EXCEPTIONS + (httpx.TransportError,)
+        self.client: Optional['httpx.AsyncClient'] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> 'AsyncSSRSExtractor':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def __get_client(self) -> 'httpx.AsyncClient':
+        """
+        Returns the HTTP client of the running event loop, creating it on first use.
+
+        As with the synchronous session, NTLM authenticates connections rather than requests, so
+        keeping up to ``async_max_concurrency`` connections alive lets later renders skip the handshake.
+
+        Returns:
+            httpx.AsyncClient: A client with NTLM authentication and a keep-alive connection pool.
+        """
+        loop = asyncio.get_running_loop()
+        if self.client is None or self._client_loop is not loop:
+            self.client = httpx.AsyncClient(
+                auth=HttpNtlmAuth(self.username, self.password),
+                limits=httpx.Limits(max_connections=self.async_max_concurrency,
+                                    max_keepalive_connections=self.async_max_concurrency),
+                timeout=httpx.Timeout(None, connect=DEFAULT_CONNECT_TIMEOUT),
+            )
+            self._client_loop = loop
+        return self.client
+
+    def __server_slot(self) -> asyncio.Semaphore:
+        """
+        Returns the semaphore limiting concurrent renders against this extractor's report server.
+
+        The semaphore is shared across extractor instances on the running event loop so the
+        ``async_max_concurrency`` cap holds per server for the whole loop. It is sized by the first
+        extractor to reach the server; a later one configured with a different cap gets a warning
+        and the existing cap.
+        """
+        server = urlsplit(self.BASE_URL).netloc.lower()
+        slots = _server_slots.setdefault(asyncio.get_running_loop(), {})
+        slot, size = slots.get(server, (None, None))
+        if slot is None:
+            slot, size = slots[server] = (asyncio.Semaphore(self.async_max_concurrency), self.async_max_concurrency)
+        if size != self.async_max_concurrency and not getattr(self, '_async_slot_size_warned', False):
+            self._async_slot_size_warned = True
+            self.log(f"ssrs.async_max_concurrency is {self.async_max_concurrency}, but renders against {server} are "
+                     f"already capped at {size} on this event loop; keeping {size}", 'warning')
+        return slot
+
+    def __record_request(self, response: 'httpx.Response', elapsed: float) -> None:
+        """
+        Updates the connection counters and latency metrics for a completed request.
+
+        httpx keeps the 401 challenge responses of the NTLM handshake in the history of the final
+        response. The time spent on them is recorded as NTLM authentication time, and the rest of the
+        time until the headers arrived, which is mostly the report rendering, as time to first byte.
+
+        Args:
+            response (httpx.Response): The final response of the request.
+            elapsed (float): Seconds from sending the request until the final response's headers arrived.
+        """
+        challenges = [previous for previous in response.history if previous.status_code == 401]
+        plugin = type(self).__name__
+        auth_seconds = sum((previous.elapsed for previous in challenges), timedelta()).total_seconds()
+        if challenges:
+            metrics_registry.observe('auth_seconds', auth_seconds, plugin=plugin)
+        metrics_registry.observe('time_to_first_byte_seconds', max(elapsed - auth_seconds, 0.0), plugin=plugin)
+        with self._stats_lock:
+            self.connection_stats['requests'] += 1
+            if challenges:
+                self.connection_stats['handshakes'] += 1
+
+    async def __open_stream(self, url: str, headers: Dict[str, str]) -> 'httpx.Response':
+        """
+        Sends a streaming request for a report and waits for its headers.
+
+        Args:
+            url (str): The SSRS URL of the report.
+            headers (dict): Extra request headers, e.g. a Range header to resume a download.
+
+        Returns:
+            httpx.Response: The response, whose body has not been read yet. Close it with ``aclose``.
+        """
+        client = self.__get_client()
+        started = time.monotonic()
+        response = await client.send(client.build_request('GET', url, headers=headers), stream=True)
+        self.__record_request(response, time.monotonic() - started)
+        return response
+
+    async def __retry_delay(self, error: Exception, attempt: int, started: float, description: str) -> None:
+        """
+        Waits before the next attempt, or re-raises ``error`` if the retry policy gives up.
+
+        Args:
+            error (Exception): The error raised by the failed attempt.
+            attempt (int): The number of the attempt that failed, starting at 1.
+            started (float): The ``time.monotonic()`` at which the first attempt started.
+            description (str): What was attempted, for the log.
+        """
+        delay = self.retry_policy.next_delay(error, attempt, time.monotonic() - started)
+        if delay is None:
+            raise error
+        metrics_registry.increment('retries', plugin=type(self).__name__)
+        self.log(f"Attempt {attempt} to {description} failed ({error}); retrying in {delay:.1f}s", 'warning')
+        await asyncio.sleep(delay)
+
+    async def __download(self, url: str, full_path: str) -> int:
+        """
+        Downloads an SSRS report to disk in fixed-size chunks, retrying transient failures.
+
+        Like ``SSRSExtractor``, the body goes to a temporary file that is renamed onto ``full_path``
+        once complete, and retries resume from the bytes already on disk when the server supports
+        byte ranges.
+
+        Args:
+            url (str): The SSRS URL of the report.
+            full_path (str): The final location of the downloaded report.
+
+        Returns:
+            int: The size of the downloaded report in bytes.
+
+        Raises:
+            SSRSRequestError: If SSRS answers with an unexpected status code and retrying does not help.
+        """
+        directory = os.path.dirname(full_path) or os.curdir
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(full_path)}.", suffix=".part", dir=directory)
+        os.close(fd)
+        state = {'started': time.monotonic(), 'resumable': False, 'validator': None}
+        attempt = 0
+
+        try:
+            async with aiofiles.open(temp_path, 'wb') as file:
+                while True:
+                    attempt += 1
+                    try:
+                        await self.__fetch_into(url, file, full_path, state)
+                        break
+                    except Exception as error:
+                        await self.__retry_delay(error, attempt, state['started'], f"download {full_path}")
+                await file.flush()
+                await asyncio.to_thread(os.fsync, file.fileno())
+                bytes_written = await file.tell()
+            await aiofiles.os.replace(temp_path, full_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+
+        elapsed = time.monotonic() - state['started']
+        metrics_registry.observe('download_seconds', elapsed, plugin=type(self).__name__)
+        metrics_registry.increment('bytes', bytes_written, plugin=type(self).__name__)
+        self.last_download_stats = {
+            'bytes': bytes_written,
+            'seconds': elapsed,
+            'bytes_per_second': bytes_written / elapsed if elapsed > 0 else float(bytes_written),
+            'attempts': attempt,
+        }
+        self.log(f"Downloaded {full_path}: {bytes_written} bytes in {elapsed:.1f}s", 'info')
+        return bytes_written
+
+    async def __fetch_into(self, url: str, file, full_path: str, state: Dict[str, Any]) -> None:
+        """
+        Performs a single download attempt, appending to whatever earlier attempts left in ``file``.
+
+        Args:
+            url (str): The SSRS URL of the report.
+            file: The open temporary file the report is written to.
+            full_path (str): The final location of the report, used for progress logging.
+            state (dict): Download state shared between attempts (start time and resume validators).
+
+        Raises:
+            SSRSRequestError: If SSRS answers with an unexpected status code.
+        """
+        offset = await file.tell()
+        headers = {}
+        if offset and self.resume_downloads and state['resumable'] and state['validator']:
+            # Without an ETag or Last-Modified a resumed download could splice two different renders
+            # together, so it starts over instead; If-Range makes the server do so if the report changed
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = state['validator']
+
+        response = await self.__open_stream(url, headers)
+        try:
+            if response.status_code == 206 and 'Range' in headers:
+                start = self.__content_range_start(response)
+                if start is None or start > offset:
+                    raise SSRSRequestError(response.status_code, f"Unexpected Content-Range for resumed download of {full_path}")
+                if start < offset:
+                    await file.seek(start)
+                    await file.truncate()
+                self.log(f"Resuming download of {full_path} at byte {start}", 'info')
+            elif response.status_code == 200:
+                # Either a first attempt or a server that ignored the Range header: start over
+                await file.seek(0)
+                await file.truncate()
+                state['resumable'] = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+                state['validator'] = response.headers.get('ETag') or response.headers.get('Last-Modified')
+            else:
+                await response.aread()
+                raise SSRSRequestError(response.status_code, response.text)
+
+            last_report = time.monotonic()
+            async for chunk in response.aiter_bytes(chunk_size=self.chunk_size):
+                await file.write(chunk)
+
+                now = time.monotonic()
+                if now - last_report >= self.progress_interval:
+                    self.log(f"Downloading {full_path}: {await file.tell()} bytes in {now - state['started']:.1f}s", 'debug')
+                    last_report = now
+        finally:
+            await response.aclose()
+
+    @staticmethod
+    def __content_range_start(response: 'httpx.Response') -> Optional[int]:
+        """
+        Returns the first byte position of a partial response, or None if it cannot be determined.
+
+        Args:
+            response (httpx.Response): A 206 Partial Content response.
+        """
+        content_range = response.headers.get('Content-Range', '')
+        try:
+            unit, byte_range = content_range.split(' ', 1)
+            return int(byte_range.split('-', 1)[0]) if unit.lower() == 'bytes' else None
+        except ValueError:
+            return None
+
+    async def __open_report(self, url: str) -> 'httpx.Response':
+        """
+        Opens a streaming request for a report, retrying failures according to ``retry_policy``.
+
+        Args:
+            url (str): The SSRS URL of the report.
+
+        Returns:
+            httpx.Response: A successful response whose body has not been read yet.
+
+        Raises:
+            SSRSRequestError: If SSRS answers with an unexpected status code and retrying does not help.
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = await self.__open_stream(url, {})
+                if response.status_code != 200:
+                    await response.aread()
+                    await response.aclose()
+                    raise SSRSRequestError(response.status_code, response.text)
+                return response
+            except Exception as error:
+                await self.__retry_delay(error, attempt, started, f"open {url}")
+
+    async def aextract(self,
+                       data_source_name: Optional[str] = None,
+                       output_path: Optional[str] = None,
+                       filename: Optional[str] = None,
+                       output_format: Optional[str] = None,
+                       **overridden_parameters) -> str:
+        """
+        Extracts data from SSRS based on the provided data source name, without blocking the event loop.
+
+        The report is streamed to a file as in ``SSRSExtractor.extract``. For a ``parquet`` or ``arrow``
+        output format, the CSV is converted on a worker thread while it downloads (requires pyarrow).
+
+        Args:
+            data_source_name (str, optional): The name of the data source to extract from. Required.
+            output_path (str, optional): The path to save the extracted file. Defaults to the current working directory.
+            filename (str, optional): The name of the file to save the extracted data. Defaults to "outputfile"
+                with the extension of the output format.
+            output_format (str, optional): ``csv``, ``parquet`` or ``arrow``. Defaults to ``ssrs.download.output_format``.
+            **overridden_parameters: Any parameters that should override the default parameters for the data source.
+
+        Returns:
+            str: The path to the saved extracted file.
+
+        Raises:
+            ValueError: If data_source_name is not provided or is not valid.
+            SSRSRequestError: If the request to SSRS fails and retrying does not help.
+        """
+        output_path = output_path or os.getcwd()
+        output_format = output_format or self.output_format
+        if output_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported output format: {output_format}. Supported formats are: {', '.join(FILE_EXTENSIONS)}")
+        if output_format in COLUMNAR_FORMATS:
+            require_pyarrow()
+        filename = filename or f"outputfile{FILE_EXTENSIONS[output_format]}"
+
+        url, new_extraction_point = self.build_request(data_source_name, overridden_parameters)
+        full_path = os.path.join(output_path, filename)
+        self.log(f"Requesting {url}", 'debug')
+
+        # Serve identical requests made within the cache TTL without rendering the report again
+        cache_key = ExtractionCache.make_key(url) if self.cache is not None else None
+        if cache_key is not None and output_format != 'csv':
+            cache_key = f"{cache_key}.{output_format}"
+        if cache_key is not None and await asyncio.to_thread(self.cache.fetch, cache_key, full_path):
+            self.log(f"Served {full_path} from the extraction cache", 'info')
+        else:
+            async with self.__server_slot():
+                if output_format == 'csv':
+                    await self.__download(url, full_path)
+                else:
+                    await self.__download_columnar(url, full_path, output_format)
+
+            if cache_key is not None:
+                await asyncio.to_thread(self.cache.put, cache_key, full_path)
+
+        if new_extraction_point is not None:
+            self.set_extraction_point(new_extraction_point, data_source_name)
+
+        return full_path
+
+    async def __download_columnar(self, url: str, full_path: str, output_format: str) -> int:
+        """
+        Downloads a CSV report and converts it to Parquet or Arrow while it streams in.
+
+        Chunks of the response are handed to a converter on a worker thread through a small queue,
+        so row groups are written as the report arrives and memory stays bounded by a few chunks
+        plus a row group. As in ``SSRSExtractor``, only the initial request is retried; an
+        interrupted transfer fails the extraction instead of resuming.
+
+        Args:
+            url (str): The SSRS URL of the report.
+            full_path (str): The final location of the converted report.
+            output_format (str): ``parquet`` or ``arrow``.
+
+        Returns:
+            int: The size of the written file in bytes.
+
+        Raises:
+            SSRSRequestError: If SSRS answers with an unexpected status code and retrying does not help.
+        """
+        started = time.monotonic()
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=COLUMNAR_QUEUE_DEPTH)
+        stream = _ChunkStream(chunks, asyncio.get_running_loop())
+
+        def convert() -> Dict[str, Any]:
+            return write_columnar(stream, full_path, output_format,
+                                  compression=self.columnar_options.get('compression', 'zstd'),
+                                  block_size=self.chunk_size,
+                                  row_group_size=int(self.columnar_options.get('row_group_size', 128 * 1024)),
+                                  column_types=self.columnar_options.get('column_types'))
+
+        async def hand_over(item) -> bool:
+            # Wait for room in the queue unless the converter has stopped reading from it
+            if not chunks.full():
+                chunks.put_nowait(item)
+                return True
+            put = asyncio.ensure_future(chunks.put(item))
+            await asyncio.wait({put, conversion}, return_when=asyncio.FIRST_COMPLETED)
+            if put.done():
+                return True
+            put.cancel()
+            return False
+
+        response = await self.__open_report(url)
+        conversion = asyncio.ensure_future(asyncio.to_thread(convert))
+        try:
+            try:
+                async for chunk in response.aiter_bytes(chunk_size=self.chunk_size):
+                    if not await hand_over(chunk):
+                        break
+                else:
+                    await hand_over(b'')
+            except Exception as error:
+                # Raised in the converter, which removes its partial output
+                await hand_over(error)
+            finally:
+                await response.aclose()
+            stats = await conversion
+        finally:
+            # Never leave the converter thread waiting for a chunk that will not come
+            while not chunks.empty():
+                chunks.get_nowait()
+            chunks.put_nowait(asyncio.CancelledError())
+
+        elapsed = time.monotonic() - started
+        metrics_registry.observe('download_seconds', elapsed, plugin=type(self).__name__)
+        metrics_registry.increment('bytes', stats['bytes'], plugin=type(self).__name__)
+        metrics_registry.increment('rows', stats['rows'], plugin=type(self).__name__, method='aextract')
+        self.last_download_stats = {
+            'bytes': stats['bytes'],
+            'rows': stats['rows'],
+            'seconds': elapsed,
+            'bytes_per_second': stats['bytes'] / elapsed if elapsed > 0 else float(stats['bytes']),
+            'attempts': 1,
+        }
+        self.log(f"Converted {full_path}: {stats['rows']} rows, {stats['bytes']} bytes as {output_format} in {elapsed:.1f}s", 'info')
+        return stats['bytes']
+
+    async def aextract_batches(self,
+                               data_source_name: Optional[str] = None,
+                               batch_size: int = DEFAULT_BATCH_SIZE,
+                               **overridden_parameters) -> AsyncIterator[List[Dict[str, str]]]:
+        """
+        Streams a CSV report as batches of records instead of saving it to a file.
+
+        The asynchronous counterpart of ``SSRSExtractor.extract_batches``: rows are parsed while the
+        response is still downloading, and the new watermark of an incremental data source is left
+        pending until ``commit_extraction_points`` is called once the last batch has been loaded.
+
+        Args:
+            data_source_name (str, optional): The name of the data source to extract from. Required.
+            batch_size (int): The number of records per batch.
+            **overridden_parameters: Any parameters that should override the default parameters for the data source.
+
+        Yields:
+            list: Up to ``batch_size`` records, each a dict keyed by the report's column headers.
+
+        Raises:
+            ValueError: If data_source_name is not provided or is not valid.
+            SSRSRequestError: If the request to SSRS fails and retrying does not help.
+        """
+        url, new_extraction_point = self.build_request(data_source_name, overridden_parameters)
+
+        async with self.__server_slot():
+            response = await self.__open_report(url)
+            try:
+                # SSRS renders CSV as UTF-8 with a byte order mark
+                response.encoding = 'utf-8-sig'
+                header = None
+                batch = []
+                async for row in _csv_rows(response.aiter_text()):
+                    if header is None:
+                        header = row
+                        continue
+                    batch.append(dict(zip(header, row)))
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+            finally:
+                await response.aclose()
+
+        if new_extraction_point is not None:
+            self.defer_extraction_point(new_extraction_point, data_source_name)
+
+    async def aextract_many(self,
+                            jobs: Iterable[Union[str, Dict[str, Any]]],
+                            output_path: Optional[str] = None,
+                            max_workers: Optional[int] = None,
+                            output_format: Optional[str] = None) -> List[ExtractionResult]:
+        """
+        Extracts several reports concurrently on the running event loop.
+
+        Jobs are given as for ``SSRSExtractor.extract_many``. Every job gets its own task; no more
+        than ``ssrs.async_max_concurrency`` of them render against the report server at once. Jobs
+        that move the watermark of the same incremental data source run one after another.
+
+        Args:
+            jobs (iterable): The reports to extract.
+            output_path (str, optional): The directory for jobs that do not specify their own.
+            max_workers (int, optional): Further limits the number of reports extracted at once.
+            output_format (str, optional): The format for jobs that do not specify their own.
+                Defaults to ``ssrs.download.output_format``.
+
+        Returns:
+            list: One ExtractionResult per job, in the order the jobs were given. Failed jobs carry
+                their exception in ``error`` instead of raising it.
+        """
+        specs = self.prepare_jobs(jobs, output_path, output_format)
+        watermark_locks = {spec['data_source_name']: asyncio.Lock() for spec in specs if spec['advances_watermark']}
+
+        workers = asyncio.Semaphore(max_workers) if max_workers else contextlib.nullcontext()
+
+        async def run(spec: Dict[str, Any]) -> ExtractionResult:
+            name = spec.get('data_source_name')
+            parameters = spec.get('parameters') or {}
+            # Wait for the watermark before taking a worker, so queued jobs do not hold one idle
+            async with watermark_locks[name] if spec['advances_watermark'] else contextlib.nullcontext(), workers:
+                started = time.monotonic()
+                try:
+                    path = await self.aextract(name, spec['output_path'], spec['filename'], spec['output_format'], **parameters)
+                    return ExtractionResult(name, parameters, path=path, elapsed=time.monotonic() - started)
+                except Exception as error:
+                    self.handle_error(error)
+                    return ExtractionResult(name, parameters, error=error, elapsed=time.monotonic() - started)
+
+        return list(await asyncio.gather(*(run(spec) for spec in specs)))
+
+    def set_extraction_point(self, point, source='default'):
+        """Sets a starting point for incremental extraction, shared with SSRSExtractor."""
+        self.get_watermark_store().set(SSRSExtractor.__name__, source, point)
+
+    def get_last_extraction_point(self, source='default'):
+        """Retrieves the last extraction point shared with SSRSExtractor, or None if nothing has been extracted yet."""
+        return self.get_watermark_store().get(SSRSExtractor.__name__, source)
+
+    async def aclose(self) -> None:
+        """Closes the pooled HTTP client and session."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+        self.close()
+
+
+async def _csv_rows(chunks: AsyncIterator[str]) -> AsyncIterator[List[str]]:
+    """
+    Parses CSV rows out of text arriving in arbitrary chunks.
+
+    A line ends a record only when it closes every quoted field opened so far, which is the case
+    when the record holds an even number of quote characters, since quotes inside a field are doubled.
+    Blank lines are skipped, as ``csv.DictReader`` does.
+
+    Args:
+        chunks (AsyncIterator[str]): The CSV text.
+
+    Yields:
+        list: The fields of every record.
+    """
+    pending = ''
+    record: List[str] = []
+    quotes = 0
+    async for chunk in chunks:
+        lines = (pending + chunk).split('\n')
+        # The last line may continue in the next chunk
+        pending = lines.pop()
+        for line in lines:
+            record.append(line + '\n')
+            quotes += line.count('"')
+            if quotes % 2 == 0:
+                row = next(csv.reader([''.join(record)]), [])
+                record, quotes = [], 0
+                if row:
+                    yield row
+    record.append(pending)
+    row = next(csv.reader([''.join(record)]), []) if ''.join(record).strip() else []
+    if row:
+        yield row
+
+
+class _ChunkStream(io.RawIOBase):
+    """
+    A blocking, readable byte stream over chunks that an event loop puts on an ``asyncio.Queue``.
+
+    Meant to be read from a worker thread. An empty chunk marks the end of the stream, and an
+    exception put on the queue is raised by the read that reaches it.
+    """
+
+    def __init__(self, chunks: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+        super().__init__()
+        self.chunks = chunks
+        self.loop = loop
+        self.pending = memoryview(b'')
+        self.finished = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        # Fill the whole buffer so that every CSV block but the last has the configured size
+        view = memoryview(buffer).cast('B')
+        filled = 0
+        while filled < len(view) and not self.finished:
+            if not self.pending:
+                chunk = asyncio.run_coroutine_threadsafe(self.chunks.get(), self.loop).result()
+                if isinstance(chunk, BaseException):
+                    raise chunk
+                if not chunk:
+                    self.finished = True
+                    break
+                self.pending = memoryview(chunk)
+            size = min(len(view) - filled, len(self.pending))
+            view[filled:filled + size] = self.pending[:size]
+            self.pending = self.pending[size:]
+            filled += size
+        return filled
@@ -0,0 +1,269 @@
+import io
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+
+from etl.plugins.extractors.ssrs_extractor_plugin.plugin import SSRSExtractor, SSRSRequestError
+from etl.utilities.metrics import metrics_registry, InMemorySink
+from etl.utilities.watermark_store import WatermarkStore
+
+from .plugin import AsyncSSRSExtractor, _ChunkStream, httpx
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+REPORT = '\ufeffEvent,Notes\r\n1,"first\r\nline"\r\n2,"say ""hi"""\r\n3,plain\r\n'.encode('utf-8')
+
+
+if httpx is not None:
+    class FailingStream(httpx.AsyncByteStream):
+        """A response body that drops the connection after its first part."""
+
+        def __init__(self, body: bytes, fail_after: int):
+            self.body = body
+            self.fail_after = fail_after
+
+        async def __aiter__(self):
+            yield self.body[:self.fail_after]
+            raise httpx.ReadError("connection reset")
+
+    class ChunkedStream(httpx.AsyncByteStream):
+        """A response body arriving in the given chunks."""
+
+        def __init__(self, chunks):
+            self.chunks = chunks
+
+        async def __aiter__(self):
+            for chunk in self.chunks:
+                yield chunk
+
+
+@unittest.skipIf(httpx is None, "httpx, httpx-ntlm and aiofiles are required for asynchronous extraction")
+class TestAsyncSSRSExtractor(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        mock_secret_manager = Mock()
+        mock_secret_manager.get_secret.side_effect = ['mock_domain', 'mock_username', 'mock_password']
+        with patch.object(SSRSExtractor, 'secret_manager', mock_secret_manager):
+            self.extractor = AsyncSSRSExtractor()
+        self.extractor.retry_policy.jitter = False
+        self.extractor.retry_policy.backoff_factor = 0
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output_dir.cleanup)
+        self.requests = []
+
+    async def asyncTearDown(self):
+        await self.extractor.aclose()
+
+    def serve(self, handler):
+        async def record(request):
+            self.requests.append(request)
+            return await handler(request) if asyncio.iscoroutinefunction(handler) else handler(request)
+
+        # Stand in for the NTLM client, bound to the test's event loop
+        self.extractor.client = httpx.AsyncClient(transport=httpx.MockTransport(record))
+        self.extractor._client_loop = asyncio.get_running_loop()
+
+    async def test_extract_builds_the_same_url_as_the_synchronous_extractor(self):
+        self.serve(lambda request: httpx.Response(200, content=REPORT))
+
+        path = await self.extractor.aextract('ed_events', output_path=self.output_dir.name, End_Date='10/01/2023 00:00:00')
+
+        url, _ = self.extractor.build_request('ed_events', {'End_Date': '10/01/2023 00:00:00'})
+        self.assertEqual(str(self.requests[0].url), url)
+        self.assertIn('End_Date=10%2F01%2F2023%2000%3A00%3A00', url)
+        self.assertEqual(path, os.path.join(self.output_dir.name, 'outputfile.csv'))
+        with open(path, 'rb') as file:
+            self.assertEqual(file.read(), REPORT)
+        self.assertEqual(self.extractor.last_download_stats['bytes'], len(REPORT))
+        self.assertEqual(os.listdir(self.output_dir.name), ['outputfile.csv'])
+
+    async def test_interrupted_download_resumes_with_a_range_request(self):
+        def respond(request):
+            if 'Range' not in request.headers:
+                return httpx.Response(200, headers={'Accept-Ranges': 'bytes', 'ETag': '"v1"'},
+                                      stream=FailingStream(REPORT, fail_after=10))
+            return httpx.Response(206, headers={'Content-Range': f"bytes 10-{len(REPORT) - 1}/{len(REPORT)}"},
+                                  content=REPORT[10:])
+        self.serve(respond)
+        # Only whole chunks reach the disk, so make the bytes sent before the failure one
+        self.extractor.chunk_size = 5
+
+        path = await self.extractor.aextract('ed_events', output_path=self.output_dir.name)
+
+        self.assertEqual(self.requests[1].headers['Range'], 'bytes=10-')
+        self.assertEqual(self.requests[1].headers['If-Range'], '"v1"')
+        self.assertEqual(self.extractor.last_download_stats['attempts'], 2)
+        with open(path, 'rb') as file:
+            self.assertEqual(file.read(), REPORT)
+
+    async def test_download_without_validator_is_not_resumed(self):
+        def respond(request):
+            if len(self.requests) == 1:
+                return httpx.Response(200, headers={'Accept-Ranges': 'bytes'}, stream=FailingStream(REPORT, fail_after=10))
+            return httpx.Response(200, content=REPORT)
+        self.serve(respond)
+        self.extractor.chunk_size = 5
+
+        path = await self.extractor.aextract('ed_events', output_path=self.output_dir.name)
+
+        self.assertNotIn('Range', self.requests[1].headers)
+        with open(path, 'rb') as file:
+            self.assertEqual(file.read(), REPORT)
+
+    async def test_permanent_errors_are_not_retried(self):
+        self.serve(lambda request: httpx.Response(404, text="Report not found"))
+
+        with self.assertRaises(SSRSRequestError) as context:
+            await self.extractor.aextract('ed_events', output_path=self.output_dir.name)
+
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(os.listdir(self.output_dir.name), [])
+
+    @unittest.skipIf(pq is None, "pyarrow is required for columnar output")
+    async def test_columnar_conversion_starts_while_the_report_streams(self):
+        converting = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        read = _ChunkStream.readinto
+
+        def spy(stream, buffer):
+            loop.call_soon_threadsafe(converting.set)
+            return read(stream, buffer)
+
+        class GatedStream(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                yield REPORT[:20]
+                # The rest of the report only arrives once the converter has started reading
+                await asyncio.wait_for(converting.wait(), timeout=5)
+                yield REPORT[20:]
+
+        self.serve(lambda request: httpx.Response(200, stream=GatedStream()))
+        self.extractor.chunk_size = 16
+
+        with patch.object(_ChunkStream, 'readinto', spy):
+            path = await self.extractor.aextract('ed_events', output_path=self.output_dir.name, output_format='parquet')
+
+        table = pq.read_table(path)
+        self.assertEqual(table.column('Event').to_pylist(), [1, 2, 3])
+        self.assertEqual(table.column('Notes').to_pylist(), ['first\r\nline', 'say "hi"', 'plain'])
+        self.assertEqual(self.extractor.last_download_stats['rows'], 3)
+
+    @unittest.skipIf(pq is None, "pyarrow is required for columnar output")
+    async def test_interrupted_columnar_download_leaves_no_file(self):
+        self.serve(lambda request: httpx.Response(200, stream=FailingStream(REPORT, 20)))
+
+        with self.assertRaises(httpx.ReadError):
+            await self.extractor.aextract('ed_events', output_path=self.output_dir.name, output_format='arrow')
+
+        self.assertEqual(os.listdir(self.output_dir.name), [])
+
+    async def test_batches_are_parsed_while_the_report_streams(self):
+        sink = metrics_registry.add_sink(InMemorySink())
+        self.addCleanup(metrics_registry.remove_sink, sink)
+        # Chunks end in the middle of quoted fields and of the byte order mark
+        chunks = [REPORT[i:i + 3] for i in range(0, len(REPORT), 3)]
+        self.serve(lambda request: httpx.Response(200, stream=ChunkedStream(chunks)))
+
+        batches = [batch async for batch in self.extractor.aextract_batches('ed_events', batch_size=2)]
+
+        self.assertEqual(batches, [[{'Event': '1', 'Notes': 'first\r\nline'}, {'Event': '2', 'Notes': 'say "hi"'}],
+                                   [{'Event': '3', 'Notes': 'plain'}]])
+        self.assertEqual(len(sink.find('batch_seconds', plugin='AsyncSSRSExtractor', method='aextract_batches')), 2)
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    async def test_synchronous_contract_is_kept(self, mock_get):
+        response = Mock(status_code=200, history=[])
+        response.raw = io.BytesIO(REPORT)
+        mock_get.return_value = response
+
+        # PipelineRunner iterates extract_batches without an event loop of its own
+        batches = iter(self.extractor.extract_batches('ed_events', batch_size=2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+
+    async def test_extract_many_caps_concurrent_renders(self):
+        self.extractor.async_max_concurrency = 2
+        self.extractor.BASE_URL = 'https://capped.example.com/ReportServer'
+        running, peak = 0, 0
+
+        async def respond(request):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if 'Start_Date=broken' in str(request.url):
+                return httpx.Response(500, text="Render failed")
+            return httpx.Response(200, content=REPORT)
+        self.serve(respond)
+        self.extractor.retry_policy.max_attempts = 1
+
+        jobs = [{'data_source_name': 'ed_events', 'parameters': {'Start_Date': f"10/{day:02d}/2023"}} for day in range(1, 7)]
+        jobs.append({'data_source_name': 'ed_events', 'parameters': {'Start_Date': 'broken'}})
+        results = await self.extractor.aextract_many(jobs, output_path=self.output_dir.name)
+
+        self.assertEqual(peak, 2)
+        self.assertEqual([result.succeeded for result in results], [True] * 6 + [False])
+        self.assertEqual(len(set(result.path for result in results[:6])), 6)
+
+    async def test_differing_concurrency_caps_are_reported(self):
+        self.extractor.BASE_URL = 'https://cap-warning.example.com/ReportServer'
+        self.extractor.async_max_concurrency = 2
+        slot = self.extractor._AsyncSSRSExtractor__server_slot()
+
+        self.extractor.async_max_concurrency = 5
+        with self.assertLogs(level='WARNING') as logs:
+            self.assertIs(self.extractor._AsyncSSRSExtractor__server_slot(), slot)
+
+        self.assertIn('capped at 2', logs.output[0])
+
+    async def test_jobs_moving_one_watermark_do_not_overlap(self):
+        self.extractor.watermark_store = WatermarkStore(os.path.join(self.output_dir.name, 'watermarks.db'))
+        # The parsed config.yml is shared by every extractor, so the change must not outlive the test
+        patcher = patch.dict(self.extractor.config['ssrs']['data_sources']['ed_events'], {'incremental': {
+            'start_parameter': 'Start_Date', 'end_parameter': 'End_Date', 'format': '%Y-%m-%d'}})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        running, peak = 0, 0
+
+        async def respond(request):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return httpx.Response(200, content=REPORT)
+        self.serve(respond)
+
+        results = await self.extractor.aextract_many(['ed_events'] * 3, output_path=self.output_dir.name)
+
+        self.assertTrue(all(result.succeeded for result in results))
+        self.assertEqual(peak, 1)
+
+    async def test_watermarks_are_shared_with_the_synchronous_extractor(self):
+        self.extractor.watermark_store = WatermarkStore(os.path.join(self.output_dir.name, 'watermarks.db'))
+
+        self.extractor.set_extraction_point('10/01/2023 00:00:00', 'ed_events')
+
+        self.assertEqual(self.extractor.watermark_store.get('SSRSExtractor', 'ed_events'), '10/01/2023 00:00:00')
+
+    async def test_streamed_watermark_waits_for_commit(self):
+        self.extractor.watermark_store = WatermarkStore(os.path.join(self.output_dir.name, 'watermarks.db'))
+        self.serve(lambda request: httpx.Response(200, content=REPORT))
+
+        with patch.object(SSRSExtractor, 'build_request', return_value=('https://example.com/report', '10/01/2023')):
+            batches = [batch async for batch in self.extractor.aextract_batches('ed_events')]
+
+        self.assertEqual(len(batches), 1)
+        self.assertIsNone(self.extractor.get_last_extraction_point('ed_events'))
+        self.extractor.commit_extraction_points()
+        self.assertEqual(self.extractor.get_last_extraction_point('ed_events'), '10/01/2023')
+
+
+if __name__ == '__main__':
+    unittest.main()
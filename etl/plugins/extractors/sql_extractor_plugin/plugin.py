@@ -0,0 +1,643 @@
+# extractors/sql_extractor.py
+import os
+import csv
+import time
+import queue
+import logging
+import tempfile
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import exc, select, text, bindparam, literal_column, func, and_, or_
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Executable, FromClause, ColumnElement
+
+from etl.base.base_extractor import BaseExtractor
+from etl.utilities.metrics import metrics_registry
+from etl.utilities.retry_policy import RetryPolicy
+from etl.utilities.watermark_store import WatermarkStore
+from etl.utilities.connection_manager import ConnectionManager
+from config_management.config_registry import load_yaml
+
+DEFAULT_BATCH_SIZE = 10000  # rows fetched from the server-side cursor and yielded per batch
+DEFAULT_PARTITIONS = 4  # key ranges read in parallel by extract_partitions
+DEFAULT_QUEUE_SIZE = 4  # batches buffered per partition while the caller is busy with another one
+
+PARTITION_STRATEGIES = ('minmax', 'quantile')
+
+# Statements sharing one PostgreSQL snapshot between the connections of a partitioned read
+EXPORT_SNAPSHOT = "SELECT pg_export_snapshot()"
+REPEATABLE_READ = "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY"
+IMPORT_SNAPSHOT = "SET TRANSACTION SNAPSHOT '{}'"
+
+_END = object()  # marks the end of a partition on its queue
+
+# Failures worth opening the query again for; errors in the query itself are raised right away
+RETRYABLE_EXCEPTIONS = (
+    exc.OperationalError,
+    exc.DisconnectionError,
+    ConnectionError,
+    TimeoutError,
+)
+
+Query = Union[str, Executable]
+
+
+class SQLExtractor(BaseExtractor):
+    """
+    Extractor for relational databases reached through ``ConnectionManager``.
+
+    Results are read through a server-side cursor (``stream_results``) in batches of ``batch_size``
+    rows (``yield_per``), so only one batch is held in memory at a time however many rows the query
+    returns. On PostgreSQL this opens a named cursor, on MySQL an unbuffered one.
+
+    Queries come either from a data source in config.yml or from ``set_query``. Data sources with an
+    ``incremental`` section only return rows whose ``column`` is greater than the last value
+    extracted; the new watermark is recorded once the last batch has been produced.
+
+    Attributes:
+        connection_manager (ConnectionManager): Provides the engine; built from ``sql.db_type`` and
+            ``sql.credentials_path`` on first use unless given.
+        batch_size (int): The number of rows per batch.
+        query: The query set with ``set_query``, used when no data source is named.
+    """
+
+    def __init__(self, connection_manager: Optional[ConnectionManager] = None, batch_size: Optional[int] = None):
+        """
+        Initializes the SQLExtractor, setting up configurations and logging level.
+
+        Args:
+            connection_manager (ConnectionManager, optional): The connection manager to use instead of
+                the database configured in config.yml.
+            batch_size (int, optional): Overrides ``sql.batch_size``.
+        """
+        self.config = load_yaml(os.path.join(os.path.dirname(__file__), 'config.yml'))
+        self.connection_manager = connection_manager
+        self.batch_size = int(batch_size or self.config['sql'].get('batch_size', DEFAULT_BATCH_SIZE))
+        self.partition_snapshot = bool(self.config['sql'].get('partition_snapshot', False))
+        self.retry_policy = self.__create_retry_policy()
+        watermark_path = self.config['sql'].get('watermark_store')
+        self.watermark_store = WatermarkStore(watermark_path) if watermark_path else None
+        self.query: Optional[Query] = None
+        self.query_parameters: Dict[str, Any] = {}
+        self.incremental_column: Optional[str] = None
+        self.last_extract_stats: Dict[str, float] = {}
+
+        logging_level = self.config['general']['logging_level'].upper()
+        numeric_level = getattr(logging, logging_level, logging.INFO)
+        logging.basicConfig(level=numeric_level)
+
+    def __create_retry_policy(self) -> RetryPolicy:
+        """
+        Builds the retry policy for opening queries from the ``sql.retry`` configuration.
+
+        Returns:
+            RetryPolicy: The policy used to decide whether and when failed queries are opened again.
+        """
+        retry_config = self.config['sql'].get('retry') or {}
+        return RetryPolicy(max_attempts=int(retry_config.get('max_retries', 3)) + 1,
+                           backoff_factor=float(retry_config.get('backoff_factor', 1.0)),
+                           max_backoff=float(retry_config.get('max_backoff', 60.0)),
+                           retry_on_exceptions=RETRYABLE_EXCEPTIONS)
+
+    @property
+    def engine(self):
+        """The SQLAlchemy engine of the connection manager, shared through the engine registry."""
+        return self.connect().engine
+
+    def connect(self) -> ConnectionManager:
+        """
+        Establish a connection to the data source.
+
+        Returns:
+            ConnectionManager: The connection manager, created from config.yml if none was given.
+        """
+        if self.connection_manager is None:
+            self.connection_manager = ConnectionManager(self.config['sql']['db_type'], self.config['sql']['credentials_path'])
+        return self.connection_manager
+
+    def validate_connection(self) -> bool:
+        """Validates if the connection to the source is successful."""
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            return True
+        except exc.SQLAlchemyError as error:
+            self.handle_error(error)
+            return False
+
+    def set_query(self, query: Query, parameters: Optional[Dict[str, Any]] = None,
+                  incremental_column: Optional[str] = None) -> None:
+        """
+        Set a specific query for data extraction, used when no data source name is given.
+
+        Args:
+            query (str or Executable): SQL text with ``:name`` placeholders, or a SQLAlchemy selectable.
+            parameters (dict, optional): Values for the placeholders.
+            incremental_column (str, optional): Only return rows where this column is greater than the
+                last value extracted through ``set_query``.
+        """
+        self.query = query
+        self.query_parameters = dict(parameters or {})
+        self.incremental_column = incremental_column
+
+    def __resolve_query(self, data_source_name: Optional[str]) -> Tuple[Query, Dict[str, Any], Optional[str], str]:
+        """
+        Looks up the query to run.
+
+        Args:
+            data_source_name (str, optional): A data source from config.yml, or None for the query set
+                with ``set_query``.
+
+        Returns:
+            tuple: The query, its parameters, the incremental column (or None) and the name under which
+                the watermark is stored.
+
+        Raises:
+            ValueError: If the data source is unknown, or no data source is named and no query was set.
+        """
+        if data_source_name is None:
+            if self.query is None:
+                raise ValueError("Name a data source or call set_query first.")
+            return self.query, dict(self.query_parameters), self.incremental_column, 'default'
+
+        data_sources = self.config['sql'].get('data_sources') or {}
+        if data_source_name not in data_sources:
+            raise ValueError(f"The specified data_source_name '{data_source_name}' is not valid. Choose from {list(data_sources.keys())}.")
+        data_source = data_sources[data_source_name]
+        incremental = data_source.get('incremental') or {}
+        return (data_source['query'], dict(data_source.get('parameters') or {}),
+                incremental.get('column'), data_source_name)
+
+    def __apply_watermark(self, query: Query, parameters: Dict[str, Any], column: str, source: str) -> Executable:
+        """
+        Restricts a query to the rows past the last recorded watermark.
+
+        Args:
+            query (str or Executable): The query.
+            parameters (dict): The query parameters; the watermark is added to them.
+            column (str): The column holding the watermark.
+            source (str): The name under which the watermark is stored.
+
+        Returns:
+            Executable: The restricted query, or the query itself on the first extraction.
+        """
+        statement = text(query) if isinstance(query, str) else query
+        last_point = self.get_last_extraction_point(source)
+        if last_point is None:
+            return statement
+
+        parameters['dsr_watermark'] = last_point
+        if isinstance(query, str):
+            quoted = self.engine.dialect.identifier_preparer.quote(column)
+            return text(f"SELECT * FROM ({query}) AS src WHERE src.{quoted} > :dsr_watermark")
+        subquery = statement.subquery('src')
+        return select(subquery).where(subquery.c[column] > bindparam('dsr_watermark'))
+
+    @contextlib.contextmanager
+    def __open(self, statement: Executable, parameters: Dict[str, Any], batch_size: int, snapshot: Optional[str] = None):
+        """
+        Executes a query on a server-side cursor, retrying failures according to ``retry_policy``.
+
+        Args:
+            statement (Executable): The query.
+            parameters (dict): The query parameters.
+            batch_size (int): The number of rows buffered from the cursor at a time.
+            snapshot (str, optional): A PostgreSQL snapshot exported by another transaction to read from.
+
+        Yields:
+            Result: The unbuffered result; the connection is returned to the pool on exit.
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            connection = None
+            try:
+                attempt_started = time.monotonic()
+                connection = self.engine.connect()
+                if snapshot is not None:
+                    # Must come first in the transaction, before the query is declared as a cursor
+                    connection.exec_driver_sql(REPEATABLE_READ)
+                    connection.exec_driver_sql(IMPORT_SNAPSHOT.format(snapshot.replace("'", "''")))
+                connection.execution_options(stream_results=True, yield_per=batch_size)
+                connected = time.monotonic()
+                result = connection.execute(statement, parameters)
+                # Connection checkout (and login) apart from the server's time to start returning rows
+                metrics_registry.observe('connect_seconds', connected - attempt_started, plugin=type(self).__name__)
+                metrics_registry.observe('time_to_first_byte_seconds', time.monotonic() - connected, plugin=type(self).__name__)
+                break
+            except Exception as error:
+                if connection is not None:
+                    connection.close()
+                delay = self.retry_policy.next_delay(error, attempt, time.monotonic() - started)
+                if delay is None:
+                    raise
+                metrics_registry.increment('retries', plugin=type(self).__name__)
+                self.log(f"Attempt {attempt} to open the query failed ({error}); retrying in {delay:.1f}s", 'warning')
+                time.sleep(delay)
+
+        try:
+            yield result
+        finally:
+            result.close()
+            connection.close()
+
+    def __stream(self, data_source_name: Optional[str], batch_size: Optional[int]) -> Iterator[Tuple[List[str], Sequence[Any]]]:
+        """
+        Runs the query and yields its rows in batches, deferring the new watermark until the end.
+
+        The watermark is the largest non-NULL value of the incremental column; it is left pending
+        (see ``defer_extraction_point``) for the caller to commit once the rows are safely stored.
+
+        Args:
+            data_source_name (str, optional): A data source from config.yml, or None for the query set
+                with ``set_query``.
+            batch_size (int, optional): Overrides ``batch_size``.
+
+        Yields:
+            tuple: The column names and up to ``batch_size`` rows.
+        """
+        batch_size = batch_size or self.batch_size
+        query, parameters, column, source = self.__resolve_query(data_source_name)
+        statement = self.__apply_watermark(query, parameters, column, source) if column else (
+            text(query) if isinstance(query, str) else query)
+
+        started = time.monotonic()
+        rows = batches = 0
+        new_point = None
+        with self.__open(statement, parameters, batch_size) as result:
+            columns = list(result.keys())
+            position = columns.index(column) if column else None
+            for partition in result.partitions(batch_size):
+                if position is not None:
+                    # Rows with a NULL watermark column cannot move the watermark
+                    batch_max = max((row[position] for row in partition if row[position] is not None), default=None)
+                    if batch_max is not None and (new_point is None or batch_max > new_point):
+                        new_point = batch_max
+                rows += len(partition)
+                batches += 1
+                yield columns, partition
+
+        seconds = time.monotonic() - started
+        self.last_extract_stats = {'rows': rows, 'batches': batches, 'seconds': seconds,
+                                   'rows_per_second': rows / seconds if seconds > 0 else 0.0}
+        if new_point is not None:
+            self.defer_extraction_point(new_point, source)
+
+    def extract_batches(self,
+                        data_source_name: Optional[str] = None,
+                        batch_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Streams the query result as batches of records.
+
+        The new watermark of an incremental data source is left pending until
+        ``commit_extraction_points`` is called once the last batch has been loaded.
+
+        Args:
+            data_source_name (str, optional): A data source from config.yml, or None for the query set
+                with ``set_query``.
+            batch_size (int, optional): The number of records per batch. Defaults to ``batch_size``.
+
+        Yields:
+            list: Up to ``batch_size`` records, each a dict keyed by column name.
+
+        Raises:
+            ValueError: If the data source is unknown, or no data source is named and no query was set.
+        """
+        for columns, partition in self.__stream(data_source_name, batch_size):
+            yield [dict(zip(columns, row)) for row in partition]
+
+    def extract(self,
+                data_source_name: Optional[str] = None,
+                output_path: Optional[str] = None,
+                filename: Optional[str] = None,
+                batch_size: Optional[int] = None) -> str:
+        """
+        Extracts the query result into a CSV file.
+
+        Rows are written batch by batch to a temporary file that is atomically renamed onto the
+        destination once the query has been read completely; only then is the new watermark recorded.
+
+        Args:
+            data_source_name (str, optional): A data source from config.yml, or None for the query set
+                with ``set_query``.
+            output_path (str, optional): The directory to save the file in. Defaults to the current working directory.
+            filename (str, optional): The name of the file. Defaults to "<data_source_name>.csv" or "outputfile.csv".
+            batch_size (int, optional): The number of rows fetched at a time. Defaults to ``batch_size``.
+
+        Returns:
+            str: The path to the saved extracted file.
+
+        Raises:
+            ValueError: If the data source is unknown, or no data source is named and no query was set.
+        """
+        output_path = output_path or os.getcwd()
+        filename = filename or f"{data_source_name or 'outputfile'}.csv"
+        full_path = os.path.join(output_path, filename)
+
+        fd, temp_path = tempfile.mkstemp(prefix=f".{filename}.", suffix=".part", dir=output_path)
+        try:
+            with os.fdopen(fd, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.writer(file)
+                header_written = False
+                for columns, partition in self.__stream(data_source_name, batch_size):
+                    if not header_written:
+                        writer.writerow(columns)
+                        header_written = True
+                    writer.writerows(partition)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            self.discard_extraction_points()
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+        self.commit_extraction_points()
+
+        self.log(f"Extracted {self.last_extract_stats['rows']} rows to {full_path}", 'info')
+        return full_path
+
+    def extract_partitions(self,
+                           data_source_name: Optional[str] = None,
+                           partition_column: Optional[str] = None,
+                           partitions: int = DEFAULT_PARTITIONS,
+                           strategy: str = 'minmax',
+                           ordered: bool = True,
+                           batch_size: Optional[int] = None,
+                           max_workers: Optional[int] = None,
+                           snapshot: Optional[bool] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Streams the query result as batches of records, reading ranges of a key column in parallel.
+
+        The key range is split into ``partitions`` ranges and each range is read on its own pooled
+        connection and thread. Boundaries come from the key's minimum and maximum (``minmax``, for
+        numeric and date keys, evenly spaced) or from ``NTILE`` over the key (``quantile``, equally
+        sized ranges for skewed keys at the cost of one sort on the server). The first range also
+        holds rows whose key is NULL and the last range is open-ended, so every row is read once.
+
+        With ``ordered`` the batches of the first range are yielded before those of the second and so
+        on; otherwise batches are yielded as soon as any range produces them. Each range buffers at
+        most a few batches ahead of the caller. The engine's ``pool_size`` should allow for
+        ``max_workers`` connections. Watermarks are neither applied nor advanced.
+
+        Every range runs in a transaction of its own, so by default the result is not a consistent
+        snapshot: rows written while the ranges are read may show up in some ranges and not in
+        others, and a row whose key changes may be read twice or missed. With ``snapshot`` on
+        PostgreSQL, a coordinating REPEATABLE READ transaction exports its snapshot
+        (``pg_export_snapshot``) and holds it open, and the boundaries and every range are read in
+        that snapshot (``SET TRANSACTION SNAPSHOT``), at the cost of one more connection.
+
+        Args:
+            data_source_name (str, optional): A data source from config.yml, or None for the query set
+                with ``set_query``.
+            partition_column (str, optional): The key column. Defaults to the data source's
+                ``partition_column``.
+            partitions (int): The number of ranges.
+            strategy (str): How boundaries are chosen, ``minmax`` or ``quantile``.
+            ordered (bool): Whether batches are yielded range by range.
+            batch_size (int, optional): The number of records per batch. Defaults to ``batch_size``.
+            max_workers (int, optional): The number of ranges read at once. Defaults to one per range.
+            snapshot (bool, optional): Whether every range reads one exported PostgreSQL snapshot.
+                Defaults to ``sql.partition_snapshot``.
+
+        Yields:
+            list: Up to ``batch_size`` records, each a dict keyed by column name.
+
+        Raises:
+            ValueError: If the data source, key column or strategy is missing or invalid, or if a
+                snapshot is asked for on a database other than PostgreSQL.
+        """
+        if strategy not in PARTITION_STRATEGIES:
+            raise ValueError(f"Unsupported partition strategy: {strategy}. Supported strategies are: {', '.join(PARTITION_STRATEGIES)}")
+        if partitions < 1:
+            raise ValueError("partitions must be at least 1.")
+        snapshot = self.partition_snapshot if snapshot is None else snapshot
+        if snapshot and self.engine.dialect.name != 'postgresql':
+            raise ValueError(f"Snapshot reads need PostgreSQL, not {self.engine.dialect.name}.")
+        query, parameters, _, _ = self.__resolve_query(data_source_name)
+        if partition_column is None and data_source_name is not None:
+            partition_column = self.config['sql']['data_sources'][data_source_name].get('partition_column')
+        if not partition_column:
+            raise ValueError("A partition_column is required for partitioned extraction.")
+
+        statement = text(query).columns() if isinstance(query, str) else query
+        source = statement.subquery('src')
+        key = literal_column(f"src.{self.engine.dialect.identifier_preparer.quote(partition_column)}")
+
+        with contextlib.ExitStack() as stack:
+            snapshot_id = None
+            if snapshot:
+                # The exporting transaction has to stay open until every range has imported its snapshot
+                coordinator = stack.enter_context(self.engine.connect())
+                coordinator.exec_driver_sql(REPEATABLE_READ)
+                snapshot_id = coordinator.exec_driver_sql(EXPORT_SNAPSHOT).scalar()
+                boundaries = self.__partition_boundaries(coordinator, source, key, parameters, partitions, strategy)
+            else:
+                with self.engine.connect() as connection:
+                    boundaries = self.__partition_boundaries(connection, source, key, parameters, partitions, strategy)
+            statements = self.__partition_statements(source, key, boundaries)
+            in_snapshot = f" in snapshot {snapshot_id}" if snapshot_id else ""
+            self.log(f"Reading {len(statements)} partitions of {partition_column} ({strategy}){in_snapshot}", 'info')
+
+            started = time.monotonic()
+            rows = batches = 0
+            for batch in self.__read_partitions(statements, parameters, batch_size or self.batch_size,
+                                                ordered, max_workers or len(statements), snapshot_id):
+                rows += len(batch)
+                batches += 1
+                yield batch
+
+        seconds = time.monotonic() - started
+        self.last_extract_stats = {'rows': rows, 'batches': batches, 'partitions': len(statements), 'seconds': seconds,
+                                   'rows_per_second': rows / seconds if seconds > 0 else 0.0}
+
+    @staticmethod
+    def __partition_boundaries(connection: Connection, source: FromClause, key: ColumnElement,
+                               parameters: Dict[str, Any], partitions: int, strategy: str) -> List[Any]:
+        """
+        Computes the upper bounds of every key range but the last.
+
+        Args:
+            connection (Connection): The connection the key range is queried on.
+            source (FromClause): The query as a subquery named ``src``.
+            key (ColumnElement): The key column of ``source``.
+            parameters (dict): The query parameters.
+            partitions (int): The number of ranges.
+            strategy (str): ``minmax`` or ``quantile``.
+
+        Returns:
+            list: The distinct boundaries in ascending order; fewer than ``partitions - 1`` if the key
+                has fewer distinct values.
+
+        Raises:
+            ValueError: If ``minmax`` is used on a key that is neither numeric nor a date.
+        """
+        if partitions == 1:
+            return []
+        if strategy == 'quantile':
+            buckets = select(key.label('dsr_key'), func.ntile(partitions).over(order_by=key).label('dsr_bucket')) \
+                .select_from(source).where(key.is_not(None)).subquery('buckets')
+            maxima = connection.execute(select(func.max(buckets.c.dsr_key)).group_by(buckets.c.dsr_bucket)
+                                        .order_by(buckets.c.dsr_bucket), parameters).scalars().all()
+            return sorted(set(maxima[:-1]))
+
+        low, high = connection.execute(select(func.min(key), func.max(key)).select_from(source), parameters).one()
+        if low is None or low == high:
+            return []
+        try:
+            if isinstance(low, int) and isinstance(high, int):
+                boundaries = [low + (high - low) * index // partitions for index in range(1, partitions)]
+            else:
+                boundaries = [low + (high - low) * index / partitions for index in range(1, partitions)]
+        except TypeError:
+            raise ValueError(f"The minmax strategy needs a numeric or date key, not {type(low).__name__}; use quantile.")
+        return sorted(set(boundaries))
+
+    @staticmethod
+    def __partition_statements(source: FromClause, key: ColumnElement, boundaries: List[Any]) -> List[Executable]:
+        """
+        Builds one query per key range: ``(previous boundary, boundary]``, open-ended at both ends.
+
+        Args:
+            source (FromClause): The query as a subquery named ``src``.
+            key (ColumnElement): The key column of ``source``.
+            boundaries (list): The boundaries in ascending order.
+
+        Returns:
+            list: ``len(boundaries) + 1`` queries.
+        """
+        statements = []
+        bounds = [None] + list(boundaries) + [None]
+        for low, high in zip(bounds, bounds[1:]):
+            statement = select(literal_column('*')).select_from(source)
+            conditions = []
+            if low is not None:
+                conditions.append(key > bindparam('dsr_low', low))
+            if high is not None:
+                conditions.append(key <= bindparam('dsr_high', high))
+            if conditions:
+                condition = and_(*conditions)
+                # Rows without a key belong to the first range
+                statement = statement.where(or_(condition, key.is_(None)) if low is None else condition)
+            statements.append(statement)
+        return statements
+
+    def __read_partitions(self, statements: List[Executable], parameters: Dict[str, Any], batch_size: int,
+                          ordered: bool, max_workers: int, snapshot: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Reads every partition on a worker thread and yields their batches.
+
+        Args:
+            statements (list): One query per partition.
+            parameters (dict): The query parameters.
+            batch_size (int): The number of records per batch.
+            ordered (bool): Whether batches are yielded partition by partition.
+            max_workers (int): The number of partitions read at once.
+            snapshot (str, optional): The exported PostgreSQL snapshot every partition reads.
+
+        Yields:
+            list: Up to ``batch_size`` records, each a dict keyed by column name.
+        """
+        stop = threading.Event()
+        if ordered:
+            queues = [queue.Queue(maxsize=DEFAULT_QUEUE_SIZE) for _ in statements]
+        else:
+            queues = [queue.Queue(maxsize=DEFAULT_QUEUE_SIZE * len(statements))] * len(statements)
+
+        def put(target: queue.Queue, item: Any) -> bool:
+            # Wait for room, but give up once the caller stopped consuming
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read(index: int) -> None:
+            try:
+                with self.__open(statements[index], parameters, batch_size, snapshot) as result:
+                    columns = list(result.keys())
+                    for partition in result.partitions(batch_size):
+                        if not put(queues[index], [dict(zip(columns, row)) for row in partition]):
+                            return
+            except BaseException as error:
+                put(queues[index], error)
+            finally:
+                put(queues[index], _END)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sql-partition')
+        try:
+            for index in range(len(statements)):
+                executor.submit(read, index)
+            # Ordered reads drain the queues one after the other, unordered ones share a single queue
+            pending = len(statements)
+            for target in (queues if ordered else queues[:1]):
+                while pending:
+                    item = target.get()
+                    if item is _END:
+                        pending -= 1
+                        if ordered:
+                            break
+                    elif isinstance(item, BaseException):
+                        raise item
+                    else:
+                        yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+
+    def preview(self, n=5, data_source_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Preview a subset of the data (default: first 5 records).
+
+        Only ``n`` rows are fetched from the server-side cursor; the watermark is neither applied nor
+        advanced.
+
+        Args:
+            n (int): The number of records.
+            data_source_name (str, optional): A data source from config.yml, or None for the query set
+                with ``set_query``.
+
+        Returns:
+            list: Up to ``n`` records, each a dict keyed by column name.
+        """
+        query, parameters, _, _ = self.__resolve_query(data_source_name)
+        statement = text(query) if isinstance(query, str) else query
+        with self.__open(statement, parameters, n) as result:
+            columns = list(result.keys())
+            return [dict(zip(columns, row)) for row in result.fetchmany(n)]
+
+    def transform_at_source(self, transformation):
+        """Allows for light transformations at the source itself."""
+        # Express transformations in the query passed to set_query instead
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Retrieves metadata about the extracted data."""
+        return {'extract': dict(self.last_extract_stats)}
+
+    def handle_error(self, error):
+        """Handles errors during extraction."""
+        kind = "transient" if self.retry_policy.is_retryable(error) else "permanent"
+        logging.error(f"Error during extraction ({kind}): {str(error)}")
+
+    def retry(self, n):
+        """Sets the number of retries in case of failed extraction attempts."""
+        if n < 0:
+            raise ValueError("The number of retries cannot be negative.")
+        self.retry_policy.max_attempts = n + 1
+
+    def log(self, message, level):
+        """Logs various events or messages."""
+        numeric_level = getattr(logging, level.upper(), None)
+        if numeric_level is not None:
+            logging.log(numeric_level, message)
+        else:
+            logging.info(message)
+
+    def close(self) -> None:
+        """Close any connections; the pooled engine is shared and stays open for other users."""
+        if self.connection_manager is not None:
+            self.connection_manager.close()
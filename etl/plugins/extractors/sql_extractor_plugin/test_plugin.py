@@ -0,0 +1,251 @@
+import os
+import csv
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+
+from sqlalchemy import create_engine, event, exc, text, table, column, select
+
+from etl.utilities.watermark_store import WatermarkStore
+from .plugin import SQLExtractor, EXPORT_SNAPSHOT, IMPORT_SNAPSHOT, REPEATABLE_READ
+
+
+class TestSQLExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.directory.name, 'source.db')}")
+        self.addCleanup(self.engine.dispose)
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE ed_events (id INTEGER, note TEXT)"))
+            connection.execute(text("INSERT INTO ed_events VALUES (:id, :note)"),
+                               [{'id': index, 'note': f"event {index}"} for index in range(1, 6)])
+
+        self.connection_manager = Mock()
+        self.connection_manager.engine = self.engine
+        self.extractor = SQLExtractor(connection_manager=self.connection_manager, batch_size=2)
+        self.extractor.watermark_store = WatermarkStore(os.path.join(self.directory.name, 'watermarks.db'))
+        self.extractor.retry_policy.backoff_factor = 0
+
+    def test_rows_are_streamed_in_batches(self):
+        options = []
+        event.listen(self.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, parameters, context, executemany:
+                     options.append(context.execution_options))
+
+        batches = list(self.extractor.extract_batches('ed_events'))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(batches[0][0], {'id': 1, 'note': 'event 1'})
+        self.assertTrue(options[0]['stream_results'])
+        self.assertEqual(options[0]['yield_per'], 2)
+        self.assertEqual((self.extractor.get_metadata()['extract']['rows'],
+                          self.extractor.get_metadata()['extract']['batches']), (5, 3))
+
+    def test_set_query_with_parameters(self):
+        self.extractor.set_query("SELECT id FROM ed_events WHERE id > :minimum ORDER BY id", {'minimum': 3})
+
+        self.assertEqual(list(self.extractor.extract_batches()), [[{'id': 4}, {'id': 5}]])
+
+    def test_selectables_are_accepted(self):
+        events = table('ed_events', column('id'), column('note'))
+        self.extractor.set_query(select(events.c.id).where(events.c.id <= 2))
+
+        self.assertEqual(list(self.extractor.extract_batches(batch_size=10)), [[{'id': 1}, {'id': 2}]])
+
+    def test_extract_writes_csv_atomically(self):
+        path = self.extractor.extract('ed_events', output_path=self.directory.name)
+
+        with open(path, newline='') as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(path, os.path.join(self.directory.name, 'ed_events.csv'))
+        self.assertEqual(rows[0], ['id', 'note'])
+        self.assertEqual(len(rows), 6)
+        self.assertFalse([name for name in os.listdir(self.directory.name) if name.endswith('.part')])
+
+    def test_preview_fetches_only_n_rows(self):
+        self.assertEqual(self.extractor.preview(2, data_source_name='ed_events'),
+                         [{'id': 1, 'note': 'event 1'}, {'id': 2, 'note': 'event 2'}])
+
+    def test_incremental_data_source_resumes_after_watermark(self):
+        data_source = self.extractor.config['sql']['data_sources']['ed_events']
+        with patch.dict(data_source, {'incremental': {'column': 'id'}}):
+            self.assertEqual(sum(len(batch) for batch in self.extractor.extract_batches('ed_events')), 5)
+            self.assertIsNone(self.extractor.get_last_extraction_point('ed_events'))
+            self.extractor.commit_extraction_points()
+            self.assertEqual(self.extractor.get_last_extraction_point('ed_events'), 5)
+
+            with self.engine.begin() as connection:
+                connection.execute(text("INSERT INTO ed_events VALUES (6, 'event 6')"))
+
+            self.assertEqual(list(self.extractor.extract_batches('ed_events')), [[{'id': 6, 'note': 'event 6'}]])
+            self.extractor.commit_extraction_points()
+            self.assertEqual(self.extractor.get_last_extraction_point('ed_events'), 6)
+
+    def test_incremental_set_query(self):
+        self.extractor.set_query("SELECT id FROM ed_events", incremental_column='id')
+        self.extractor.set_extraction_point(3)
+
+        self.assertEqual(list(self.extractor.extract_batches()), [[{'id': 4}, {'id': 5}]])
+        self.extractor.commit_extraction_points()
+        self.assertEqual(self.extractor.get_last_extraction_point(), 5)
+
+    def test_null_watermark_values_are_ignored(self):
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE undated (id INTEGER, updated INTEGER)"))
+            connection.execute(text("INSERT INTO undated VALUES (1, NULL), (2, 7), (3, NULL)"))
+        self.extractor.set_query("SELECT id, updated FROM undated", incremental_column='updated')
+
+        self.assertEqual(sum(len(batch) for batch in self.extractor.extract_batches()), 3)
+        self.extractor.commit_extraction_points()
+        self.assertEqual(self.extractor.get_last_extraction_point(), 7)
+
+        self.extractor.set_extraction_point(None)
+        self.extractor.set_query("SELECT id, updated FROM undated WHERE updated IS NULL", incremental_column='updated')
+        self.assertEqual(sum(len(batch) for batch in self.extractor.extract_batches()), 2)
+        self.extractor.commit_extraction_points()
+        self.assertIsNone(self.extractor.get_last_extraction_point())
+
+    def test_extract_records_the_watermark_once_the_file_is_in_place(self):
+        self.extractor.set_query("SELECT id FROM ed_events", incremental_column='id')
+
+        with patch('etl.plugins.extractors.sql_extractor_plugin.plugin.os.replace', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.extractor.extract(output_path=self.directory.name)
+        self.assertIsNone(self.extractor.get_last_extraction_point())
+
+        self.extractor.extract(output_path=self.directory.name)
+        self.assertEqual(self.extractor.get_last_extraction_point(), 5)
+
+    def test_watermark_is_not_advanced_by_an_interrupted_extraction(self):
+        self.extractor.set_query("SELECT id FROM ed_events", incremental_column='id')
+
+        batches = self.extractor.extract_batches()
+        next(batches)
+        batches.close()
+
+        self.assertIsNone(self.extractor.get_last_extraction_point())
+
+    def test_transient_errors_are_retried_when_opening_the_query(self):
+        real_connect = self.engine.connect
+        failures = [exc.OperationalError("SELECT", {}, Exception("server closed the connection"))]
+
+        def connect():
+            if failures:
+                raise failures.pop()
+            return real_connect()
+
+        self.connection_manager.engine = Mock(wraps=self.engine, connect=connect, dialect=self.engine.dialect)
+
+        self.assertEqual(len(self.extractor.preview(3, data_source_name='ed_events')), 3)
+
+    def test_unknown_data_source_and_missing_query_are_rejected(self):
+        with self.assertRaises(ValueError):
+            list(self.extractor.extract_batches('missing'))
+        with self.assertRaises(ValueError):
+            list(self.extractor.extract_batches())
+
+
+class TestSQLExtractorPartitions(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.directory.name, 'source.db')}")
+        self.addCleanup(self.engine.dispose)
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE ed_events (id INTEGER, note TEXT)"))
+            # Skewed keys: most rows are packed at the low end, one row has no key
+            ids = list(range(1, 91)) + list(range(1000, 10001, 1000)) + [None]
+            connection.execute(text("INSERT INTO ed_events VALUES (:id, :note)"),
+                               [{'id': key, 'note': f"event {key}"} for key in ids])
+
+        connection_manager = Mock()
+        connection_manager.engine = self.engine
+        self.extractor = SQLExtractor(connection_manager=connection_manager, batch_size=7)
+        self.extractor.set_query("SELECT id, note FROM ed_events ORDER BY id")
+
+    def _ids(self, batches):
+        return [record['id'] for batch in batches for record in batch]
+
+    def test_ordered_minmax_partitions_cover_every_row_in_key_order(self):
+        ids = self._ids(self.extractor.extract_partitions(partition_column='id', partitions=4))
+
+        self.assertEqual(ids[0], None)
+        self.assertEqual(ids[1:], sorted(ids[1:]))
+        self.assertEqual(len(ids), 101)
+        self.assertEqual(self.extractor.get_metadata()['extract']['partitions'], 4)
+
+    def test_quantile_partitions_are_balanced(self):
+        # Capture the range queries instead of running them, to count the rows of each range
+        captured = []
+        with patch.object(SQLExtractor, '_SQLExtractor__read_partitions',
+                          side_effect=lambda statements, *args: captured.append(statements) or iter(())):
+            list(self.extractor.extract_partitions(partition_column='id', partitions=4, strategy='quantile'))
+        sizes = []
+        with self.engine.connect() as connection:
+            for statement in captured[0]:
+                sizes.append(len(connection.execute(statement).fetchall()))
+
+        self.assertEqual(sum(sizes), 101)
+        self.assertLessEqual(max(sizes) - min(sizes), 2)
+
+    def test_unordered_partitions_return_the_same_rows(self):
+        ids = self._ids(self.extractor.extract_partitions(partition_column='id', partitions=3, ordered=False,
+                                                          max_workers=2))
+
+        self.assertEqual(sorted(ids, key=lambda key: -1 if key is None else key),
+                         [None] + list(range(1, 91)) + list(range(1000, 10001, 1000)))
+
+    def test_partition_errors_are_raised(self):
+        self.extractor.set_query("SELECT id, missing_column FROM ed_events")
+
+        with self.assertRaises(exc.OperationalError):
+            list(self.extractor.extract_partitions(partition_column='id'))
+
+    def test_stopping_early_releases_the_workers(self):
+        batches = self.extractor.extract_partitions(partition_column='id', partitions=4, batch_size=1)
+        next(batches)
+        batches.close()
+
+        self.assertEqual(self.engine.pool.checkedout(), 0)
+
+    def test_minmax_rejects_text_keys(self):
+        with self.assertRaises(ValueError):
+            list(self.extractor.extract_partitions(partition_column='note'))
+
+    def test_snapshot_reads_need_postgresql(self):
+        with self.assertRaises(ValueError):
+            list(self.extractor.extract_partitions(partition_column='id', snapshot=True))
+
+    def test_every_partition_imports_the_exported_snapshot(self):
+        statements = []
+
+        def stand_in(conn, cursor, statement, parameters, context, executemany):
+            # SQLite has no snapshots; record the PostgreSQL statements and answer them harmlessly
+            statements.append((conn, statement))
+            if statement == EXPORT_SNAPSHOT:
+                return "SELECT 'snapshot-1'", parameters
+            if statement.startswith('SET TRANSACTION'):
+                return "SELECT 1", parameters
+            return statement, parameters
+        event.listen(self.engine, 'before_cursor_execute', stand_in, retval=True)
+        self.addCleanup(event.remove, self.engine, 'before_cursor_execute', stand_in)
+
+        with patch.object(self.engine.dialect, 'name', 'postgresql'):
+            ids = self._ids(self.extractor.extract_partitions(partition_column='id', partitions=4, snapshot=True))
+
+        by_connection = {}
+        for conn, statement in statements:
+            by_connection.setdefault(conn, []).append(statement)
+        coordinator, *partitions = by_connection.values()
+        self.assertEqual(len(ids), 101)
+        self.assertEqual(coordinator[:2], [REPEATABLE_READ, EXPORT_SNAPSHOT])
+        self.assertEqual(len(partitions), 4)
+        self.assertTrue(all(partition[:2] == [REPEATABLE_READ, IMPORT_SNAPSHOT.format('snapshot-1')] for partition in partitions))
+        self.assertEqual(self.engine.pool.checkedout(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
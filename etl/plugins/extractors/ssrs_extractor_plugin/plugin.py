@@ -1,31 +1,83 @@
 # extractors/ssrs_extractor.py
+import io
 import os
+import csv
+import time
+import tempfile
+import contextlib
+import threading
 import requests
-import yaml
+from requests.adapters import HTTPAdapter
 import logging
 import configparser
-from urllib.parse import quote
+from datetime import datetime, timedelta
+from urllib.parse import quote, urlsplit
+from concurrent.futures import ThreadPoolExecutor
 from requests_ntlm import HttpNtlmAuth
-from typing import Tuple, Optional, Dict
+from typing import Tuple, Optional, Dict, List, Iterable, Iterator, Union, NamedTuple, Any
 
 from etl.base.base_extractor import BaseExtractor
+from etl.utilities.metrics import metrics_registry
+from etl.utilities.retry_policy import RetryPolicy
+from etl.utilities.extraction_cache import ExtractionCache
+from etl.utilities.watermark_store import WatermarkStore
+from etl.utilities.columnar_writer import write_columnar, require_pyarrow, COLUMNAR_FORMATS, FILE_EXTENSIONS
 from config_management.factory import get_secret_manager
+from config_management.config_registry import load_ini, load_yaml
 
 # TODO: Remove magic strings and create constants
 
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # bytes written to disk per iteration when streaming a report
+DEFAULT_PROGRESS_INTERVAL = 5.0  # seconds between download progress log lines
+DEFAULT_MAX_CONCURRENCY = 4  # simultaneous renders allowed against a single report server
+DEFAULT_BATCH_SIZE = 10000  # records per batch when streaming a report into a pipeline
+
+# Render slots shared by every extractor in the process, keyed on report server host, with their size
+_server_slots: Dict[str, Tuple[threading.BoundedSemaphore, int]] = {}
+_server_slots_lock = threading.Lock()
+
+# Transport failures worth another attempt; HTTP status codes are classified by the retry policy
+RETRYABLE_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+class SSRSRequestError(Exception):
+    """Exception raised when SSRS answers a report request with an unexpected status code."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Request failed with status code {status_code}: {message}")
+        self.status_code = status_code
+
 class ConfigLoader:
     """Load and parse configuration settings."""
 
     @staticmethod
-    def load_config(file_name='config.ini'):
-        config = configparser.ConfigParser()
-        config.read(file_name)
-        return config
+    def load_config(file_name='config.ini') -> configparser.ConfigParser:
+        # Parsed once per process by the config registry; the result is shared, so don't modify it
+        return load_ini(file_name)
     
     @staticmethod
     def load_yml_config(file_name):
-        with open(file_name, 'r') as config_file:
-            return yaml.safe_load(config_file)
+        return load_yaml(file_name)
+
+
+class ExtractionResult(NamedTuple):
+    """Outcome of a single report requested through ``SSRSExtractor.extract_many``."""
+
+    data_source_name: str
+    parameters: Dict[str, Any]
+    path: Optional[str] = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
 
 
 class SSRSExtractor(BaseExtractor):
@@ -39,7 +91,10 @@ class SSRSExtractor(BaseExtractor):
         secret_manager: A manager for handling secrets required for extraction.
     """
 
-    secret_manager = get_secret_manager()
+    @property
+    def secret_manager(self):
+        """The process-wide secret manager, resolved on first use rather than at import time."""
+        return get_secret_manager()
 
     def __init__(self):
         """
@@ -48,6 +103,22 @@ class SSRSExtractor(BaseExtractor):
         self.config = ConfigLoader.load_yml_config(os.path.join(os.path.dirname(__file__), 'config.yml'))
         self.username, self.password = self.__load_credentials()
         self.BASE_URL = self.config['ssrs']['ReportServer_url']
+
+        download_config = self.config['ssrs'].get('download') or {}
+        self.chunk_size = int(download_config.get('chunk_size', DEFAULT_CHUNK_SIZE))
+        self.progress_interval = float(download_config.get('progress_interval', DEFAULT_PROGRESS_INTERVAL))
+        self.last_download_stats: Dict[str, float] = {}
+        self.max_concurrency = int(self.config['ssrs'].get('max_concurrency', DEFAULT_MAX_CONCURRENCY))
+        self.session = self.__create_session()
+        self.retry_policy = self.__create_retry_policy()
+        self.resume_downloads = bool(download_config.get('resume', True))
+        self.output_format = download_config.get('output_format') or 'csv'
+        self.columnar_options = dict(self.config['ssrs'].get('columnar') or {})
+        self.cache = self.__create_cache()
+        watermark_path = self.config['ssrs'].get('watermark_store')
+        self.watermark_store = WatermarkStore(watermark_path) if watermark_path else None
+        self.connection_stats: Dict[str, int] = {'requests': 0, 'handshakes': 0}
+        self._stats_lock = threading.Lock()
         
         logging_level = self.config['general']['logging_level'].upper()
         numeric_level = getattr(logging, logging_level, logging.INFO)
@@ -68,20 +139,227 @@ class SSRSExtractor(BaseExtractor):
         password = self.secret_manager.get_secret('ssrs_credentials', 'password')
         return full_username, password
 
-    def __construct_url(self, data_source_name: str) -> str:
+    def __create_session(self) -> requests.Session:
+        """
+        Creates the long-lived HTTP session used for every request made by this extractor.
+
+        NTLM authenticates the TCP connection rather than the request, so keeping connections alive
+        in a pool sized to ``max_concurrency`` lets later requests reuse an authenticated connection
+        and skip the three-leg handshake.
+
+        Returns:
+            requests.Session: A session with NTLM authentication and a pooled keep-alive adapter.
+        """
+        session = requests.Session()
+        session.auth = HttpNtlmAuth(self.username, self.password)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def __create_retry_policy(self) -> RetryPolicy:
+        """
+        Builds the retry policy for report downloads from the ``ssrs.retry`` configuration.
+
+        Returns:
+            RetryPolicy: The policy used to decide whether and when failed downloads are retried.
+        """
+        retry_config = self.config['ssrs'].get('retry') or {}
+        options = {
+            'max_attempts': int(retry_config.get('max_retries', 3)) + 1,
+            'backoff_factor': float(retry_config.get('backoff_factor', 1.0)),
+            'max_backoff': float(retry_config.get('max_backoff', 60.0)),
+            'jitter': bool(retry_config.get('jitter', True)),
+            'time_budget': float(retry_config['time_budget']) if retry_config.get('time_budget') else None,
+            'retry_on_exceptions': RETRYABLE_EXCEPTIONS,
+        }
+        if 'retry_on_status' in retry_config:
+            options['retry_on_status'] = [int(status) for status in retry_config['retry_on_status']]
+        return RetryPolicy(**options)
+
+    def __create_cache(self) -> Optional[ExtractionCache]:
+        """
+        Builds the on-disk extraction cache from the ``ssrs.cache`` configuration.
+
+        Returns:
+            ExtractionCache, optional: The cache, or None if caching is disabled.
+        """
+        cache_config = self.config['ssrs'].get('cache') or {}
+        if not cache_config.get('enabled', False):
+            return None
+        max_size_mb = cache_config.get('max_size_mb')
+        return ExtractionCache(
+            cache_dir=cache_config.get('directory') or os.path.join(tempfile.gettempdir(), 'ssrs_extraction_cache'),
+            ttl=float(cache_config.get('ttl', 900)),
+            max_bytes=int(float(max_size_mb) * 1024 * 1024) if max_size_mb else None,
+            link=bool(cache_config.get('link', True)),
+        )
+
+    def __record_request(self, response: requests.Response) -> None:
+        """
+        Updates the connection counters for a completed request.
+
+        ``requests_ntlm`` keeps the 401 challenge responses in the history of the final response, so a
+        request without them was served over an already authenticated connection. The time spent on
+        those challenges is recorded as NTLM authentication time, and the time the final request took
+        to return its headers, which is mostly the report rendering, as time to first byte.
+
+        Args:
+            response (requests.Response): The final response of the request.
+        """
+        handshake = any(previous.status_code == 401 for previous in response.history)
+        plugin = type(self).__name__
+        if handshake:
+            metrics_registry.observe('auth_seconds', sum((previous.elapsed for previous in response.history
+                                                          if isinstance(previous.elapsed, timedelta)), timedelta()).total_seconds(),
+                                     plugin=plugin)
+        if isinstance(getattr(response, 'elapsed', None), timedelta):
+            metrics_registry.observe('time_to_first_byte_seconds', response.elapsed.total_seconds(), plugin=plugin)
+        with self._stats_lock:
+            self.connection_stats['requests'] += 1
+            if handshake:
+                self.connection_stats['handshakes'] += 1
+
+    def __validate_data_source(self, data_source_name: Optional[str]) -> None:
+        """
+        Ensures a data source name was given and is configured.
+
+        Raises:
+            ValueError: If data_source_name is not provided or is not valid.
+        """
+        if not data_source_name:
+            raise ValueError("A data_source_name must be specified.")
+
+        if data_source_name not in self.config['ssrs']['data_sources']:
+            raise ValueError(f"The specified data_source_name '{data_source_name}' is not valid. Choose from {list(self.config['ssrs']['data_sources'].keys())}.")
+
+    def __resolve_parameters(self, data_source_name: str, overridden_parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merges the configured parameters of a data source with per-call overrides.
+
+        The configuration itself is left untouched so that concurrent extractions of the same
+        data source with different parameters do not interfere with each other.
+
+        Args:
+            data_source_name (str): The name of the data source.
+            overridden_parameters (dict): Parameters that take precedence over the configured ones.
+
+        Returns:
+            dict: The parameters to render the report with.
+        """
+        parameters = dict(self.config['ssrs']['data_sources'][data_source_name]['parameters'])
+        parameters.update(overridden_parameters)
+        return parameters
+
+    def __apply_watermark(self, data_source_name: str, parameters: Dict[str, Any],
+                          overridden_parameters: Dict[str, Any]) -> Optional[str]:
+        """
+        Narrows the report window of an incremental data source to the rows added since the last run.
+
+        Data sources with an ``incremental`` section get their ``start_parameter`` set to the stored
+        watermark and their ``end_parameter`` set to the current time. Explicitly overridden parameters
+        always win, which makes backfills possible without moving the watermark.
+
+        Args:
+            data_source_name (str): The name of the data source.
+            parameters (dict): The resolved parameters, updated in place.
+            overridden_parameters (dict): The parameters passed explicitly by the caller.
+
+        Returns:
+            str, optional: The watermark to record once the extraction succeeds, or None if the
+                data source is not incremental or its window was set explicitly.
+        """
+        if not self.advances_watermark(data_source_name, overridden_parameters):
+            return None
+
+        incremental = self.config['ssrs']['data_sources'][data_source_name]['incremental']
+        start_parameter = incremental['start_parameter']
+        end_parameter = incremental.get('end_parameter')
+        last_point = self.get_last_extraction_point(data_source_name)
+        if last_point is not None:
+            parameters[start_parameter] = last_point
+
+        new_point = datetime.now().strftime(incremental.get('format', '%m/%d/%Y %H:%M:%S'))
+        if end_parameter:
+            parameters[end_parameter] = new_point
+        return new_point
+
+    def advances_watermark(self, data_source_name: Optional[str], overridden_parameters: Dict[str, Any]) -> bool:
+        """
+        Tells whether extracting a data source with these parameters reads and moves its watermark.
+
+        Args:
+            data_source_name (str, optional): The name of the data source.
+            overridden_parameters (dict): The parameters passed explicitly by the caller.
+
+        Returns:
+            bool: False if the data source is unknown, is not incremental or its window was set explicitly.
+        """
+        data_source = self.config['ssrs']['data_sources'].get(data_source_name) if data_source_name else None
+        incremental = (data_source or {}).get('incremental')
+        if not incremental:
+            return False
+        end_parameter = incremental.get('end_parameter')
+        return not (incremental['start_parameter'] in overridden_parameters
+                    or (end_parameter and end_parameter in overridden_parameters))
+
+    def __construct_url(self, data_source_name: str, parameters: Dict[str, Any]) -> str:
         """
         Constructs the SSRS URL for data extraction based on the data source name.
 
         Args:
             data_source_name (str): The name of the data source for which the URL is to be constructed.
+            parameters (dict): The resolved report parameters.
 
         Returns:
             str: A fully-constructed SSRS URL for the specified data source.
         """
         data_source = self.config['ssrs']['data_sources'][data_source_name]
         report_path = quote(data_source['report_path'], safe = '') #urllib.parse ignores '/' by default but we need to encode it for this portion
-        parameters = "&".join([f"{quote(key, safe = '')}={quote(str(value), safe = '')}" for key, value in data_source['parameters'].items()])
+        parameters = "&".join([f"{quote(key, safe = '')}={quote(str(value), safe = '')}" for key, value in parameters.items()])
         return f"{self.BASE_URL}?{report_path}&{parameters}"
+
+    def build_request(self, data_source_name: Optional[str], overridden_parameters: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """
+        Builds the report URL of a data source from its configuration and the per-call overrides.
+
+        Shared by every way of requesting a report, so they all resolve parameters, incremental
+        windows and URLs the same way.
+
+        Args:
+            data_source_name (str, optional): The name of the data source. Required.
+            overridden_parameters (dict): Parameters that take precedence over the configured ones.
+
+        Returns:
+            tuple: The SSRS URL of the report, and the watermark to record once the extraction
+                succeeds (None if the data source is not incremental or its window was set explicitly).
+
+        Raises:
+            ValueError: If data_source_name is not provided or is not valid.
+        """
+        self.__validate_data_source(data_source_name)
+        parameters = self.__resolve_parameters(data_source_name, overridden_parameters)
+        new_extraction_point = self.__apply_watermark(data_source_name, parameters, overridden_parameters)
+        return self.__construct_url(data_source_name, parameters), new_extraction_point
+
+    def __server_slot(self) -> threading.BoundedSemaphore:
+        """
+        Returns the semaphore limiting concurrent renders against this extractor's report server.
+
+        The semaphore is shared across extractor instances so the ``max_concurrency`` cap holds
+        per server for the whole process. It is sized by the first extractor to reach the server;
+        a later one configured with a different cap gets a warning and the existing cap.
+        """
+        server = urlsplit(self.BASE_URL).netloc.lower()
+        with _server_slots_lock:
+            slot, size = _server_slots.get(server, (None, None))
+            if slot is None:
+                slot, size = _server_slots[server] = (threading.BoundedSemaphore(self.max_concurrency), self.max_concurrency)
+        if size != self.max_concurrency and not getattr(self, '_slot_size_warned', False):
+            self._slot_size_warned = True
+            self.log(f"ssrs.max_concurrency is {self.max_concurrency}, but renders against {server} are already "
+                     f"capped at {size} for this process; keeping {size}", 'warning')
+        return slot
     
     def __prompt_for_confirmation(self, full_path) -> None:
         """
@@ -99,6 +377,198 @@ class SSRSExtractor(BaseExtractor):
         if user_input != 'y':
             raise Exception("Operation aborted by user.")
 
+    def __download(self, url: str, full_path: str) -> int:
+        """
+        Downloads an SSRS report to disk in fixed-size chunks, retrying transient failures.
+
+        The body is written to a temporary file in the destination directory and only renamed
+        onto ``full_path`` once the download has completed, so readers never observe a partial
+        report and peak memory stays at roughly one chunk regardless of the report size.
+        Failed attempts are retried according to ``retry_policy``; when the server advertises
+        byte-range support, a retry resumes from the bytes already on disk instead of
+        rendering the report from scratch.
+
+        Args:
+            url (str): The SSRS URL of the report.
+            full_path (str): The final location of the downloaded report.
+
+        Returns:
+            int: The size of the downloaded report in bytes.
+
+        Raises:
+            SSRSRequestError: If SSRS answers with an unexpected status code and retrying does not help.
+        """
+        directory = os.path.dirname(full_path) or os.curdir
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(full_path)}.", suffix=".part", dir=directory)
+        state = {'started': time.monotonic(), 'resumable': False, 'validator': None}
+        attempt = 0
+
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                while True:
+                    attempt += 1
+                    try:
+                        self.__fetch_into(url, file, full_path, state)
+                        break
+                    except Exception as error:
+                        delay = self.retry_policy.next_delay(error, attempt, time.monotonic() - state['started'])
+                        if delay is None:
+                            raise
+                        metrics_registry.increment('retries', plugin=type(self).__name__)
+                        self.log(f"Attempt {attempt} to download {full_path} failed ({error}); "
+                                 f"retrying in {delay:.1f}s", 'warning')
+                        time.sleep(delay)
+                file.flush()
+                os.fsync(file.fileno())
+                bytes_written = file.tell()
+            os.replace(temp_path, full_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+
+        elapsed = time.monotonic() - state['started']
+        metrics_registry.observe('download_seconds', elapsed, plugin=type(self).__name__)
+        metrics_registry.increment('bytes', bytes_written, plugin=type(self).__name__)
+        self.last_download_stats = {
+            'bytes': bytes_written,
+            'seconds': elapsed,
+            'bytes_per_second': bytes_written / elapsed if elapsed > 0 else float(bytes_written),
+            'attempts': attempt,
+        }
+        self.__log_progress(full_path, bytes_written, elapsed, level='info', finished=True)
+        return bytes_written
+
+    def __download_columnar(self, url: str, full_path: str, output_format: str) -> int:
+        """
+        Downloads a CSV report and converts it to Parquet or Arrow while it streams in.
+
+        Only the initial request is retried; the CSV is parsed straight off the response, so an
+        interrupted transfer fails the extraction instead of resuming. Conversion options come from
+        ``ssrs.columnar`` in config.yml.
+
+        Args:
+            url (str): The SSRS URL of the report.
+            full_path (str): The final location of the converted report.
+            output_format (str): ``parquet`` or ``arrow``.
+
+        Returns:
+            int: The size of the written file in bytes.
+
+        Raises:
+            SSRSRequestError: If SSRS answers with an unexpected status code and retrying does not help.
+        """
+        started = time.monotonic()
+        response = self.__open_stream(url)
+        try:
+            response.raw.decode_content = True
+            stats = write_columnar(response.raw, full_path, output_format,
+                                   compression=self.columnar_options.get('compression', 'zstd'),
+                                   block_size=self.chunk_size,
+                                   row_group_size=int(self.columnar_options.get('row_group_size', 128 * 1024)),
+                                   column_types=self.columnar_options.get('column_types'))
+        finally:
+            response.close()
+
+        elapsed = time.monotonic() - started
+        metrics_registry.observe('download_seconds', elapsed, plugin=type(self).__name__)
+        metrics_registry.increment('bytes', stats['bytes'], plugin=type(self).__name__)
+        metrics_registry.increment('rows', stats['rows'], plugin=type(self).__name__, method='extract')
+        self.last_download_stats = {
+            'bytes': stats['bytes'],
+            'rows': stats['rows'],
+            'seconds': elapsed,
+            'bytes_per_second': stats['bytes'] / elapsed if elapsed > 0 else float(stats['bytes']),
+            'attempts': 1,
+        }
+        self.log(f"Converted {full_path}: {stats['rows']} rows, {stats['bytes']} bytes as {output_format} in {elapsed:.1f}s", 'info')
+        return stats['bytes']
+
+    def __fetch_into(self, url: str, file, full_path: str, state: Dict[str, Any]) -> None:
+        """
+        Performs a single download attempt, appending to whatever earlier attempts left in ``file``.
+
+        Args:
+            url (str): The SSRS URL of the report.
+            file: The open temporary file the report is written to.
+            full_path (str): The final location of the report, used for progress logging.
+            state (dict): Download state shared between attempts (start time and resume validators).
+
+        Raises:
+            SSRSRequestError: If SSRS answers with an unexpected status code.
+        """
+        offset = file.tell()
+        headers = {}
+        if offset and self.resume_downloads and state['resumable'] and state['validator']:
+            # Without an ETag or Last-Modified a resumed download could splice two different renders
+            # together, so it starts over instead; If-Range makes the server do so if the report changed
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = state['validator']
+
+        response = self.session.get(url, stream=True, headers=headers)
+        try:
+            self.__record_request(response)
+            if response.status_code == 206 and 'Range' in headers:
+                start = self.__content_range_start(response)
+                if start is None or start > offset:
+                    raise SSRSRequestError(response.status_code, f"Unexpected Content-Range for resumed download of {full_path}")
+                if start < offset:
+                    file.seek(start)
+                    file.truncate()
+                self.log(f"Resuming download of {full_path} at byte {start}", 'info')
+            elif response.status_code == 200:
+                # Either a first attempt or a server that ignored the Range header: start over
+                file.seek(0)
+                file.truncate()
+                state['resumable'] = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+                state['validator'] = response.headers.get('ETag') or response.headers.get('Last-Modified')
+            else:
+                raise SSRSRequestError(response.status_code, response.text)
+
+            last_report = time.monotonic()
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if not chunk:
+                    continue
+                file.write(chunk)
+
+                now = time.monotonic()
+                if now - last_report >= self.progress_interval:
+                    self.__log_progress(full_path, file.tell(), now - state['started'])
+                    last_report = now
+        finally:
+            response.close()
+
+    @staticmethod
+    def __content_range_start(response: requests.Response) -> Optional[int]:
+        """
+        Returns the first byte position of a partial response, or None if it cannot be determined.
+
+        Args:
+            response (requests.Response): A 206 Partial Content response.
+        """
+        content_range = response.headers.get('Content-Range', '')
+        try:
+            unit, byte_range = content_range.split(' ', 1)
+            return int(byte_range.split('-', 1)[0]) if unit.lower() == 'bytes' else None
+        except ValueError:
+            return None
+
+    def __log_progress(self, full_path: str, bytes_written: int, elapsed: float,
+                       level: str = 'debug', finished: bool = False) -> None:
+        """
+        Logs the number of bytes downloaded so far and the average throughput.
+
+        Args:
+            full_path (str): The destination of the download.
+            bytes_written (int): Bytes written to disk so far.
+            elapsed (float): Seconds since the download started.
+            level (str): The logging level to use.
+            finished (bool): Whether the download has completed.
+        """
+        throughput = bytes_written / elapsed / (1024 * 1024) if elapsed > 0 else 0.0
+        state = "Downloaded" if finished else "Downloading"
+        self.log(f"{state} {full_path}: {bytes_written} bytes in {elapsed:.1f}s ({throughput:.2f} MiB/s)", level)
+
     def connect(self) -> None:
         """
         Placeholder for traditional DB connection. 
@@ -110,16 +580,23 @@ class SSRSExtractor(BaseExtractor):
                 data_source_name: Optional[str] = None, 
                 output_path: Optional[str] = None, 
                 filename: Optional[str] = None, 
+                output_format: Optional[str] = None,
                 **overridden_parameters) -> str:
         """
         Extracts data from SSRS based on the provided data source name.
 
-        This method constructs the SSRS URL, makes an HTTP request, and if successful, saves the result to a file.
+        This method constructs the SSRS URL, makes an HTTP request, and if successful, streams the result to a file.
+        The body is written in ``chunk_size`` pieces (see ``ssrs.download`` in config.yml) to a temporary file
+        that is atomically renamed onto the destination once the download completes. With a ``parquet`` or
+        ``arrow`` output format, the CSV rendering is converted into typed, compressed columns as it downloads
+        (requires pyarrow).
 
         Args:
             data_source_name (str, optional): The name of the data source to extract from. Required.
             output_path (str, optional): The path to save the extracted file. Defaults to the current working directory.
-            filename (str, optional): The name of the file to save the extracted data. Defaults to "outputfile.csv".
+            filename (str, optional): The name of the file to save the extracted data. Defaults to "outputfile"
+                with the extension of the output format.
+            output_format (str, optional): ``csv``, ``parquet`` or ``arrow``. Defaults to ``ssrs.download.output_format``.
             **overridden_parameters: Any parameters that should override the default parameters for the data source.
 
         Returns:
@@ -127,55 +604,229 @@ class SSRSExtractor(BaseExtractor):
 
         Raises:
             ValueError: If data_source_name is not provided or is not valid.
-            Exception: If the request to SSRS fails.
+            SSRSRequestError: If the request to SSRS fails and retrying does not help.
         """
         # Use default values if not provided
         output_path = output_path or os.getcwd()
-        filename = filename or "outputfile.csv"
-
-        # If no data source is specified or the specified data source is invalid, raise an error
-        if not data_source_name:
-            raise ValueError("A data_source_name must be specified.")
-    
-        if data_source_name not in self.config['ssrs']['data_sources']:
-            raise ValueError(f"The specified data_source_name '{data_source_name}' is not valid. Choose from {list(self.config['ssrs']['data_sources'].keys())}.")
-
-        # Override the default parameters with the manually specified ones
-        data_source_config = self.config['ssrs']['data_sources'][data_source_name]
-        data_source_config['parameters'].update(overridden_parameters)
-
-        # Construct the full URL and path for the output file
-        url = self.__construct_url(data_source_name)
+        output_format = output_format or self.output_format
+        if output_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported output format: {output_format}. Supported formats are: {', '.join(FILE_EXTENSIONS)}")
+        if output_format in COLUMNAR_FORMATS:
+            require_pyarrow()
+        filename = filename or f"outputfile{FILE_EXTENSIONS[output_format]}"
+
+        # Validate the data source, override its default parameters with the manually specified ones
+        # and construct the full URL and path for the output file
+        url, new_extraction_point = self.build_request(data_source_name, overridden_parameters)
         full_path = os.path.join(output_path, filename)
 
 
         if logging.getLogger().getEffectiveLevel() == logging.DEBUG:
             self.__prompt_for_confirmation(url)
 
-        # Make a GET request with NTLM authentication
-        response = requests.get(url, auth=HttpNtlmAuth(self.username, self.password))
-
-        # Check if the request was successful
-        if response.status_code == 200:
-            # Save the content to a file
-            with open(full_path, 'wb') as file:
-                file.write(response.content)
-            return full_path
+        # Serve identical requests made within the cache TTL without rendering the report again
+        cache_key = ExtractionCache.make_key(url) if self.cache is not None else None
+        if cache_key is not None and output_format != 'csv':
+            cache_key = f"{cache_key}.{output_format}"
+        if cache_key is not None and self.cache.fetch(cache_key, full_path):
+            self.log(f"Served {full_path} from the extraction cache", 'info')
         else:
-            raise Exception(f"Request failed with status code {response.status_code}: {response.text}")
-        
+            with self.__server_slot():
+                # Stream the report over the pooled NTLM session so the body is never held in memory
+                if output_format == 'csv':
+                    self.__download(url, full_path)
+                else:
+                    self.__download_columnar(url, full_path, output_format)
+
+            if cache_key is not None:
+                self.cache.put(cache_key, full_path)
+
+        if new_extraction_point is not None:
+            self.set_extraction_point(new_extraction_point, data_source_name)
+
+        return full_path
+
+    def extract_batches(self,
+                        data_source_name: Optional[str] = None,
+                        batch_size: int = DEFAULT_BATCH_SIZE,
+                        **overridden_parameters) -> Iterator[List[Dict[str, str]]]:
+        """
+        Streams a CSV report as batches of records instead of saving it to a file.
+
+        Rows are parsed while the response is still downloading, so a pipeline can transform and load
+        the first batches before the report has finished transferring. The initial request is retried
+        like ``extract``; once records have been handed out, a dropped connection is raised instead,
+        since the batches already consumed cannot be taken back. Incremental data sources defer their
+        new watermark once the last batch has been produced; it is recorded by
+        ``commit_extraction_points``, which ``PipelineRunner`` calls after the last batch is loaded.
+
+        Args:
+            data_source_name (str, optional): The name of the data source to extract from. Required.
+            batch_size (int): The number of records per batch.
+            **overridden_parameters: Any parameters that should override the default parameters for the data source.
+
+        Yields:
+            list: Up to ``batch_size`` records, each a dict keyed by the report's column headers.
+
+        Raises:
+            ValueError: If data_source_name is not provided or is not valid.
+            SSRSRequestError: If the request to SSRS fails and retrying does not help.
+        """
+        url, new_extraction_point = self.build_request(data_source_name, overridden_parameters)
+
+        with self.__server_slot():
+            response = self.__open_stream(url)
+            try:
+                response.raw.decode_content = True
+                # SSRS renders CSV as UTF-8 with a byte order mark
+                reader = csv.DictReader(io.TextIOWrapper(response.raw, encoding='utf-8-sig', newline=''))
+                batch = []
+                for record in reader:
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+            finally:
+                response.close()
+
+        if new_extraction_point is not None:
+            self.defer_extraction_point(new_extraction_point, data_source_name)
+
+    def __open_stream(self, url: str) -> requests.Response:
+        """
+        Opens a streaming request for a report, retrying failures according to ``retry_policy``.
+
+        Args:
+            url (str): The SSRS URL of the report.
+
+        Returns:
+            requests.Response: A successful response whose body has not been read yet.
+
+        Raises:
+            SSRSRequestError: If SSRS answers with an unexpected status code and retrying does not help.
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.session.get(url, stream=True, headers={})
+                self.__record_request(response)
+                if response.status_code != 200:
+                    error = SSRSRequestError(response.status_code, response.text)
+                    response.close()
+                    raise error
+                return response
+            except Exception as error:
+                delay = self.retry_policy.next_delay(error, attempt, time.monotonic() - started)
+                if delay is None:
+                    raise
+                metrics_registry.increment('retries', plugin=type(self).__name__)
+                self.log(f"Attempt {attempt} to open {url} failed ({error}); retrying in {delay:.1f}s", 'warning')
+                time.sleep(delay)
+
+    def prepare_jobs(self,
+                     jobs: Iterable[Union[str, Dict[str, Any]]],
+                     output_path: Optional[str] = None,
+                     output_format: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Normalises the jobs given to ``extract_many`` into dicts with an output path, format and filename.
+
+        Args:
+            jobs (iterable): Data source names or job dicts, see ``extract_many``.
+            output_path (str, optional): The directory for jobs that do not specify their own.
+            output_format (str, optional): The format for jobs that do not specify their own.
+                Defaults to ``ssrs.download.output_format``.
+
+        Returns:
+            list: One dict per job, in the order the jobs were given. ``advances_watermark`` tells
+                whether the job reads and moves the watermark of an incremental data source.
+
+        Raises:
+            ValueError: If a job asks for an unsupported output format.
+        """
+        specs = [{'data_source_name': job} if isinstance(job, str) else dict(job) for job in jobs]
+        for spec in specs:
+            # Jobs moving the same watermark must not overlap, or each would read the same window
+            spec['advances_watermark'] = self.advances_watermark(spec.get('data_source_name'), spec.get('parameters') or {})
+        name_counts: Dict[str, int] = {}
+        for spec in specs:
+            name = spec.get('data_source_name')
+            name_counts[name] = name_counts.get(name, 0) + 1
+
+        for index, spec in enumerate(specs):
+            spec.setdefault('output_path', output_path)
+            spec['output_format'] = spec.get('output_format') or output_format or self.output_format
+            if spec['output_format'] not in FILE_EXTENSIONS:
+                raise ValueError(f"Unsupported output format: {spec['output_format']}. "
+                                 f"Supported formats are: {', '.join(FILE_EXTENSIONS)}")
+            if not spec.get('filename'):
+                # Every job needs its own file; repeated data sources get their position as a suffix
+                name = spec.get('data_source_name')
+                extension = FILE_EXTENSIONS[spec['output_format']]
+                spec['filename'] = f"{name}{extension}" if name_counts[name] == 1 else f"{name}_{index}{extension}"
+        return specs
+
+    def extract_many(self,
+                     jobs: Iterable[Union[str, Dict[str, Any]]],
+                     output_path: Optional[str] = None,
+                     max_workers: Optional[int] = None,
+                     output_format: Optional[str] = None) -> List[ExtractionResult]:
+        """
+        Extracts several reports concurrently.
+
+        Each job is either a data source name or a dict with a ``data_source_name`` key and optional
+        ``parameters``, ``filename``, ``output_path`` and ``output_format`` keys, so one data source can be rendered with
+        many parameter sets. No more than ``ssrs.max_concurrency`` renders run against the report server
+        at once, however many workers or extractor instances are active. Jobs that move the watermark of
+        the same incremental data source run one after another, in no particular order, so each reads
+        the window the previous one left.
+
+        Args:
+            jobs (iterable): The reports to extract.
+            output_path (str, optional): The directory for jobs that do not specify their own.
+            max_workers (int, optional): The size of the thread pool. Defaults to ``ssrs.max_concurrency``.
+            output_format (str, optional): The format for jobs that do not specify their own.
+                Defaults to ``ssrs.download.output_format``.
+
+        Returns:
+            list: One ExtractionResult per job, in the order the jobs were given. Failed jobs carry
+                their exception in ``error`` instead of raising it.
+        """
+        specs = self.prepare_jobs(jobs, output_path, output_format)
+        watermark_locks = {spec['data_source_name']: threading.Lock() for spec in specs if spec['advances_watermark']}
+
+        def run(spec: Dict[str, Any]) -> ExtractionResult:
+            name = spec.get('data_source_name')
+            parameters = spec.get('parameters') or {}
+            started = time.monotonic()
+            try:
+                with watermark_locks[name] if spec['advances_watermark'] else contextlib.nullcontext():
+                    path = self.extract(name, spec['output_path'], spec['filename'], spec['output_format'], **parameters)
+                return ExtractionResult(name, parameters, path=path, elapsed=time.monotonic() - started)
+            except Exception as error:
+                self.handle_error(error)
+                return ExtractionResult(name, parameters, error=error, elapsed=time.monotonic() - started)
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_concurrency) as executor:
+            return list(executor.map(run, specs))
+
     def validate_connection(self):
         """Validates if the connection to the source is successful."""
         # This can be implemented to make a test request to SSRS to ensure the connection is valid
 
     def handle_error(self, error):
         """Handles errors during extraction."""
-        logging.error(f"Error during extraction: {str(error)}")
-        # Further error handling can be added as needed
+        kind = "transient" if self.retry_policy.is_retryable(error) else "permanent"
+        logging.error(f"Error during extraction ({kind}): {str(error)}")
 
     def retry(self, n):
         """Sets the number of retries in case of failed extraction attempts."""
-        # This can be implemented to retry the extraction in case of certain failures
+        if n < 0:
+            raise ValueError("The number of retries cannot be negative.")
+        self.retry_policy.max_attempts = n + 1
 
     def log(self, message, level):
         """Logs various events or messages."""
@@ -187,23 +838,31 @@ class SSRSExtractor(BaseExtractor):
 
     def get_metadata(self):
         """Retrieves metadata about the extracted data."""
-        # Placeholder for fetching metadata, can be implemented based on the SSRS capabilities
-        pass
+        # Only download statistics for the last extraction, connection reuse and cache counters are available for now
+        with self._stats_lock:
+            connection = dict(self.connection_stats)
+        connection['handshakes_saved'] = connection['requests'] - connection['handshakes']
+        cache = self.cache.stats() if self.cache is not None else {}
+        return {'download': dict(self.last_download_stats), 'connection': connection, 'cache': cache}
 
     def transform_at_source(self, transformation):
         """Allows for light transformations at the source itself."""
         # This can be implemented if SSRS allows for certain transformations during the extraction process
 
+    def preview(self, n=5):
+        """Preview a subset of the data (default: first 5 records)."""
+        # SSRS renders whole reports, so a preview would require a full extraction
+
     def set_query(self, query):
         """Set a specific query for data extraction (mainly for databases)."""
         # This can be implemented if SSRS supports query-based data extraction
 
     def close(self) -> None:
         """
-        Placeholder for traditional DB close operation.
-        SSRS does not require a traditional close as it's based on HTTP requests.
+        Closes the pooled HTTP session.
+        SSRS does not require a traditional close, but the kept-alive connections should be released.
         """
-        pass
+        self.session.close()
 
 
 if __name__ == "__main__":
@@ -1,36 +1,508 @@
+import io
+import os
+import time
+import tempfile
+import threading
 import unittest
+from datetime import datetime
 from unittest.mock import patch, Mock, ANY
 
-from .plugin import SSRSExtractor
+import requests
+from requests_ntlm import HttpNtlmAuth
+
+from etl.utilities.extraction_cache import ExtractionCache
+from etl.utilities.watermark_store import WatermarkStore
+
+from .plugin import SSRSExtractor, SSRSRequestError
 
 
 class TestSSRSExtractor(unittest.TestCase):
 
-    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.get_secret_manager')
-    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.get')
-    def test_extract_successful_response(self, mock_get, mock_get_secret_manager):
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_extract_successful_response(self, mock_get):
         # Mock secret manager responses
         mock_secret_manager = Mock()
-        mock_secret_manager.get_secret.side_effect = ['mock_username', 'mock_password']
-        mock_get_secret_manager.return_value = mock_secret_manager
+        mock_secret_manager.get_secret.side_effect = ['mock_domain', 'mock_username', 'mock_password']
 
         # Mock a successful response from the SSRS server
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.content = b"mock_data"
+        mock_response.history = []
+        mock_response.iter_content.return_value = [b"mock_data"]
         mock_get.return_value = mock_response
 
-        extractor = SSRSExtractor()
-        output_path = extractor.extract("/mock_report_path")
+        with patch.object(SSRSExtractor, 'secret_manager', mock_secret_manager), \
+                tempfile.TemporaryDirectory() as output_dir:
+            extractor = SSRSExtractor()
+            output_path = extractor.extract("ed_events", output_path=output_dir)
 
         # Assertions
-        mock_get.assert_called_with(
-            "https://webreports.hs.uci.edu/ReportServer/mock_report_path", 
-            auth=ANY  # Placeholder for expected auth object
-        )
+        mock_get.assert_called_with(ANY, stream=True, headers={})
+        self.assertTrue(mock_get.call_args[0][0].startswith(
+            "https://webreports.hs.uci.edu/ReportServer?%2FEpic%2FEmergency%2FED%20Events&"))
+        self.assertIsInstance(extractor.session.auth, HttpNtlmAuth)
+        self.assertEqual(extractor.session.auth.username, "mock_domain\\mock_username")
         self.assertTrue("outputfile.csv" in output_path)
 
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_reused_connections_are_counted_as_saved_handshakes(self, mock_get):
+        mock_secret_manager = Mock()
+        mock_secret_manager.get_secret.side_effect = ['mock_domain', 'mock_username', 'mock_password']
+        challenge = Mock(status_code=401)
+
+        def respond(url, **kwargs):
+            response = Mock()
+            response.status_code = 200
+            # Only the first request has to authenticate its connection
+            response.history = [challenge, challenge] if mock_get.call_count == 1 else []
+            response.iter_content.return_value = [b"data"]
+            return response
+        mock_get.side_effect = respond
+
+        with patch.object(SSRSExtractor, 'secret_manager', mock_secret_manager), \
+                tempfile.TemporaryDirectory() as output_dir:
+            extractor = SSRSExtractor()
+            for _ in range(3):
+                extractor.extract("ed_events", output_path=output_dir)
+
+        self.assertEqual(extractor.get_metadata()['connection'],
+                         {'requests': 3, 'handshakes': 1, 'handshakes_saved': 2})
+
     # TODO: Additional tests, e.g., for unsuccessful HTTP responses, exceptions, etc.
 
+
+class TestSSRSExtractorStreaming(unittest.TestCase):
+
+    def setUp(self):
+        mock_secret_manager = Mock()
+        mock_secret_manager.get_secret.side_effect = ['mock_domain', 'mock_username', 'mock_password']
+        with patch.object(SSRSExtractor, 'secret_manager', mock_secret_manager):
+            self.extractor = SSRSExtractor()
+        self.extractor.retry_policy.backoff_factor = 0
+        self.extractor.chunk_size = 4
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output_dir.cleanup)
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_extract_streams_chunks_to_file(self, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.history = []
+        mock_response.iter_content.return_value = [b"col1,", b"col2\n", b"", b"1,2\n"]
+        mock_get.return_value = mock_response
+
+        output_path = self.extractor.extract("ed_events", output_path=self.output_dir.name)
+
+        mock_get.assert_called_with(ANY, stream=True, headers={})
+        mock_response.iter_content.assert_called_with(chunk_size=4)
+        mock_response.close.assert_called_once()
+        with open(output_path, 'rb') as file:
+            self.assertEqual(file.read(), b"col1,col2\n1,2\n")
+        self.assertEqual(os.listdir(self.output_dir.name), ["outputfile.csv"])
+        self.assertEqual(self.extractor.get_metadata()['download']['bytes'], 14)
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_failed_download_keeps_previous_file(self, mock_get):
+        existing_path = os.path.join(self.output_dir.name, "outputfile.csv")
+        with open(existing_path, 'wb') as file:
+            file.write(b"previous")
+
+        def broken_stream(chunk_size):
+            yield b"partial"
+            raise ConnectionError("connection dropped")
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.history = []
+        mock_response.iter_content.side_effect = broken_stream
+        mock_get.return_value = mock_response
+
+        with self.assertRaises(ConnectionError):
+            self.extractor.extract("ed_events", output_path=self.output_dir.name)
+
+        with open(existing_path, 'rb') as file:
+            self.assertEqual(file.read(), b"previous")
+        self.assertEqual(os.listdir(self.output_dir.name), ["outputfile.csv"])
+
+
+class TestSSRSExtractorExtractMany(unittest.TestCase):
+
+    def setUp(self):
+        mock_secret_manager = Mock()
+        mock_secret_manager.get_secret.side_effect = ['mock_domain', 'mock_username', 'mock_password']
+        with patch.object(SSRSExtractor, 'secret_manager', mock_secret_manager):
+            self.extractor = SSRSExtractor()
+        self.extractor.retry_policy.backoff_factor = 0
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output_dir.cleanup)
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_results_follow_job_order_and_capture_errors(self, mock_get):
+        def respond(url, **kwargs):
+            response = Mock()
+            response.history = []
+            response.status_code = 500 if 'Observation' in url else 200
+            response.text = "render failed"
+            response.iter_content.return_value = [url.encode()]
+            return response
+        mock_get.side_effect = respond
+
+        results = self.extractor.extract_many(
+            ['ed_events',
+             'ed_observation',
+             {'data_source_name': 'trauma_one', 'parameters': {'Start_Date': '01/01/2024 00:00:00'}},
+             {'data_source_name': 'trauma_one', 'parameters': {'Start_Date': '02/01/2024 00:00:00'}},
+             'not_a_source'],
+            output_path=self.output_dir.name)
+
+        self.assertEqual([result.data_source_name for result in results],
+                         ['ed_events', 'ed_observation', 'trauma_one', 'trauma_one', 'not_a_source'])
+        self.assertEqual([result.succeeded for result in results], [True, False, True, True, False])
+        self.assertIsInstance(results[4].error, ValueError)
+        self.assertEqual(os.path.basename(results[0].path), 'ed_events.csv')
+        self.assertNotEqual(results[2].path, results[3].path)
+        with open(results[3].path, 'rb') as file:
+            self.assertIn(b'Start_Date=02%2F01%2F2024', file.read())
+
+        # Per-job parameters must not leak into the shared configuration
+        configured = self.extractor.config['ssrs']['data_sources']['trauma_one']['parameters']
+        self.assertEqual(configured['Start_Date'], '09/27/2023 00:00:00')
+
+    def test_differing_concurrency_caps_are_reported(self):
+        self.extractor.BASE_URL = 'https://cap-warning.example.com/ReportServer'
+        self.extractor.max_concurrency = 2
+        self.extractor._SSRSExtractor__server_slot()
+
+        mock_secret_manager = Mock()
+        mock_secret_manager.get_secret.side_effect = ['mock_domain', 'mock_username', 'mock_password']
+        with patch.object(SSRSExtractor, 'secret_manager', mock_secret_manager):
+            other = SSRSExtractor()
+        other.BASE_URL, other.max_concurrency = self.extractor.BASE_URL, 5
+        with self.assertLogs(level='WARNING') as logs:
+            slot = other._SSRSExtractor__server_slot()
+
+        self.assertIs(slot, self.extractor._SSRSExtractor__server_slot())
+        self.assertIn('capped at 2', logs.output[0])
+
+    def test_job_filenames_follow_the_output_format(self):
+        specs = self.extractor.prepare_jobs(
+            ['ed_events', {'data_source_name': 'ed_events', 'output_format': 'arrow'}, 'ed_observation'],
+            output_path=self.output_dir.name, output_format='parquet')
+
+        self.assertEqual([(spec['filename'], spec['output_format']) for spec in specs],
+                         [('ed_events_0.parquet', 'parquet'), ('ed_events_1.arrow', 'arrow'),
+                          ('ed_observation.parquet', 'parquet')])
+        with self.assertRaises(ValueError):
+            self.extractor.prepare_jobs(['ed_events'], output_format='xlsx')
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_concurrency_is_capped_per_server(self, mock_get):
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+
+        def respond(url, **kwargs):
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.01)
+            with lock:
+                state['active'] -= 1
+            response = Mock()
+            response.status_code = 200
+            response.history = []
+            response.iter_content.return_value = [b"data"]
+            return response
+        mock_get.side_effect = respond
+
+        jobs = [{'data_source_name': 'ed_events', 'parameters': {'Start_Date': str(day)}} for day in range(12)]
+        results = self.extractor.extract_many(jobs, output_path=self.output_dir.name, max_workers=12)
+
+        self.assertTrue(all(result.succeeded for result in results))
+        self.assertLessEqual(state['peak'], self.extractor.max_concurrency)
+
+
+class TestSSRSExtractorRetry(unittest.TestCase):
+
+    def setUp(self):
+        mock_secret_manager = Mock()
+        mock_secret_manager.get_secret.side_effect = ['mock_domain', 'mock_username', 'mock_password']
+        with patch.object(SSRSExtractor, 'secret_manager', mock_secret_manager):
+            self.extractor = SSRSExtractor()
+        self.extractor.retry_policy.backoff_factor = 0
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output_dir.cleanup)
+
+    @staticmethod
+    def _response(status_code, chunks=(), headers=None, text=""):
+        response = Mock()
+        response.status_code = status_code
+        response.history = []
+        response.headers = headers or {}
+        response.text = text
+        response.iter_content.return_value = list(chunks)
+        return response
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_transient_status_is_retried(self, mock_get):
+        mock_get.side_effect = [self._response(503, text="busy"), self._response(200, [b"a,b\n"])]
+
+        output_path = self.extractor.extract("ed_events", output_path=self.output_dir.name)
+
+        self.assertEqual(mock_get.call_count, 2)
+        with open(output_path, 'rb') as file:
+            self.assertEqual(file.read(), b"a,b\n")
+        self.assertEqual(self.extractor.get_metadata()['download']['attempts'], 2)
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_permanent_status_is_not_retried(self, mock_get):
+        mock_get.return_value = self._response(404, text="not found")
+
+        with self.assertRaises(SSRSRequestError) as context:
+            self.extractor.extract("ed_events", output_path=self.output_dir.name)
+
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(os.listdir(self.output_dir.name), [])
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_interrupted_download_resumes_with_range_request(self, mock_get):
+        def dropped_stream(chunk_size):
+            yield b"0123"
+            raise requests.exceptions.ChunkedEncodingError("connection dropped")
+
+        first = self._response(200, headers={'Accept-Ranges': 'bytes', 'ETag': '"v1"'})
+        first.iter_content.side_effect = dropped_stream
+        second = self._response(206, [b"4567"], headers={'Content-Range': 'bytes 4-7/8'})
+        mock_get.side_effect = [first, second]
+
+        output_path = self.extractor.extract("ed_events", output_path=self.output_dir.name)
+
+        self.assertEqual(mock_get.call_args[1]['headers'], {'Range': 'bytes=4-', 'If-Range': '"v1"'})
+        with open(output_path, 'rb') as file:
+            self.assertEqual(file.read(), b"01234567")
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_full_response_to_range_request_restarts_download(self, mock_get):
+        def dropped_stream(chunk_size):
+            yield b"stale"
+            raise requests.exceptions.ConnectionError("connection reset")
+
+        first = self._response(200, headers={'Accept-Ranges': 'bytes'})
+        first.iter_content.side_effect = dropped_stream
+        mock_get.side_effect = [first, self._response(200, [b"fresh report"])]
+
+        output_path = self.extractor.extract("ed_events", output_path=self.output_dir.name)
+
+        with open(output_path, 'rb') as file:
+            self.assertEqual(file.read(), b"fresh report")
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_download_without_validator_is_not_resumed(self, mock_get):
+        def dropped_stream(chunk_size):
+            yield b"0123"
+            raise requests.exceptions.ChunkedEncodingError("connection dropped")
+
+        first = self._response(200, headers={'Accept-Ranges': 'bytes'})
+        first.iter_content.side_effect = dropped_stream
+        mock_get.side_effect = [first, self._response(200, [b"01234567"])]
+
+        output_path = self.extractor.extract("ed_events", output_path=self.output_dir.name)
+
+        self.assertEqual(mock_get.call_args[1]['headers'], {})
+        with open(output_path, 'rb') as file:
+            self.assertEqual(file.read(), b"01234567")
+
+    def test_retry_sets_number_of_attempts(self):
+        self.extractor.retry(5)
+        self.assertEqual(self.extractor.retry_policy.max_attempts, 6)
+
+
+class TestSSRSExtractorCache(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output_dir.cleanup)
+        mock_secret_manager = Mock()
+        mock_secret_manager.get_secret.side_effect = ['mock_domain', 'mock_username', 'mock_password']
+        with patch.object(SSRSExtractor, 'secret_manager', mock_secret_manager):
+            self.extractor = SSRSExtractor()
+        self.extractor.cache = ExtractionCache(os.path.join(self.output_dir.name, 'cache'), ttl=60)
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_repeated_requests_are_served_from_cache(self, mock_get):
+        def respond(url, **kwargs):
+            response = Mock()
+            response.status_code = 200
+            response.history = []
+            response.headers = {}
+            response.iter_content.return_value = [url.encode()]
+            return response
+        mock_get.side_effect = respond
+
+        first = self.extractor.extract("ed_events", self.output_dir.name, "first.csv")
+        second = self.extractor.extract("ed_events", self.output_dir.name, "second.csv")
+        self.extractor.extract("ed_events", self.output_dir.name, "third.csv", Start_Date="01/01/2024 00:00:00")
+
+        self.assertEqual(mock_get.call_count, 2)
+        with open(first, 'rb') as file_one, open(second, 'rb') as file_two:
+            self.assertEqual(file_one.read(), file_two.read())
+        cache_stats = self.extractor.get_metadata()['cache']
+        self.assertEqual((cache_stats['hits'], cache_stats['misses']), (1, 2))
+
+
+class TestSSRSExtractorIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output_dir.cleanup)
+        mock_secret_manager = Mock()
+        mock_secret_manager.get_secret.side_effect = ['mock_domain', 'mock_username', 'mock_password']
+        with patch.object(SSRSExtractor, 'secret_manager', mock_secret_manager):
+            self.extractor = SSRSExtractor()
+        self.extractor.watermark_store = WatermarkStore(os.path.join(self.output_dir.name, 'watermarks.db'))
+        # The parsed config.yml is shared by every extractor, so the change must not outlive the test
+        patcher = patch.dict(self.extractor.config['ssrs']['data_sources']['ed_events'], {'incremental': {
+            'start_parameter': 'Start_Date', 'end_parameter': 'End_Date', 'format': '%Y-%m-%d'}})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _respond(self, url, **kwargs):
+        response = Mock()
+        response.status_code = 200
+        response.history = []
+        response.headers = {}
+        response.iter_content.return_value = [b"data"]
+        return response
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_jobs_moving_one_watermark_do_not_overlap(self, mock_get):
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+
+        def respond(url, **kwargs):
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.02)
+            with lock:
+                state['active'] -= 1
+            return self._respond(url)
+        mock_get.side_effect = respond
+
+        results = self.extractor.extract_many(['ed_events'] * 3, output_path=self.output_dir.name, max_workers=3)
+
+        self.assertTrue(all(result.succeeded for result in results))
+        self.assertEqual(state['peak'], 1)
+        # A backfill sets its window explicitly and leaves the watermark alone, so it may overlap
+        backfill = self.extractor.prepare_jobs([{'data_source_name': 'ed_events', 'parameters': {'Start_Date': '2024-01-01'}}])
+        self.assertFalse(backfill[0]['advances_watermark'])
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_window_starts_at_last_watermark(self, mock_get):
+        mock_get.side_effect = self._respond
+        today = datetime.now().strftime('%Y-%m-%d')
+
+        self.extractor.extract("ed_events", output_path=self.output_dir.name)
+        first_url = mock_get.call_args[0][0]
+        self.extractor.set_extraction_point('2024-01-01', 'ed_events')
+        self.extractor.extract("ed_events", output_path=self.output_dir.name)
+        second_url = mock_get.call_args[0][0]
+
+        self.assertIn('Start_Date=09%2F27%2F2023', first_url)
+        self.assertIn(f'End_Date={today}', first_url)
+        self.assertIn('Start_Date=2024-01-01', second_url)
+        self.assertEqual(self.extractor.get_last_extraction_point('ed_events'), today)
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_explicit_window_does_not_move_watermark(self, mock_get):
+        mock_get.side_effect = self._respond
+        self.extractor.set_extraction_point('2024-01-01', 'ed_events')
+
+        self.extractor.extract("ed_events", output_path=self.output_dir.name, Start_Date='2020-01-01')
+
+        self.assertIn('Start_Date=2020-01-01', mock_get.call_args[0][0])
+        self.assertEqual(self.extractor.get_last_extraction_point('ed_events'), '2024-01-01')
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_failed_extraction_does_not_move_watermark(self, mock_get):
+        mock_get.return_value = Mock(status_code=404, history=[], headers={}, text="missing")
+
+        with self.assertRaises(SSRSRequestError):
+            self.extractor.extract("ed_events", output_path=self.output_dir.name)
+
+        self.assertIsNone(self.extractor.get_last_extraction_point('ed_events'))
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_streamed_watermark_waits_for_commit(self, mock_get):
+        response = self._respond(None)
+        response.raw = io.BytesIO(b"\xef\xbb\xbfEvent\r\n1\r\n")
+        mock_get.return_value = response
+
+        self.assertEqual(list(self.extractor.extract_batches("ed_events")), [[{'Event': '1'}]])
+        self.assertIsNone(self.extractor.get_last_extraction_point('ed_events'))
+
+        self.extractor.commit_extraction_points()
+        self.assertEqual(self.extractor.get_last_extraction_point('ed_events'), datetime.now().strftime('%Y-%m-%d'))
+
+
+class TestSSRSExtractorBatches(unittest.TestCase):
+
+    def setUp(self):
+        mock_secret_manager = Mock()
+        mock_secret_manager.get_secret.side_effect = ['mock_domain', 'mock_username', 'mock_password']
+        with patch.object(SSRSExtractor, 'secret_manager', mock_secret_manager):
+            self.extractor = SSRSExtractor()
+        self.extractor.retry_policy.backoff_factor = 0
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_report_is_streamed_as_record_batches(self, mock_get):
+        busy = Mock(status_code=503, history=[], text="busy")
+        response = Mock(status_code=200, history=[])
+        response.raw = io.BytesIO(b'\xef\xbb\xbfid,note\r\n1,"multi\nline"\r\n2,b\r\n3,c\r\n')
+        mock_get.side_effect = [busy, response]
+
+        batches = list(self.extractor.extract_batches("ed_events", batch_size=2))
+
+        self.assertEqual(batches, [[{'id': '1', 'note': 'multi\nline'}, {'id': '2', 'note': 'b'}],
+                                   [{'id': '3', 'note': 'c'}]])
+        self.assertEqual(mock_get.call_count, 2)
+        response.close.assert_called_once()
+
+
+
+class TestSSRSExtractorColumnar(unittest.TestCase):
+
+    def setUp(self):
+        mock_secret_manager = Mock()
+        mock_secret_manager.get_secret.side_effect = ['mock_domain', 'mock_username', 'mock_password']
+        with patch.object(SSRSExtractor, 'secret_manager', mock_secret_manager):
+            self.extractor = SSRSExtractor()
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output_dir.cleanup)
+
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.require_pyarrow')
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.write_columnar')
+    @patch('etl.plugins.extractors.ssrs_extractor_plugin.plugin.requests.Session.get')
+    def test_parquet_output_converts_the_response_stream(self, mock_get, mock_write_columnar, mock_require_pyarrow):
+        response = Mock(status_code=200, history=[])
+        mock_get.return_value = response
+        mock_write_columnar.return_value = {'rows': 2, 'batches': 1, 'row_groups': 1, 'bytes': 512}
+
+        output_path = self.extractor.extract("ed_events", output_path=self.output_dir.name, output_format='parquet')
+
+        self.assertEqual(output_path, os.path.join(self.output_dir.name, "outputfile.parquet"))
+        mock_write_columnar.assert_called_once_with(response.raw, output_path, 'parquet', compression='zstd',
+                                                    block_size=self.extractor.chunk_size, row_group_size=131072,
+                                                    column_types={})
+        self.assertTrue(response.raw.decode_content)
+        response.close.assert_called_once()
+        response.iter_content.assert_not_called()
+        self.assertEqual(self.extractor.get_metadata()['download']['rows'], 2)
+
+    def test_unknown_output_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.extractor.extract("ed_events", output_path=self.output_dir.name, output_format='xlsx')
+
+
 if __name__ == '__main__':
     unittest.main()
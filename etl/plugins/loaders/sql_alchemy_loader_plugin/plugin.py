@@ -1,13 +1,66 @@
-from sqlalchemy import create_engine
+import io
+import os
+import csv
+import time
+import uuid
+import logging
+import itertools
+import contextlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from sqlalchemy import table as table_clause, column, text
 from sqlalchemy.orm import sessionmaker
 
 from etl.base.base_loader import BaseLoader
+from etl.utilities.engine_registry import get_engine
+from etl.utilities.metrics import metrics_registry
 from config_management.factory import get_secret_manager
 
+DEFAULT_CHUNK_SIZE = 50000  # rows per COPY statement and commit
+DEFAULT_BATCH_SIZE = 1000  # rows per INSERT batch and commit
+
+LOAD_MODES = ('orm', 'copy', 'batch', 'merge')
+
+
 class SQLAlchemyLoader(BaseLoader):
-    def __init__(self, connection_string):
-        self.engine = create_engine(connection_string)
+    """
+    Loader writing data into a relational database through SQLAlchemy.
+
+    The following load modes are available:
+
+    * ``orm`` (default): ``data`` is a list of SQLAlchemy model objects saved with ``bulk_save_objects``.
+    * ``copy``: ``data`` is a CSV file path or an iterator of rows or dicts, streamed into PostgreSQL with
+      ``COPY ... FROM STDIN`` in chunks of ``chunk_size`` rows, each committed on its own. Neither ORM
+      objects nor the whole file are ever held in memory.
+    * ``batch``: ``data`` is a CSV file path or an iterator of tuples or dicts, inserted with Core
+      ``INSERT`` statements in batches of ``batch_size`` rows, each committed on its own. Batches are
+      sent with ``executemany`` or, with ``multirow``, as a single multi-row ``VALUES`` statement. This
+      is the bulk path for MySQL, which has no COPY; with ``local_infile`` enabled, CSV files are
+      handed to MySQL's ``LOAD DATA LOCAL INFILE`` instead.
+    * ``merge``: ``data`` is loaded like in the modes above into a temporary staging table, which is
+      then upserted into the target with one set-based ``INSERT ... ON CONFLICT`` (PostgreSQL) or
+      ``INSERT ... ON DUPLICATE KEY UPDATE`` (MySQL) keyed on ``key_columns``, all in one transaction.
+
+    The engine comes from the process-wide engine registry, so loaders and connection managers for
+    the same database share one connection pool; ``engine_options`` (e.g. ``pool_size``) configure it.
+    """
+
+    def __init__(self, connection_string, mode='orm', chunk_size=DEFAULT_CHUNK_SIZE, batch_size=DEFAULT_BATCH_SIZE,
+                 multirow=False, local_infile=False, engine_options: Optional[Dict[str, Any]] = None):
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unsupported load mode: {mode}. Supported modes are: {', '.join(LOAD_MODES)}")
+        engine_options = dict(engine_options or {})
+        if local_infile:
+            # mysql-connector refuses LOAD DATA LOCAL INFILE unless the client opts in when connecting
+            engine_options['connect_args'] = {**engine_options.get('connect_args', {}), 'allow_local_infile': True}
+        self.engine = get_engine(connection_string, **engine_options)
         self.Session = sessionmaker(bind=self.engine)
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.multirow = multirow
+        self.local_infile = local_infile
+        self.last_load_stats: Dict[str, float] = {}
 
     def connect(self):
         pass  # No explicit connection setup is needed with SQLAlchemy
@@ -15,7 +68,45 @@ class SQLAlchemyLoader(BaseLoader):
     def validate(self, data):
         pass  # Implement data validation logic if needed
 
-    def load(self, data):
+    def load(self, data, table: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+             mode: Optional[str] = None, header: Optional[bool] = None,
+             key_columns: Optional[Sequence[str]] = None):
+        """
+        Load the data to the destination using the configured (or given) load mode.
+
+        Args:
+            data: ORM objects for ``orm`` mode; a CSV file path or an iterable of rows otherwise.
+                Rows may be sequences of values, dicts (``batch`` mode) or already formatted CSV lines.
+            table (str, optional): The target table, optionally schema-qualified. Required for all but ``orm``.
+            columns (sequence, optional): The target columns. Defaults to the CSV header for files.
+            mode (str, optional): Overrides the loader's mode for this call.
+            header (bool, optional): Whether the first row is a header. Defaults to True for files
+                and False for iterables.
+            key_columns (sequence, optional): The columns identifying a row. Required for ``merge``.
+
+        Returns:
+            dict: Load statistics (rows, chunks or batches, seconds, rows_per_second) for all but ``orm``.
+        """
+        mode = mode or self.mode
+        if mode == 'orm':
+            return self._load_orm(data)
+        if mode == 'copy':
+            if not table:
+                raise ValueError("A target table must be specified for COPY loads.")
+            return self._load_copy(data, table, columns, header)
+        if mode == 'batch':
+            if not table:
+                raise ValueError("A target table must be specified for batch loads.")
+            if self.local_infile and isinstance(data, (str, os.PathLike)) and self.engine.dialect.name == 'mysql':
+                return self._load_data_infile(data, table, columns, header)
+            return self._load_batches(data, table, columns, header)
+        if mode == 'merge':
+            if not table or not key_columns:
+                raise ValueError("A target table and key_columns must be specified for merge loads.")
+            return self._load_merge(data, table, columns, header, key_columns)
+        raise ValueError(f"Unsupported load mode: {mode}. Supported modes are: {', '.join(LOAD_MODES)}")
+
+    def _load_orm(self, data):
         # Assuming data is a list of SQLAlchemy model objects
         session = self.Session()
         try:
@@ -27,5 +118,322 @@ class SQLAlchemyLoader(BaseLoader):
         finally:
             session.close()
 
+    def _quote_table(self, table: str) -> str:
+        """Quote a possibly schema-qualified table name for the engine's dialect."""
+        preparer = self.engine.dialect.identifier_preparer
+        return ".".join(preparer.quote(part) for part in table.split("."))
+
+    def _quote_columns(self, columns: Sequence[str]) -> str:
+        preparer = self.engine.dialect.identifier_preparer
+        return ", ".join(preparer.quote(column) for column in columns)
+
+    @staticmethod
+    def _iter_rows(data: Union[str, os.PathLike, Iterable], header: Optional[bool]) -> Iterator[List[Any]]:
+        """
+        Yield the rows of a CSV file or iterable one at a time.
+
+        The first yielded item is the header (or None if there is none). Text lines are parsed with the
+        csv module so quoted fields spanning several lines are kept intact.
+        """
+        if isinstance(data, (str, os.PathLike)):
+            with open(data, 'r', newline='', encoding='utf-8-sig') as file:
+                reader = csv.reader(file)
+                yield (next(reader, None) if header is not False else None)
+                yield from reader
+            return
+
+        iterator = iter(data)
+        first = next(iterator, None)
+        if first is None:
+            yield None
+            return
+        if isinstance(first, str):
+            # Lines of CSV text; re-chain the first line and let the csv module handle quoting
+            def lines():
+                yield first
+                yield from iterator
+            reader = csv.reader(lines())
+            yield (next(reader, None) if header else None)
+            yield from reader
+            return
+        if header:
+            yield list(first)
+        else:
+            yield None
+            yield first
+        yield from iterator
+
+    def _load_copy(self, data, table: str, columns: Optional[Sequence[str]], header: Optional[bool],
+                   connection=None) -> Dict[str, float]:
+        """
+        Stream rows into PostgreSQL with ``COPY FROM STDIN``, one commit per chunk.
+
+        Rows are serialized into an in-memory CSV buffer of at most ``chunk_size`` rows, so memory use
+        is bounded by the chunk size rather than the size of the input. Chunks committed before a
+        failure stay committed; the statistics logged before the error tell how far the load got.
+        When a DBAPI ``connection`` is given, the chunks join the caller's transaction instead.
+        """
+        if self.engine.dialect.name != 'postgresql':
+            raise ValueError(f"COPY loads require PostgreSQL, not {self.engine.dialect.name}.")
+
+        rows = self._iter_rows(data, header)
+        header_row = next(rows)
+        first = next(rows, None)
+        if first is None:
+            return {'rows': 0, 'chunks': 0, 'seconds': 0.0, 'rows_per_second': 0.0}
+        if isinstance(first, dict):
+            # Records keyed by column name, e.g. batches streamed by an extractor
+            columns = list(columns or first.keys())
+            rows = ([record.get(name) for name in columns] for record in itertools.chain([first], rows))
+        else:
+            columns = columns or header_row
+            rows = itertools.chain([first], rows)
+        column_list = f" ({self._quote_columns(columns)})" if columns else ""
+        sql = f"COPY {self._quote_table(table)}{column_list} FROM STDIN WITH (FORMAT csv)"
+
+        stats = {'rows': 0, 'chunks': 0, 'seconds': 0.0, 'rows_per_second': 0.0}
+        started = time.monotonic()
+        commit = connection is None
+        if commit:
+            connection = self.engine.raw_connection()
+        try:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator='\n')
+            pending = 0
+            for row in rows:
+                writer.writerow(row)
+                pending += 1
+                if pending >= self.chunk_size:
+                    self._copy_chunk(connection, sql, buffer, pending, stats, commit)
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer, lineterminator='\n')
+                    pending = 0
+            if pending:
+                self._copy_chunk(connection, sql, buffer, pending, stats, commit)
+        finally:
+            if commit:
+                connection.close()
+            stats['seconds'] = time.monotonic() - started
+            stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else float(stats['rows'])
+            self.last_load_stats = stats
+            logging.info(f"COPY into {table}: {stats['rows']} rows in {stats['chunks']} chunks, "
+                         f"{stats['seconds']:.1f}s ({stats['rows_per_second']:.0f} rows/s)")
+        return stats
+
+    @staticmethod
+    def _copy_chunk(connection, sql: str, buffer: io.StringIO, row_count: int, stats: Dict[str, float],
+                    commit: bool = True) -> None:
+        """Send one chunk through ``copy_expert`` and commit it, rolling back the chunk on failure."""
+        chunk_started = time.monotonic()
+        buffer.seek(0)
+        cursor = connection.cursor()
+        try:
+            cursor.copy_expert(sql, buffer)
+            if commit:
+                connection.commit()
+        except Exception:
+            if commit:
+                connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        metrics_registry.observe('load_batch_seconds', time.monotonic() - chunk_started, plugin='SQLAlchemyLoader', mode='copy')
+        stats['rows'] += row_count
+        stats['chunks'] += 1
+
+    def _table_clause(self, table: str, columns: Sequence[str]):
+        """Build a lightweight Core table for INSERT statements without reflecting the database."""
+        schema, _, name = table.rpartition(".")
+        return table_clause(name, *[column(name) for name in columns], schema=schema or None)
+
+    def _load_batches(self, data, table: str, columns: Optional[Sequence[str]], header: Optional[bool],
+                      connection=None) -> Dict[str, float]:
+        """
+        Insert rows with Core INSERT statements in batches of ``batch_size``, one commit per batch.
+
+        Tuples are matched to ``columns`` (or the CSV header); dicts supply their own keys. Empty
+        fields read from CSV files are loaded as NULL, like COPY does. When a SQLAlchemy
+        ``connection`` is given, the batches join the caller's transaction instead.
+        """
+        from_file = isinstance(data, (str, os.PathLike))
+        rows = self._iter_rows(data, header)
+        header_row = next(rows)
+        columns = list(columns or header_row or [])
+
+        stats = {'rows': 0, 'batches': 0, 'batch_size': self.batch_size, 'seconds': 0.0, 'rows_per_second': 0.0,
+                 'min_batch_seconds': 0.0, 'max_batch_seconds': 0.0}
+        started = time.monotonic()
+        insert = None
+        commit = connection is None
+        try:
+            with (self.engine.connect() if commit else contextlib.nullcontext(connection)) as connection:
+                batch = []
+                for row in rows:
+                    if not isinstance(row, dict):
+                        if not columns:
+                            raise ValueError("Columns must be specified when loading rows without a header.")
+                        row = {name: (None if from_file and value == '' else value) for name, value in zip(columns, row)}
+                    elif insert is None and not columns:
+                        columns = list(row.keys())
+                    batch.append(row)
+                    if len(batch) >= self.batch_size:
+                        insert = insert if insert is not None else self._table_clause(table, columns).insert()
+                        self._insert_batch(connection, insert, batch, stats, commit)
+                        batch = []
+                if batch:
+                    insert = insert if insert is not None else self._table_clause(table, columns).insert()
+                    self._insert_batch(connection, insert, batch, stats, commit)
+        finally:
+            stats['seconds'] = time.monotonic() - started
+            stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else float(stats['rows'])
+            self.last_load_stats = stats
+            logging.info(f"Batched INSERT into {table}: {stats['rows']} rows in {stats['batches']} batches of "
+                         f"{self.batch_size}, {stats['seconds']:.1f}s ({stats['rows_per_second']:.0f} rows/s, "
+                         f"batch latency {stats['min_batch_seconds']:.3f}-{stats['max_batch_seconds']:.3f}s)")
+        return stats
+
+    def _insert_batch(self, connection, insert, batch: List[Dict[str, Any]], stats: Dict[str, float],
+                      commit: bool = True) -> None:
+        """Execute and commit one batch, recording its latency."""
+        batch_started = time.monotonic()
+        try:
+            if self.multirow:
+                connection.execute(insert.values(batch))
+            else:
+                connection.execute(insert, batch)
+            if commit:
+                connection.commit()
+        except Exception:
+            if commit:
+                connection.rollback()
+            raise
+        latency = time.monotonic() - batch_started
+        metrics_registry.observe('load_batch_seconds', latency, plugin=type(self).__name__, mode='batch')
+        stats['min_batch_seconds'] = latency if not stats['batches'] else min(stats['min_batch_seconds'], latency)
+        stats['max_batch_seconds'] = max(stats['max_batch_seconds'], latency)
+        stats['rows'] += len(batch)
+        stats['batches'] += 1
+
+    def _load_data_infile(self, path, table: str, columns: Optional[Sequence[str]], header: Optional[bool]) -> Dict[str, float]:
+        """
+        Hand a CSV file to MySQL's ``LOAD DATA LOCAL INFILE`` in a single statement.
+
+        Backslashes are loaded as they are and empty fields as NULL, so the result matches batch mode.
+        """
+        with open(path, 'rb') as file:
+            sample = file.read(65536)
+        line_terminator = '\\r\\n' if b'\r\n' in sample else '\\n'
+        rows = self._iter_rows(path, header)
+        header_row = next(rows)
+        rows.close()
+        columns = list(columns or header_row or [])
+        if not columns:
+            raise ValueError("Columns must be specified when loading rows without a header.")
+        # Read every field into a user variable so empty ones can be turned into NULL
+        preparer = self.engine.dialect.identifier_preparer
+        variables = ", ".join(f"@c{index}" for index in range(len(columns)))
+        assignments = ", ".join(f"{preparer.quote(name)} = NULLIF(@c{index}, '')" for index, name in enumerate(columns))
+        ignore_header = " IGNORE 1 LINES" if header is not False else ""
+        sql = text(
+            f"LOAD DATA LOCAL INFILE :path INTO TABLE {self._quote_table(table)} "
+            f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            f"LINES TERMINATED BY '{line_terminator}'{ignore_header} ({variables}) SET {assignments}"
+        )
+
+        started = time.monotonic()
+        with self.engine.begin() as connection:
+            result = connection.execute(sql, {'path': os.fspath(path)})
+        seconds = time.monotonic() - started
+        stats = {'rows': result.rowcount, 'batches': 1, 'seconds': seconds,
+                 'rows_per_second': result.rowcount / seconds if seconds > 0 else float(result.rowcount)}
+        self.last_load_stats = stats
+        logging.info(f"LOAD DATA into {table}: {stats['rows']} rows, {seconds:.1f}s ({stats['rows_per_second']:.0f} rows/s)")
+        return stats
+
+    def _load_merge(self, data, table: str, columns: Optional[Sequence[str]], header: Optional[bool],
+                    key_columns: Sequence[str]) -> Dict[str, float]:
+        """
+        Upsert rows into ``table`` through a temporary staging table.
+
+        The rows are bulk-loaded into a session-local staging table shaped like the target (COPY on
+        PostgreSQL, batched INSERTs on MySQL), and a single set-based statement then inserts new rows and
+        updates existing ones. Staging and merge share one transaction, so the target is only written by
+        the final statement and readers never see a partial merge. The staging table is dropped when the
+        transaction commits or rolls back on PostgreSQL, and before the connection goes back to the pool,
+        whether or not the merge succeeded, on MySQL.
+
+        On PostgreSQL, conflicts are detected on ``key_columns``, which need a unique index, and the last
+        staged row wins when the input repeats a key. MySQL resolves conflicts on the target's primary
+        and unique keys, which should match ``key_columns``.
+        """
+        dialect = self.engine.dialect.name
+        if dialect not in ('postgresql', 'mysql'):
+            raise ValueError(f"Merge loads require PostgreSQL or MySQL, not {dialect}.")
+
+        from_file = isinstance(data, (str, os.PathLike))
+        rows = self._iter_rows(data, header)
+        header_row = next(rows)
+        first = next(rows, None)
+        if first is None:
+            return {'rows': 0, 'merged': 0, 'seconds': 0.0, 'rows_per_second': 0.0}
+        columns = list(columns or header_row or (first.keys() if isinstance(first, dict) else []))
+        if not columns:
+            raise ValueError("Columns must be specified when merging rows without a header.")
+        missing = [key for key in key_columns if key not in columns]
+        if missing:
+            raise ValueError(f"Key columns {missing} are not among the loaded columns {columns}.")
+
+        rows = itertools.chain([first], rows)
+        if from_file:
+            rows = ([None if value == '' else value for value in row] for row in rows)
+
+        target = self._quote_table(table)
+        staging_name = f"stg_{table.rpartition('.')[2]}_{uuid.uuid4().hex[:8]}"
+        staging = self._quote_table(staging_name)
+        column_list = self._quote_columns(columns)
+        updates = [name for name in columns if name not in key_columns]
+        preparer = self.engine.dialect.identifier_preparer
+
+        if dialect == 'postgresql':
+            create_staging = f"CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS SELECT {column_list} FROM {target} WITH NO DATA"
+            # DISTINCT ON keeps one row per key (the last one staged) so ON CONFLICT never hits a row twice
+            key_list = self._quote_columns(key_columns)
+            if updates:
+                on_conflict = "DO UPDATE SET " + ", ".join(
+                    f"{preparer.quote(name)} = EXCLUDED.{preparer.quote(name)}" for name in updates)
+            else:
+                on_conflict = "DO NOTHING"
+            merge = (f"INSERT INTO {target} ({column_list}) "
+                     f"SELECT DISTINCT ON ({key_list}) {column_list} FROM {staging} ORDER BY {key_list}, ctid DESC "
+                     f"ON CONFLICT ({key_list}) {on_conflict}")
+        else:
+            create_staging = f"CREATE TEMPORARY TABLE {staging} SELECT {column_list} FROM {target} LIMIT 0"
+            assignments = updates or list(key_columns)  # a no-op assignment keeps existing rows untouched
+            merge = (f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {staging} "
+                     "ON DUPLICATE KEY UPDATE " + ", ".join(
+                         f"{preparer.quote(name)} = VALUES({preparer.quote(name)})" for name in assignments))
+
+        started = time.monotonic()
+        with self.engine.begin() as connection:
+            connection.execute(text(create_staging))
+            try:
+                if dialect == 'postgresql':
+                    staged = self._load_copy(rows, staging_name, columns, False, connection=connection.connection)
+                else:
+                    staged = self._load_batches(rows, staging_name, columns, False, connection=connection)
+                result = connection.execute(text(merge))
+            finally:
+                if dialect == 'mysql':
+                    # MySQL temporary tables outlive the transaction and would stay with the pooled connection
+                    connection.execute(text(f"DROP TEMPORARY TABLE IF EXISTS {staging}"))
+
+        seconds = time.monotonic() - started
+        stats = {'rows': staged['rows'], 'merged': result.rowcount, 'seconds': seconds,
+                 'rows_per_second': staged['rows'] / seconds if seconds > 0 else float(staged['rows'])}
+        self.last_load_stats = stats
+        logging.info(f"Merged {stats['rows']} staged rows into {table} ({stats['merged']} affected), "
+                     f"{seconds:.1f}s ({stats['rows_per_second']:.0f} rows/s)")
+        return stats
+
     def close(self):
         pass  # No explicit closing needed with SQLAlchemy
@@ -0,0 +1,279 @@
+# transformers/arrow_transformer.py
+import time
+import threading
+from abc import abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow is only needed once a transformer is created
+    pa = None
+
+from etl.base.base_transformer import BaseTransformer
+from etl.utilities.arrow_batches import to_arrow, from_arrow
+
+ROW_INDEX = '__row_index'  # temporary column recording the original row order
+DEFAULT_NULL_VALUES = ('',)  # strings treated as missing values by HandleNulls
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Arrow transformers require pyarrow. Install it with 'pip install pyarrow'.")
+
+
+def _string_columns(table: 'pa.Table', columns: Optional[Sequence[str]]) -> List[str]:
+    names = columns if columns is not None else table.column_names
+    return [name for name in names
+            if pa.types.is_string(table.schema.field(name).type) or pa.types.is_large_string(table.schema.field(name).type)]
+
+
+def _check_columns(table: 'pa.Table', columns: Sequence[str]) -> None:
+    missing = [name for name in columns if name not in table.column_names]
+    if missing:
+        raise KeyError(f"Columns not found in batch: {', '.join(missing)}")
+
+
+class ArrowTransformer(BaseTransformer):
+    """
+    Base class for transformers that work on whole columns of an Arrow table at once.
+
+    Subclasses implement ``transform_table``. ``transform`` converts the incoming batch to Arrow,
+    applies it and converts the result back to the kind of batch it was given, so the transformers
+    slot into a ``PipelineRunner`` between any extractor and loader. Chain several transformers with
+    ``TransformerChain`` to convert each batch only once.
+    """
+
+    def __init__(self) -> None:
+        _require_pyarrow()
+        self.stats = {'batches': 0, 'rows_in': 0, 'rows_out': 0, 'seconds': 0.0}
+        self._stats_lock = threading.Lock()
+
+    @abstractmethod
+    def transform_table(self, table: 'pa.Table') -> Optional['pa.Table']:
+        """Transform an Arrow table; returns the transformed table, or None to drop the batch."""
+        pass
+
+    def transform(self, batch: Any) -> Any:
+        """
+        Transforms one record batch.
+
+        Args:
+            batch: An Arrow record batch or table, a pandas data frame, a mapping of columns or a list of row dicts.
+
+        Returns:
+            The transformed batch, of the same kind as the one given, or None if it was dropped.
+        """
+        if batch is None or (isinstance(batch, list) and not batch):
+            return batch
+        started = time.perf_counter()
+        table, kind = to_arrow(batch)
+        result = self.transform_table(table)
+        with self._stats_lock:
+            self.stats['batches'] += 1
+            self.stats['rows_in'] += table.num_rows
+            self.stats['rows_out'] += result.num_rows if result is not None else 0
+            self.stats['seconds'] += time.perf_counter() - started
+        return from_arrow(result, kind) if result is not None else None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks can't be pickled; transformers are pickled to run in worker processes
+        return {name: value for name, value in self.__dict__.items() if not name.endswith('_lock')}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._stats_lock = threading.Lock()
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """
+        Retrieves metadata about the transformed data.
+
+        Returns:
+            dict: The number of batches, the rows going in and out and the seconds spent, under ``transform``.
+        """
+        with self._stats_lock:
+            return {'transform': dict(self.stats)}
+
+
+class TransformerChain(ArrowTransformer):
+    """
+    Applies several Arrow transformers in order, converting each batch to Arrow and back only once.
+
+    Attributes:
+        transformers (list): The transformers, applied in order.
+    """
+
+    def __init__(self, transformers: Sequence[ArrowTransformer]) -> None:
+        super().__init__()
+        self.transformers = list(transformers)
+
+    def transform_table(self, table: 'pa.Table') -> Optional['pa.Table']:
+        for transformer in self.transformers:
+            table = transformer.transform_table(table)
+            if table is None:
+                return None
+        return table
+
+
+class CastColumns(ArrowTransformer):
+    """
+    Casts columns to new Arrow types.
+
+    Attributes:
+        types (dict): Arrow types, or type names such as ``int64``, ``float64``, ``string``, ``date32`` or
+            ``timestamp[s]``, by column name.
+        safe (bool): Whether to fail on lossy casts (overflow, truncation) instead of performing them.
+    """
+
+    def __init__(self, types: Dict[str, Union[str, 'pa.DataType']], safe: bool = True) -> None:
+        super().__init__()
+        self.types = {name: pa.type_for_alias(target) if isinstance(target, str) else target
+                      for name, target in types.items()}
+        self.safe = safe
+
+    def transform_table(self, table: 'pa.Table') -> 'pa.Table':
+        _check_columns(table, list(self.types))
+        for name, target in self.types.items():
+            index = table.column_names.index(name)
+            table = table.set_column(index, pa.field(name, target), pc.cast(table.column(index), target, safe=self.safe))
+        return table
+
+
+class HandleNulls(ArrowTransformer):
+    """
+    Normalizes missing values: null-like strings become nulls, nulls are filled with defaults and rows
+    missing required values are dropped, in that order.
+
+    Attributes:
+        null_values (tuple): Strings treated as missing in string columns, e.g. ``""`` or ``"N/A"``.
+        fill (dict): Replacement values for nulls, by column name.
+        required (list): Columns whose rows are dropped when they are still null after filling.
+    """
+
+    def __init__(self,
+                 null_values: Sequence[str] = DEFAULT_NULL_VALUES,
+                 fill: Optional[Dict[str, Any]] = None,
+                 required: Optional[Sequence[str]] = None) -> None:
+        super().__init__()
+        self.null_values = tuple(null_values)
+        self.fill = dict(fill or {})
+        self.required = list(required or [])
+
+    def transform_table(self, table: 'pa.Table') -> 'pa.Table':
+        _check_columns(table, list(self.fill) + self.required)
+        if self.null_values:
+            value_set = pa.array(self.null_values, type=pa.string())
+            for name in _string_columns(table, None):
+                index = table.column_names.index(name)
+                column = table.column(index)
+                missing = pc.is_in(column, value_set=value_set.cast(column.type))
+                table = table.set_column(index, name, pc.if_else(missing, pa.scalar(None, column.type), column))
+        for name, value in self.fill.items():
+            index = table.column_names.index(name)
+            column = table.column(index)
+            table = table.set_column(index, name, pc.fill_null(column, pa.scalar(value).cast(column.type)))
+        if self.required:
+            keep = pc.is_valid(table.column(self.required[0]))
+            for name in self.required[1:]:
+                keep = pc.and_(keep, pc.is_valid(table.column(name)))
+            table = table.filter(keep)
+        return table
+
+
+class TrimStrings(ArrowTransformer):
+    """
+    Strips leading and trailing whitespace (or the given characters) from string columns.
+
+    Attributes:
+        columns (list, optional): The columns to trim; all string columns when not given.
+        characters (str, optional): The characters to strip instead of whitespace.
+    """
+
+    def __init__(self, columns: Optional[Sequence[str]] = None, characters: Optional[str] = None) -> None:
+        super().__init__()
+        self.columns = list(columns) if columns is not None else None
+        self.characters = characters
+
+    def transform_table(self, table: 'pa.Table') -> 'pa.Table':
+        if self.columns is not None:
+            _check_columns(table, self.columns)
+        for name in _string_columns(table, self.columns):
+            index = table.column_names.index(name)
+            column = table.column(index)
+            trimmed = pc.utf8_trim(column, characters=self.characters) if self.characters else pc.utf8_trim_whitespace(column)
+            table = table.set_column(index, name, trimmed)
+        return table
+
+
+class Deduplicate(ArrowTransformer):
+    """
+    Drops rows repeating the key of an earlier row, keeping the original row order.
+
+    Rows with the same values in ``subset`` are duplicates; null keys are equal to one another within a
+    batch. With ``across_batches``, the keys seen so far are remembered and rows repeating a key from
+    an earlier batch are dropped too; the keys are kept in an Arrow table, so memory grows with the
+    number of distinct keys, and rows with a null key are never matched against earlier batches.
+
+    Attributes:
+        subset (list, optional): The key columns; all columns when not given.
+        keep (str): ``first`` or ``last``, the occurrence kept within a batch.
+        across_batches (bool): Whether to also drop keys seen in earlier batches.
+    """
+
+    def __init__(self, subset: Optional[Sequence[str]] = None, keep: str = 'first', across_batches: bool = False) -> None:
+        super().__init__()
+        if keep not in ('first', 'last'):
+            raise ValueError(f"Unsupported keep: {keep}. Supported values are: first, last")
+        self.subset = list(subset) if subset is not None else None
+        self.keep = keep
+        self.across_batches = across_batches
+        self._seen: Optional['pa.Table'] = None
+        self._seen_lock = threading.Lock()
+
+    def transform_table(self, table: 'pa.Table') -> 'pa.Table':
+        keys = self.subset if self.subset is not None else table.column_names
+        _check_columns(table, keys)
+        indexed = table.append_column(ROW_INDEX, pa.array(range(table.num_rows), type=pa.int64()))
+        aggregate = 'min' if self.keep == 'first' else 'max'
+        grouped = indexed.group_by(keys, use_threads=False).aggregate([(ROW_INDEX, aggregate)])
+        if self.across_batches:
+            with self._seen_lock:
+                if self._seen is not None:
+                    # The join reorders rows; the row index restores the original order below
+                    grouped = grouped.join(self._seen, keys=keys, join_type='left anti')
+                new_keys = grouped.select(keys)
+                self._seen = new_keys if self._seen is None else pa.concat_tables([self._seen, new_keys.cast(self._seen.schema)])
+        rows = pc.sort_indices(grouped.column(f"{ROW_INDEX}_{aggregate}"))
+        return table.take(pc.take(grouped.column(f"{ROW_INDEX}_{aggregate}"), rows))
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self._seen_lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Forgets the keys seen in earlier batches."""
+        with self._seen_lock:
+            self._seen = None
+
+
+class MapColumns(ArrowTransformer):
+    """
+    Renames, selects and reorders columns.
+
+    Attributes:
+        mapping (dict): New column names by current column name.
+        keep_unmapped (bool): Whether to keep the columns missing from ``mapping``, in their original order;
+            when False, the result holds exactly the mapped columns, in the order of ``mapping``.
+    """
+
+    def __init__(self, mapping: Dict[str, str], keep_unmapped: bool = True) -> None:
+        super().__init__()
+        self.mapping = dict(mapping)
+        self.keep_unmapped = keep_unmapped
+
+    def transform_table(self, table: 'pa.Table') -> 'pa.Table':
+        _check_columns(table, list(self.mapping))
+        names = table.column_names if self.keep_unmapped else list(self.mapping)
+        # Selecting only reorders references to the column buffers; no data is copied
+        selected = table.select(names)
+        return selected.rename_columns([self.mapping.get(name, name) for name in names])
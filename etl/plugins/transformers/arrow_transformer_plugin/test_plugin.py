@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import patch
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from . import plugin
+from .plugin import CastColumns, Deduplicate, HandleNulls, MapColumns, TransformerChain, TrimStrings
+
+
+@unittest.skipIf(pa is None, "pyarrow is required for Arrow transformers")
+class TestArrowTransformers(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [
+            {'id': '1', 'name': '  Ada ', 'department': 'ED'},
+            {'id': '2', 'name': 'Grace', 'department': ''},
+            {'id': '1', 'name': '  Ada ', 'department': 'ED'},
+            {'id': '3', 'name': None, 'department': 'ICU'},
+        ]
+
+    def test_row_dicts_are_returned_as_row_dicts(self):
+        result = TrimStrings().transform(self.rows)
+
+        self.assertEqual(result[0], {'id': '1', 'name': 'Ada', 'department': 'ED'})
+        self.assertIsNone(result[3]['name'])
+
+    def test_record_batches_are_returned_as_record_batches(self):
+        batch = pa.RecordBatch.from_pylist(self.rows)
+
+        result = CastColumns({'id': 'int64'}).transform(batch)
+
+        self.assertIsInstance(result, pa.RecordBatch)
+        self.assertEqual(result.schema.field('id').type, pa.int64())
+        self.assertEqual(result.column(0).to_pylist(), [1, 2, 1, 3])
+
+    def test_unsafe_casts_are_rejected(self):
+        with self.assertRaises(pa.ArrowInvalid):
+            CastColumns({'name': 'int64'}).transform(self.rows)
+
+    def test_null_values_are_normalized_filled_and_required(self):
+        transformer = HandleNulls(fill={'department': 'UNKNOWN'}, required=['name'])
+
+        result = transformer.transform(self.rows)
+
+        self.assertEqual([row['department'] for row in result], ['ED', 'UNKNOWN', 'ED'])
+        self.assertEqual(transformer.get_metadata()['transform']['rows_out'], 3)
+
+    def test_deduplicate_keeps_the_first_row_in_order(self):
+        result = Deduplicate(subset=['id']).transform(self.rows)
+
+        self.assertEqual([row['id'] for row in result], ['1', '2', '3'])
+
+    def test_deduplicate_across_batches(self):
+        transformer = Deduplicate(subset=['id'], across_batches=True)
+
+        transformer.transform(self.rows[:2])
+        result = transformer.transform([{'id': '2'}, {'id': '4'}, {'id': '4'}, {'id': '1'}])
+
+        self.assertEqual(result, [{'id': '4'}])
+
+    def test_map_columns_renames_and_selects(self):
+        self.assertEqual(MapColumns({'name': 'patient_name', 'id': 'patient_id'}, keep_unmapped=False).transform(self.rows)[1],
+                         {'patient_name': 'Grace', 'patient_id': '2'})
+        self.assertEqual(list(MapColumns({'name': 'patient_name'}).transform(self.rows)[0]),
+                         ['id', 'patient_name', 'department'])
+
+    def test_chain_applies_transformers_in_order(self):
+        chain = TransformerChain([TrimStrings(), HandleNulls(required=['department']), CastColumns({'id': 'int32'}),
+                                  Deduplicate(), MapColumns({'id': 'key'})])
+
+        result = chain.transform(pa.Table.from_pylist(self.rows))
+
+        self.assertEqual(result.to_pylist(), [{'key': 1, 'name': 'Ada', 'department': 'ED'},
+                                              {'key': 3, 'name': None, 'department': 'ICU'}])
+
+    def test_column_mappings_keep_their_column_types(self):
+        result = CastColumns({'id': 'int64'}).transform({'id': ['1', '2']})
+
+        self.assertEqual(result, {'id': [1, 2]})
+
+    def test_missing_columns_are_reported(self):
+        with self.assertRaises(KeyError):
+            MapColumns({'missing': 'other'}).transform(self.rows)
+
+    def test_empty_and_dropped_batches_pass_through(self):
+        self.assertEqual(TrimStrings().transform([]), [])
+        self.assertIsNone(TrimStrings().transform(None))
+        self.assertEqual(list(TrimStrings().transform_batches([self.rows[:1], [], None])), [[{'id': '1', 'name': 'Ada', 'department': 'ED'}], []])
+
+
+class TestArrowTransformersWithoutPyarrow(unittest.TestCase):
+
+    def test_missing_pyarrow_raises_a_helpful_error(self):
+        with patch.object(plugin, 'pa', None):
+            with self.assertRaisesRegex(ImportError, "pip install pyarrow"):
+                TrimStrings()
+
+
+if __name__ == '__main__':
+    unittest.main()
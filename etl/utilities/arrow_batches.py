@@ -0,0 +1,103 @@
+"""Conversion of record batches to and from Arrow tables and Arrow IPC buffers."""
+
+from typing import Any, Mapping, Tuple
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is only needed for Arrow batches
+    pa = None
+
+# Kinds of record batches that can be converted to Arrow and back
+BATCH_KINDS = ('table', 'record_batch', 'rows', 'pandas', 'numpy', 'columns')
+
+
+def to_arrow(batch: Any) -> Tuple['pa.Table', str]:
+    """
+    Converts a record batch to an Arrow table.
+
+    Accepted batches are Arrow record batches and tables, pandas data frames, mappings of column
+    names to NumPy arrays or lists, and lists of row dicts (as produced by ``extract_batches``).
+    Data frames and Arrow data are converted without copying where Arrow allows it.
+
+    Args:
+        batch: The record batch.
+
+    Returns:
+        tuple: The Arrow table and the kind of the batch, to convert the table back with ``from_arrow``.
+
+    Raises:
+        TypeError: If the batch type is not supported.
+    """
+    if pa is None:
+        raise ImportError("Arrow batches require pyarrow. Install it with 'pip install pyarrow'.")
+    if isinstance(batch, pa.Table):
+        return batch, 'table'
+    if isinstance(batch, pa.RecordBatch):
+        return pa.Table.from_batches([batch]), 'record_batch'
+    if isinstance(batch, list) and batch and all(isinstance(row, Mapping) for row in batch[:1]):
+        return pa.Table.from_pylist(batch), 'rows'
+    if type(batch).__module__.partition('.')[0] == 'pandas':
+        return pa.Table.from_pandas(batch, preserve_index=False), 'pandas'
+    if isinstance(batch, Mapping):
+        as_numpy = any(hasattr(values, '__array__') for values in batch.values())
+        return pa.table(dict(batch)), 'numpy' if as_numpy else 'columns'
+    raise TypeError(f"Unsupported batch type: {type(batch).__name__}")
+
+
+def from_arrow(table: 'pa.Table', kind: str) -> Any:
+    """
+    Converts an Arrow table back to a record batch of the given kind.
+
+    Args:
+        table (pa.Table): The table.
+        kind (str): The kind returned by ``to_arrow`` for the original batch.
+
+    Returns:
+        The record batch.
+    """
+    if kind == 'table':
+        return table
+    if kind == 'record_batch':
+        batches = table.combine_chunks().to_batches()
+        return batches[0] if batches else pa.RecordBatch.from_pylist([], schema=table.schema)
+    if kind == 'rows':
+        return table.to_pylist()
+    if kind == 'pandas':
+        return table.to_pandas()
+    if kind == 'numpy':
+        return {name: column.to_numpy() for name, column in zip(table.column_names, table.columns)}
+    if kind == 'columns':
+        return table.to_pydict()
+    raise ValueError(f"Unsupported batch kind: {kind}. Supported kinds are: {', '.join(BATCH_KINDS)}")
+
+
+def serialize_table(table: 'pa.Table') -> 'pa.Buffer':
+    """
+    Writes a table to an Arrow IPC stream buffer.
+
+    The column buffers are written as they are, so unlike pickling rows no Python objects are
+    created or walked; the receiving side maps the columns straight out of the buffer.
+
+    Args:
+        table (pa.Table): The table.
+
+    Returns:
+        pa.Buffer: The IPC stream.
+    """
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def deserialize_table(buffer: Any) -> 'pa.Table':
+    """
+    Reads a table from an Arrow IPC stream buffer without copying the column data.
+
+    Args:
+        buffer: The IPC stream, as a ``pa.Buffer`` or any bytes-like object.
+
+    Returns:
+        pa.Table: The table.
+    """
+    return pa.ipc.open_stream(pa.py_buffer(buffer)).read_all()
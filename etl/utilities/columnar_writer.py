@@ -0,0 +1,130 @@
+"""Streaming conversion of CSV byte streams into Parquet or Arrow IPC files."""
+
+import os
+import tempfile
+import contextlib
+from typing import Any, BinaryIO, Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for columnar output
+    pa = None
+
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+FILE_EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024  # bytes of CSV parsed into one record batch
+DEFAULT_ROW_GROUP_SIZE = 128 * 1024  # rows per Parquet row group
+DEFAULT_COMPRESSION = 'zstd'
+
+
+def require_pyarrow() -> None:
+    """
+    Raises a helpful error if pyarrow, which columnar output depends on, is not installed.
+
+    Raises:
+        ImportError: If pyarrow cannot be imported.
+    """
+    if pa is None:
+        raise ImportError("Parquet and Arrow output require pyarrow. Install it with 'pip install pyarrow'.")
+
+
+def write_columnar(stream: BinaryIO,
+                   destination: str,
+                   output_format: str = 'parquet',
+                   compression: Optional[str] = DEFAULT_COMPRESSION,
+                   block_size: int = DEFAULT_BLOCK_SIZE,
+                   row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                   column_types: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Converts a CSV byte stream into a Parquet or Arrow IPC file while it is being read.
+
+    The stream is parsed ``block_size`` bytes at a time into typed record batches, so memory stays
+    bounded by a block (plus one row group for Parquet) however large the input is. Column types
+    are inferred from the first block unless given in ``column_types``; pin the types of columns
+    whose first values are not representative (e.g. IDs with leading zeros, or mostly empty columns).
+
+    Parquet files are written with dictionary encoding and one row group per ``row_group_size``
+    rows. Arrow files use the IPC file format, which can be memory-mapped with
+    ``pyarrow.ipc.open_file(pyarrow.memory_map(path))``; its buffers are compressed with
+    ``compression`` when that is ``zstd`` or ``lz4``.
+
+    The file is written to a temporary file in the destination directory and atomically renamed
+    onto ``destination`` once the stream has been converted completely.
+
+    Args:
+        stream (BinaryIO): The CSV bytes, with a header row.
+        destination (str): The path of the file to write.
+        output_format (str): ``parquet`` or ``arrow``.
+        compression (str, optional): The codec, e.g. ``zstd``, ``snappy`` (Parquet only) or ``lz4``.
+        block_size (int): The number of bytes parsed per record batch.
+        row_group_size (int): The number of rows per Parquet row group.
+        column_types (dict, optional): Arrow type names (e.g. ``string``, ``int64``, ``timestamp[s]``)
+            by column name, overriding inference.
+
+    Returns:
+        dict: The number of ``rows``, ``batches`` and ``row_groups`` written and the file size in ``bytes``.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        ValueError: If the output format is not supported.
+    """
+    require_pyarrow()
+    if output_format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}. Supported formats are: {', '.join(COLUMNAR_FORMATS)}")
+
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: pa.type_for_alias(alias) for name, alias in (column_types or {}).items()},
+        strings_can_be_null=True,
+    )
+    reader = pa_csv.open_csv(stream, read_options=pa_csv.ReadOptions(block_size=block_size), convert_options=convert_options)
+
+    directory = os.path.dirname(destination) or os.curdir
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(destination)}.", suffix=".part", dir=directory)
+    os.close(fd)
+    stats = {'rows': 0, 'batches': 0, 'row_groups': 0}
+    try:
+        if output_format == 'parquet':
+            _write_parquet(reader, temp_path, compression, row_group_size, stats)
+        else:
+            _write_arrow(reader, temp_path, compression, stats)
+        os.replace(temp_path, destination)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+    stats['bytes'] = os.path.getsize(destination)
+    return stats
+
+
+def _write_parquet(reader, path: str, compression: Optional[str], row_group_size: int, stats: Dict[str, int]) -> None:
+    pending: List[Any] = []
+    pending_rows = 0
+    with pq.ParquetWriter(path, reader.schema, compression=compression or 'none', use_dictionary=True) as writer:
+        for batch in reader:
+            stats['rows'] += batch.num_rows
+            stats['batches'] += 1
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            # CSV blocks rarely line up with row groups; gather them and write full groups only
+            while pending_rows >= row_group_size:
+                table = pa.Table.from_batches(pending, schema=reader.schema)
+                writer.write_table(table.slice(0, row_group_size), row_group_size=row_group_size)
+                stats['row_groups'] += 1
+                pending = table.slice(row_group_size).to_batches()
+                pending_rows -= row_group_size
+        if pending_rows:
+            writer.write_table(pa.Table.from_batches(pending, schema=reader.schema), row_group_size=row_group_size)
+            stats['row_groups'] += 1
+
+
+def _write_arrow(reader, path: str, compression: Optional[str], stats: Dict[str, int]) -> None:
+    options = pa.ipc.IpcWriteOptions(compression=compression if compression in ('zstd', 'lz4') else None)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, reader.schema, options=options) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            stats['rows'] += batch.num_rows
+            stats['batches'] += 1
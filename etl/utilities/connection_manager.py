@@ -1,9 +1,10 @@
-import configparser
-from sqlalchemy import create_engine, exc
+from sqlalchemy import exc
 import os
-import psycopg2
 from urllib.parse import quote
 
+from config_management.config_registry import load_ini
+from etl.utilities.engine_registry import get_engine, get_async_engine
+
 
 class DatabaseConfigError(Exception):
     """Exception raised for errors in the database configuration."""
@@ -15,8 +16,7 @@ class ConfigLoader:
         """
         Load the configuration for the specified database type from the provided path.
         """
-        config = configparser.ConfigParser(interpolation=None)
-        config.read(config_path)
+        config = load_ini(config_path, interpolation=False)
 
         if db_type not in config:
             raise DatabaseConfigError(f"No configuration section found for database type: {db_type}")
@@ -26,22 +26,30 @@ class ConfigLoader:
 
         # Handle special characters in the password
 
-
-        # print out the section for debugging
-        # print("DEBUG - Configuration Dictionary:")
-        # for key, value in section.items():
-        #    print(f"{key}: {value}")
-
-
         return section
 
 
 class ConnectionManager:
+    # Optional pool settings read from the database's config section, with their types
+    POOL_OPTIONS = {
+        "pool_size": int,
+        "max_overflow": int,
+        "pool_timeout": float,
+        "pool_recycle": int,
+        "pool_pre_ping": lambda value: value.strip().lower() in ("1", "true", "yes", "on"),
+    }
+
     DB_URL_TEMPLATES = {
         "mysql": "mysql+mysqlconnector://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}",
         "postgres": "postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
     }
 
+    # URL schemes of the asyncio drivers used by the async engine
+    ASYNC_DRIVERS = {
+        "mysql": "mysql+aiomysql",
+        "postgres": "postgresql+asyncpg",
+    }
+
     @staticmethod
     def escape_percent(value: str) -> str:
         """Escape the percent character for SQLAlchemy connection strings."""
@@ -57,16 +65,33 @@ class ConnectionManager:
 
         self._connection = None
         self._engine = None
+        self._async_connection = None
+        self._async_engine = None
         self._config = ConfigLoader.load(config_path, self.db_type)
 
     @property
     def engine(self):
-        """Lazy-load and return the SQLAlchemy engine."""
+        """Lazy-load and return the SQLAlchemy engine, shared with every manager for the same database."""
         if self._engine is None:
-            self._engine = create_engine(self._create_engine_url())
+            self._engine = get_engine(self._create_engine_url(), **self._engine_options())
         return self._engine
 
-    def _create_engine_url(self):
+    @property
+    def async_engine(self):
+        """
+        Lazy-load and return the SQLAlchemy AsyncEngine, shared with every manager for the same database.
+
+        Uses asyncpg for PostgreSQL and aiomysql for MySQL, with the same configuration as ``engine``.
+        """
+        if self._async_engine is None:
+            self._async_engine = get_async_engine(self._create_engine_url(async_mode=True), **self._engine_options())
+        return self._async_engine
+
+    def _engine_options(self):
+        """Return the pool settings given in the configuration section."""
+        return {name: convert(self._config[name]) for name, convert in self.POOL_OPTIONS.items() if name in self._config}
+
+    def _create_engine_url(self, async_mode=False):
         """Construct and return the SQLAlchemy engine URL based on the configuration."""
 
         db_user = self._config['db_user']
@@ -77,15 +102,14 @@ class ConnectionManager:
         db_name = self._config['db_name']
 
         # Using an f-string to format the connection URL
-        if self.db_type == "mysql":
+        if async_mode and self.db_type in self.ASYNC_DRIVERS:
+            connection_url = f"{self.ASYNC_DRIVERS[self.db_type]}://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+        elif self.db_type == "mysql":
             connection_url = f"mysql+mysqlconnector://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
         elif self.db_type == "postgres":
             connection_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
         else:
             raise ValueError(f"Unsupported db_type: {self.db_type}")
-        
-        # Print the connection_url for debugging
-        # print("DEBUG Connection URL:", connection_url)
 
         return connection_url
 
@@ -112,6 +136,29 @@ class ConnectionManager:
         """Close the connection when exiting the context."""
         self.close()
 
+    async def get_async_connection(self):
+        """Establish and return an async connection to the database."""
+        if self._async_connection is None:
+            try:
+                self._async_connection = await self.async_engine.connect()
+            except exc.OperationalError as oe:
+                raise ConnectionError("Failed to connect to the database. Please check your server and credentials.") from oe
+        return self._async_connection
+
+    async def aclose(self):
+        """Close the current async database connection."""
+        if self._async_connection:
+            await self._async_connection.close()
+            self._async_connection = None
+
+    async def __aenter__(self):
+        """Provide an async context manager interface for the connection."""
+        return await self.get_async_connection()
+
+    async def __aexit__(self, _exc_type, _exc_val, _exc_tb):
+        """Close the async connection when exiting the context."""
+        await self.aclose()
+
 
 if __name__ == "__main__":
     db_type = "postgres"
@@ -0,0 +1,221 @@
+"""Process-wide registry of SQLAlchemy engines and their connection pools."""
+
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Pool settings applied unless overridden; recycling and pre-ping guard against connections the
+# server or a firewall closed while they sat idle in the pool
+DEFAULT_POOL_OPTIONS: Dict[str, Any] = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_timeout': 30,
+    'pool_recycle': 1800,
+    'pool_pre_ping': True,
+}
+
+
+class _CheckoutTimingMixin:
+    """
+    Records how long callers wait to check out a connection from a queue pool.
+
+    Attributes:
+        checkout_stats (dict): The number of ``checkouts`` and ``timeouts``, and the total and
+            longest wait in seconds.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkout_stats: Dict[str, float] = {'checkouts': 0, 'timeouts': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.checkout_stats['timeouts'] += 1
+            raise
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self.checkout_stats['checkouts'] += 1
+            self.checkout_stats['wait_seconds'] += waited
+            self.checkout_stats['max_wait_seconds'] = max(self.checkout_stats['max_wait_seconds'], waited)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        # Keep the counters when the engine replaces its pool, e.g. after a disconnect
+        pool.checkout_stats = self.checkout_stats
+        return pool
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    """A ``QueuePool`` that records how long callers wait to check out a connection."""
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    """The ``InstrumentedQueuePool`` counterpart for async engines."""
+
+
+class EngineRegistry:
+    """
+    Hands out one shared engine, and with it one connection pool, per database URL and options.
+
+    Every ``ConnectionManager`` and loader asking for the same database reuses the same pool, so a
+    job opening several of them holds at most ``pool_size + max_overflow`` connections to the
+    server instead of that many per object.
+    """
+
+    def __init__(self) -> None:
+        self._engines: Dict[Tuple[str, str, str], Any] = {}
+        self._names: Dict[Tuple[str, str, str], str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _options(url, options: Dict[str, Any], poolclass: type) -> Dict[str, Any]:
+        # In-memory SQLite databases live inside a single connection and keep SQLAlchemy's own pool
+        if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            return dict(options)
+        resolved = dict(DEFAULT_POOL_OPTIONS)
+        resolved.update(options)
+        resolved.setdefault('poolclass', poolclass)
+        return resolved
+
+    def _name(self, kind: str, url, options: Dict[str, Any], poolclass: type) -> str:
+        """The masked URL, followed by the engine's kind and options when they are not the defaults."""
+        defaults = self._options(url, {}, poolclass)
+        details = [] if kind == 'sync' else [kind]
+        for name, value in sorted(options.items(), key=lambda item: item[0]):
+            if name in defaults and defaults[name] == value:
+                continue
+            # Only pool settings are shown with their values; connect_args may hold credentials
+            details.append(f"{name}={value}" if name in DEFAULT_POOL_OPTIONS else name)
+        name = url.render_as_string(hide_password=True)
+        return f"{name} ({', '.join(details)})" if details else name
+
+    def _get(self, kind: str, url: str, options: Dict[str, Any], poolclass: type, factory) -> Any:
+        url = make_url(url)
+        # An empty mapping such as connect_args={} configures nothing, so it must not split the pool
+        options = {name: value for name, value in options.items() if not (isinstance(value, dict) and not value)}
+        options = self._options(url, options, poolclass)
+        key = (kind, url.render_as_string(hide_password=False), repr(sorted(options.items(), key=lambda item: item[0])))
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                logging.debug(f"Creating {kind} engine for {url.render_as_string(hide_password=True)}")
+                engine = factory(url, **options)
+                self._engines[key] = engine
+                self._names[key] = self._name(kind, url, options, poolclass)
+        return engine
+
+    def get_engine(self, url: str, **options: Any) -> Engine:
+        """
+        Returns the engine for a database, creating it on first use.
+
+        Args:
+            url (str): The database URL.
+            **options: Keyword arguments for ``create_engine``, such as ``pool_size``, ``max_overflow``,
+                ``pool_timeout``, ``pool_recycle``, ``pool_pre_ping`` or ``connect_args``. Unset pool
+                options default to ``DEFAULT_POOL_OPTIONS``.
+
+        Returns:
+            Engine: The shared engine.
+        """
+        return self._get('sync', url, options, InstrumentedQueuePool, create_engine)
+
+    def get_async_engine(self, url: str, **options: Any):
+        """
+        Returns the ``AsyncEngine`` for a database, creating it on first use.
+
+        Requires SQLAlchemy's asyncio extra (greenlet) and an async driver named in the URL, such as
+        ``postgresql+asyncpg`` or ``mysql+aiomysql``.
+
+        Args:
+            url (str): The database URL.
+            **options: Keyword arguments for ``create_async_engine``, see ``get_engine``.
+
+        Returns:
+            AsyncEngine: The shared engine.
+        """
+        # Imported here so that synchronous users never need greenlet
+        from sqlalchemy.ext.asyncio import create_async_engine
+        return self._get('async', url, options, InstrumentedAsyncQueuePool, create_async_engine)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the state of every pool, keyed on its URL with the password masked.
+
+        Engines whose kind (``async``) or options differ from the defaults have them appended to the
+        URL in parentheses, e.g. ``postgresql://etl:***@db/warehouse (pool_size=2)``, so engines
+        sharing a URL get an entry each.
+
+        Returns:
+            dict: Per engine, the pool ``size``, ``checked_out`` and ``overflow`` connections, the
+                ``saturation`` (checked out connections over the pool's capacity, or None if
+                overflow is unbounded) and, for instrumented pools, the checkout wait statistics.
+        """
+        with self._lock:
+            engines = [(self._names[key], engine) for key, engine in self._engines.items()]
+
+        stats: Dict[str, Dict[str, Any]] = {}
+        for name, engine in engines:
+            # An AsyncEngine proxies a synchronous engine that owns the pool
+            engine = getattr(engine, 'sync_engine', engine)
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                stats[name] = {'pool': type(pool).__name__}
+                continue
+            capacity = pool.size() + pool._max_overflow if pool._max_overflow >= 0 else None
+            pool_stats: Dict[str, Any] = {
+                'pool': type(pool).__name__,
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'overflow': max(pool.overflow(), 0),
+                'saturation': pool.checkedout() / capacity if capacity else None,
+            }
+            checkout_stats = getattr(pool, 'checkout_stats', None)
+            if checkout_stats is not None:
+                pool_stats.update(checkout_stats)
+                checkouts = checkout_stats['checkouts']
+                pool_stats['mean_wait_seconds'] = checkout_stats['wait_seconds'] / checkouts if checkouts else 0.0
+            stats[name] = pool_stats
+        return stats
+
+    def dispose(self, url: Optional[str] = None) -> None:
+        """
+        Closes the pooled connections and forgets the engines.
+
+        Args:
+            url (str, optional): Only dispose the engines of this database. Without it, every engine is disposed.
+        """
+        rendered = make_url(url).render_as_string(hide_password=False) if url is not None else None
+        with self._lock:
+            keys = [key for key in self._engines if rendered is None or key[1] == rendered]
+            engines = [self._engines.pop(key) for key in keys]
+            for key in keys:
+                del self._names[key]
+        for engine in engines:
+            # Async engines are disposed through their synchronous core, which closes the pool
+            # without needing an event loop
+            getattr(engine, 'sync_engine', engine).dispose()
+
+
+# The registry shared by every module in the process
+engine_registry = EngineRegistry()
+
+
+def get_engine(url: str, **options: Any) -> Engine:
+    """Returns the shared engine for a database, see ``EngineRegistry.get_engine``."""
+    return engine_registry.get_engine(url, **options)
+
+
+def get_async_engine(url: str, **options: Any):
+    """Returns the shared async engine for a database, see ``EngineRegistry.get_async_engine``."""
+    return engine_registry.get_async_engine(url, **options)
@@ -0,0 +1,230 @@
+"""On-disk, content-addressed cache for extracted files."""
+
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+import contextlib
+from urllib.parse import urlsplit, parse_qsl, urlencode, urlunsplit
+from typing import Dict, Optional
+
+
+class ExtractionCache:
+    """
+    Caches extracted files on disk, keyed by a hash of the canonical request.
+
+    Entries expire ``ttl`` seconds after they were stored and, once the cache grows beyond
+    ``max_bytes``, the least recently used entries are evicted first. An entry's modification time
+    records when it was stored and its access time is bumped explicitly on every hit, so no separate
+    index has to be kept consistent with the files.
+
+    Cache hits are materialized at the caller's destination as a hard link when ``link`` is enabled
+    and the cache lives on the same filesystem, falling back to a copy otherwise. Hard-linked outputs
+    share their contents with the cache entry, so they must be replaced rather than modified in place.
+
+    Attributes:
+        cache_dir (str): The directory holding the cached files.
+        ttl (float): Seconds for which an entry is served.
+        max_bytes (int, optional): The size above which least recently used entries are evicted.
+        link (bool): Whether hits are hard-linked instead of copied.
+    """
+
+    SUFFIX = '.cache'
+
+    def __init__(self, cache_dir: str, ttl: float = 900, max_bytes: Optional[int] = None, link: bool = True) -> None:
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.link = link
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(url: str) -> str:
+        """
+        Returns the cache key for a request URL.
+
+        The query string is canonicalized by sorting its parameters, so the same report requested with
+        the same parameters in a different order maps onto the same entry.
+
+        Args:
+            url (str): The request URL, including its query parameters.
+
+        Returns:
+            str: A hex SHA-256 digest identifying the request.
+        """
+        parts = urlsplit(url)
+        # SSRS puts the bare report path first in the query, so blank values must be preserved
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        canonical = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ''))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + self.SUFFIX)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Looks up a fresh entry.
+
+        Args:
+            key (str): The cache key, see ``make_key``.
+
+        Returns:
+            str, optional: The path of the cached file, or None on a miss.
+        """
+        entry = self._entry_path(key)
+        try:
+            stored_at = os.stat(entry).st_mtime
+        except FileNotFoundError:
+            self._count('misses')
+            return None
+
+        now = time.time()
+        if now - stored_at > self.ttl:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(entry)
+            self._count('evictions')
+            self._count('misses')
+            return None
+
+        # Record the access for LRU eviction without touching the storage time
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(entry, (now, stored_at))
+        self._count('hits')
+        return entry
+
+    def fetch(self, key: str, destination: str) -> bool:
+        """
+        Materializes a fresh entry at ``destination``, replacing any existing file atomically.
+
+        Args:
+            key (str): The cache key, see ``make_key``.
+            destination (str): Where the cached file should appear.
+
+        Returns:
+            bool: True on a cache hit, False on a miss.
+        """
+        entry = self.get(key)
+        if entry is None:
+            return False
+
+        directory = os.path.dirname(destination) or os.curdir
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(destination)}.", suffix=".part", dir=directory)
+        os.close(fd)
+        try:
+            if not self._try_link(entry, temp_path):
+                shutil.copyfile(entry, temp_path)
+            os.replace(temp_path, destination)
+        except FileNotFoundError:
+            # The entry was evicted between the lookup and the copy
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            self._count('hits', -1)
+            self._count('misses')
+            return False
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+        return True
+
+    def put(self, key: str, source: str) -> str:
+        """
+        Stores a file under ``key`` and evicts entries as needed.
+
+        Args:
+            key (str): The cache key, see ``make_key``.
+            source (str): The file to cache. It is left in place.
+
+        Returns:
+            str: The path of the new cache entry.
+        """
+        entry = self._entry_path(key)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{key}.", suffix=".part", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            if not self._try_link(source, temp_path):
+                shutil.copyfile(source, temp_path)
+            # The entry's modification time marks when it was stored, not when the source was written
+            os.utime(temp_path, None)
+            os.replace(temp_path, entry)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+        self._count('stores')
+        self.evict()
+        return entry
+
+    def _try_link(self, source: str, target: str) -> bool:
+        """Replaces ``target`` with a hard link to ``source`` if linking is enabled and possible."""
+        if not self.link:
+            return False
+        try:
+            os.remove(target)
+            os.link(source, target)
+            return True
+        except OSError:
+            return False
+
+    def evict(self) -> int:
+        """
+        Removes expired entries, then least recently used entries until the cache fits ``max_bytes``.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            with contextlib.suppress(FileNotFoundError):
+                stat = os.stat(path)
+                entries.append((stat.st_atime, stat.st_mtime, stat.st_size, path))
+
+        removed = 0
+        total_size = 0
+        fresh = []
+        for accessed_at, stored_at, size, path in entries:
+            if now - stored_at > self.ttl:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+                removed += 1
+            else:
+                fresh.append((max(accessed_at, stored_at), size, path))
+                total_size += size
+
+        if self.max_bytes is not None:
+            for _, size, path in sorted(fresh):
+                if total_size <= self.max_bytes:
+                    break
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+                total_size -= size
+                removed += 1
+
+        if removed:
+            self._count('evictions', removed)
+        return removed
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns hit/miss counters and the hit ratio since the cache was created.
+
+        Returns:
+            dict: The ``hits``, ``misses``, ``stores``, ``evictions`` and ``hit_ratio`` of the cache.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
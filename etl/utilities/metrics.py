@@ -0,0 +1,450 @@
+"""Counters and latency histograms for the extract and load hot paths, exported through pluggable sinks."""
+
+import os
+import bisect
+import json
+import time
+import tempfile
+import threading
+import inspect
+import functools
+import contextlib
+from contextvars import ContextVar, Token
+from typing import Any, AsyncIterable, AsyncIterator, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds of the latency histogram buckets, from sub-millisecond inserts to long renders
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+DEFAULT_NAMESPACE = 'data_sync_refinery'
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class MetricsSink:
+    """Receives every recorded measurement; subclasses export them somewhere."""
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        """Handles one measurement: its ``type``, ``name``, ``value``, ``labels`` and ``time``."""
+
+    def flush(self, registry: 'MetricsRegistry') -> None:
+        """Writes out anything buffered, or a snapshot of the registry's aggregates."""
+
+
+class InMemorySink(MetricsSink):
+    """Keeps every measurement in a list, for tests and interactive inspection."""
+
+    def __init__(self) -> None:
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def find(self, name: str, **labels: Any) -> List[Dict[str, Any]]:
+        """Returns the measurements of a metric whose labels include the given ones."""
+        with self._lock:
+            return [event for event in self.events if event['name'] == name and
+                    all(event['labels'].get(label) == str(value) for label, value in labels.items())]
+
+
+class JsonLinesSink(MetricsSink):
+    """
+    Appends every measurement to a file as one JSON object per line.
+
+    Attributes:
+        path (str): The file the measurements are appended to.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def flush(self, registry: 'MetricsRegistry') -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class PrometheusSink(MetricsSink):
+    """
+    Writes the registry's aggregates in the Prometheus text exposition format on every flush.
+
+    The file is replaced atomically, so it can be picked up by the node exporter's textfile
+    collector or served as is.
+
+    Attributes:
+        path (str): The file the exposition is written to.
+        namespace (str): The prefix of every metric name.
+    """
+
+    def __init__(self, path: str, namespace: str = DEFAULT_NAMESPACE) -> None:
+        self.path = path
+        self.namespace = namespace
+
+    def flush(self, registry: 'MetricsRegistry') -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(self.path)}.", suffix=".part", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                file.write(registry.render_prometheus(self.namespace))
+            os.replace(temp_path, self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+
+
+class MetricsRegistry:
+    """
+    Aggregates counters and latency histograms and forwards every measurement to the sinks.
+
+    Measurements are identified by a name and a set of labels, e.g. ``batch_seconds`` with
+    ``plugin=SQLAlchemyLoader``. Counters only ever grow; histograms count observations per bucket
+    and keep their sum, like Prometheus histograms, so latency percentiles can be estimated without
+    keeping every observation.
+
+    Recording costs a dictionary update under a lock plus one call per sink, so the hot paths record
+    once per request or batch, never per row.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._counters: Dict[LabelKey, float] = {}
+        self._histograms: Dict[LabelKey, Dict[str, Any]] = {}
+        self._sinks: List[MetricsSink] = []
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink: MetricsSink) -> MetricsSink:
+        """Sends every later measurement to a sink, and returns the sink."""
+        with self._lock:
+            self._sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink: MetricsSink) -> None:
+        """Stops sending measurements to a sink."""
+        with self._lock:
+            if sink in self._sinks:
+                self._sinks.remove(sink)
+
+    def _emit(self, kind: str, name: str, value: float, labels: Dict[str, Any]) -> None:
+        if not self._sinks:
+            return
+        event = {'type': kind, 'name': name, 'value': value, 'labels': {label: str(item) for label, item in labels.items()},
+                 'time': time.time()}
+        for sink in list(self._sinks):
+            sink.emit(event)
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        """
+        Adds to a counter.
+
+        Args:
+            name (str): The counter, e.g. ``rows`` or ``retries``.
+            value (float): The amount to add.
+            **labels: The labels identifying the series, e.g. ``plugin``.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._emit('counter', name, value, labels)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Records an observation, usually a duration in seconds, in a histogram.
+
+        Args:
+            name (str): The histogram, e.g. ``batch_seconds``.
+            value (float): The observed value.
+            **labels: The labels identifying the series, e.g. ``plugin``.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            histogram['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+        self._emit('histogram', name, value, labels)
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """Observes the seconds spent in a ``with`` block in a histogram, whether or not it raised."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the current aggregates.
+
+        Returns:
+            dict: The ``counters`` and ``histograms`` (with ``count``, ``sum`` and cumulative ``buckets``),
+                by name and then by their labels as a tuple of (label, value) pairs.
+        """
+        with self._lock:
+            counters: Dict[str, Dict[Any, float]] = {}
+            for (name, labels), value in self._counters.items():
+                counters.setdefault(name, {})[labels] = value
+            histograms: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+            for (name, labels), histogram in self._histograms.items():
+                cumulative, total = [], 0
+                for bound, count in zip(self.buckets + (float('inf'),), histogram['counts']):
+                    total += count
+                    cumulative.append((bound, total))
+                histograms.setdefault(name, {})[labels] = {'count': histogram['count'], 'sum': histogram['sum'],
+                                                           'buckets': cumulative}
+        return {'counters': counters, 'histograms': histograms}
+
+    def render_prometheus(self, namespace: str = DEFAULT_NAMESPACE) -> str:
+        """
+        Renders the aggregates in the Prometheus text exposition format.
+
+        Args:
+            namespace (str): The prefix of every metric name.
+
+        Returns:
+            str: The exposition, counters first.
+        """
+        def series(name: str, labels: Tuple[Tuple[str, str], ...], value: float, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = ','.join(f'{label}="{_escape(item)}"' for label, item in labels + extra)
+            return f"{name}{{{pairs}}} {value:g}" if pairs else f"{name} {value:g}"
+
+        snapshot = self.snapshot()
+        lines = []
+        for name, values in sorted(snapshot['counters'].items()):
+            metric = f"{namespace}_{name}_total" if namespace else f"{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines += [series(metric, labels, value) for labels, value in sorted(values.items())]
+        for name, values in sorted(snapshot['histograms'].items()):
+            metric = f"{namespace}_{name}" if namespace else name
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, histogram in sorted(values.items()):
+                for bound, count in histogram['buckets']:
+                    lines.append(series(f"{metric}_bucket", labels, count, (('le', '+Inf' if bound == float('inf') else f"{bound:g}"),)))
+                lines.append(series(f"{metric}_sum", labels, histogram['sum']))
+                lines.append(series(f"{metric}_count", labels, histogram['count']))
+        return '\n'.join(lines) + '\n'
+
+    def flush(self) -> None:
+        """Asks every sink to write out what it has buffered."""
+        for sink in list(self._sinks):
+            sink.flush(self)
+
+    def reset(self) -> None:
+        """Drops all aggregates; the sinks are kept."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# The registry shared by every module in the process
+metrics_registry = MetricsRegistry()
+
+# Instrumented methods already running in this thread or task, so that a subclass calling super() is counted once
+_active: ContextVar[FrozenSet[Tuple[int, str]]] = ContextVar('instrumented_methods', default=frozenset())
+
+
+@contextlib.contextmanager
+def _running(key: Tuple[int, str]) -> Iterator[None]:
+    # Marks a method as running while a step of its batch stream executes, so that batches a
+    # subclass yields from super() are not counted by the parent's wrapper as well
+    token = _active.set(_active.get() | {key})
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def _count_rows(data: Any) -> Optional[int]:
+    if hasattr(data, 'num_rows'):
+        return data.num_rows
+    if isinstance(data, (list, tuple)) or type(data).__module__.partition('.')[0] == 'pandas':
+        return len(data)
+    return None
+
+
+def instrument(cls: type, method_name: str) -> None:
+    """
+    Wraps a plugin method defined by ``cls`` to record its calls, errors and duration.
+
+    The duration goes to the ``stage_seconds`` histogram and the calls and errors to the
+    ``stage_calls`` and ``stage_errors`` counters, labelled with the plugin class and the method.
+    ``extract_batches`` additionally records the time to the first batch, the latency of every
+    batch and the number of batches and rows; ``load`` records the rows it was given. Coroutine
+    methods are timed until they complete and async generators like regular ones. Called from
+    ``__init_subclass__`` of the base classes, so every plugin is instrumented without changes.
+
+    Args:
+        cls (type): The plugin class.
+        method_name (str): The method to wrap, if ``cls`` defines it.
+    """
+    method = cls.__dict__.get(method_name)
+    if method is None or not callable(method) or getattr(method, '__instrumented__', False):
+        return
+
+    def guard(self) -> Tuple[Dict[str, str], Optional[Token]]:
+        labels = {'plugin': type(self).__name__, 'method': method_name}
+        key = (id(self), method_name)
+        running = _active.get()
+        if key in running:
+            return labels, None
+        return labels, _active.set(running | {key})
+
+    def record(labels: Dict[str, str], args: Tuple[Any, ...]) -> None:
+        metrics_registry.increment('stage_calls', **labels)
+        if method_name == 'load' and args:
+            rows = _count_rows(args[0])
+            if rows is not None:
+                metrics_registry.increment('rows', rows, **labels)
+
+    if inspect.isasyncgenfunction(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if (id(self), method_name) in _active.get():
+                return method(self, *args, **kwargs)
+            return _instrumented_async_batches(method(self, *args, **kwargs),
+                                               {'plugin': type(self).__name__, 'method': method_name},
+                                               (id(self), method_name))
+    elif method_name == 'extract_batches':
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            labels, token = guard(self)
+            if token is None:
+                return method(self, *args, **kwargs)
+            try:
+                batches = method(self, *args, **kwargs)
+            except BaseException:
+                metrics_registry.increment('stage_errors', **labels)
+                raise
+            finally:
+                _active.reset(token)
+            return _instrumented_batches(batches, labels, (id(self), method_name))
+    elif inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            labels, token = guard(self)
+            if token is None:
+                return await method(self, *args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = await method(self, *args, **kwargs)
+            except BaseException:
+                metrics_registry.increment('stage_errors', **labels)
+                raise
+            finally:
+                _active.reset(token)
+                metrics_registry.observe('stage_seconds', time.perf_counter() - started, **labels)
+            record(labels, args)
+            return result
+    else:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            labels, token = guard(self)
+            if token is None:
+                return method(self, *args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = method(self, *args, **kwargs)
+            except BaseException:
+                metrics_registry.increment('stage_errors', **labels)
+                raise
+            finally:
+                _active.reset(token)
+                metrics_registry.observe('stage_seconds', time.perf_counter() - started, **labels)
+            record(labels, args)
+            return result
+
+    wrapper.__instrumented__ = True
+    setattr(cls, method_name, wrapper)
+
+
+def _instrumented_batches(batches: Iterable[Any], labels: Dict[str, str], key: Tuple[int, str]) -> Iterator[Any]:
+    iterator = iter(batches)
+    started = time.perf_counter()
+    first = True
+    try:
+        while True:
+            batch_started = time.perf_counter()
+            try:
+                with _running(key):
+                    batch = next(iterator)
+            except StopIteration:
+                break
+            now = time.perf_counter()
+            if first:
+                metrics_registry.observe('first_batch_seconds', now - started, **labels)
+                first = False
+            metrics_registry.observe('batch_seconds', now - batch_started, **labels)
+            metrics_registry.increment('batches', **labels)
+            rows = _count_rows(batch)
+            if rows is not None:
+                metrics_registry.increment('rows', rows, **labels)
+            yield batch
+        metrics_registry.increment('stage_calls', **labels)
+    except GeneratorExit:
+        raise
+    except BaseException:
+        metrics_registry.increment('stage_errors', **labels)
+        raise
+    finally:
+        # The consumer's time between batches is included, as it is for any streaming stage
+        metrics_registry.observe('stage_seconds', time.perf_counter() - started, **labels)
+        if hasattr(iterator, 'close'):
+            iterator.close()
+
+
+async def _instrumented_async_batches(batches: AsyncIterable[Any], labels: Dict[str, str],
+                                      key: Tuple[int, str]) -> AsyncIterator[Any]:
+    iterator = batches.__aiter__()
+    started = time.perf_counter()
+    first = True
+    try:
+        while True:
+            batch_started = time.perf_counter()
+            try:
+                with _running(key):
+                    batch = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            now = time.perf_counter()
+            if first:
+                metrics_registry.observe('first_batch_seconds', now - started, **labels)
+                first = False
+            metrics_registry.observe('batch_seconds', now - batch_started, **labels)
+            metrics_registry.increment('batches', **labels)
+            rows = _count_rows(batch)
+            if rows is not None:
+                metrics_registry.increment('rows', rows, **labels)
+            yield batch
+        metrics_registry.increment('stage_calls', **labels)
+    except GeneratorExit:
+        raise
+    except BaseException:
+        metrics_registry.increment('stage_errors', **labels)
+        raise
+    finally:
+        metrics_registry.observe('stage_seconds', time.perf_counter() - started, **labels)
+        if hasattr(iterator, 'aclose'):
+            await iterator.aclose()
@@ -0,0 +1,292 @@
+"""Discovery of extractor, loader and transformer plugins through a cached manifest."""
+
+import os
+import ast
+import json
+import logging
+import tempfile
+import threading
+import contextlib
+from importlib import import_module
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+DEFAULT_PLUGINS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'plugins')
+DEFAULT_PLUGINS_PACKAGE = 'etl.plugins'
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.expanduser('~'), '.data_sync_refinery', 'plugin_manifest.json')
+MANIFEST_VERSION = 1
+
+# Base classes marking a class as a plugin, and the kind of plugin they make
+PLUGIN_BASES = {'BaseExtractor': 'extractor', 'BaseLoader': 'loader', 'BaseTransformer': 'transformer'}
+
+
+class PluginSpec(NamedTuple):
+    """A plugin as recorded in the manifest."""
+    name: str
+    kind: str
+    plugin: str
+    entry_point: str
+    config_path: Optional[str]
+
+
+class PluginRegistry:
+    """
+    Finds the plugins under the plugin tree without importing them, and imports them on first use.
+
+    A plugin is a directory holding a ``plugin.py`` (and usually a ``config.yml``) under a kind
+    directory such as ``extractors``. Every concrete class in ``plugin.py`` deriving, directly or
+    through other classes of the module or of other plugin modules, from ``BaseExtractor``,
+    ``BaseLoader`` or ``BaseTransformer`` is registered under its class name, and under its directory name (with or
+    without the ``_plugin`` suffix) when it is the only class of its plugin.
+
+    The modules are read with ``ast`` rather than imported, and the result is written to a JSON
+    manifest together with the size and modification time of every ``plugin.py``. Later processes
+    reuse the manifest after one ``stat`` per plugin and only parse the plugins that were added or
+    edited since; a plugin's module, and the libraries it depends on, are imported only when the
+    plugin is loaded or created.
+
+    Attributes:
+        plugins_dir (str): The root of the plugin tree.
+        package (str): The import path of ``plugins_dir``.
+        manifest_path (str, optional): The manifest file; without it the manifest is only kept in memory.
+    """
+
+    def __init__(self,
+                 plugins_dir: str = DEFAULT_PLUGINS_DIR,
+                 package: str = DEFAULT_PLUGINS_PACKAGE,
+                 manifest_path: Optional[str] = DEFAULT_MANIFEST_PATH) -> None:
+        self.plugins_dir = os.path.abspath(plugins_dir)
+        self.package = package
+        self.manifest_path = manifest_path
+        self._specs: Optional[List[PluginSpec]] = None
+        self._names: Dict[Tuple[str, Optional[str]], PluginSpec] = {}
+        self._classes: Dict[str, type] = {}
+        self._lock = threading.Lock()
+
+    def _plugin_signatures(self) -> Dict[str, List[int]]:
+        files = {}
+        for kind_entry in sorted(os.scandir(self.plugins_dir), key=lambda entry: entry.name):
+            if not kind_entry.is_dir() or kind_entry.name.startswith(('.', '_')):
+                continue
+            for plugin_entry in sorted(os.scandir(kind_entry.path), key=lambda entry: entry.name):
+                path = os.path.join(plugin_entry.path, 'plugin.py')
+                with contextlib.suppress(FileNotFoundError, NotADirectoryError):
+                    stat = os.stat(path)
+                    files[os.path.relpath(path, self.plugins_dir)] = [stat.st_mtime_ns, stat.st_size]
+        return files
+
+    def _module_path(self, module: str) -> Optional[str]:
+        if not module.startswith(f"{self.package}."):
+            return None
+        return os.path.join(self.plugins_dir, *module[len(self.package) + 1:].split('.')) + '.py'
+
+    def _class_kinds(self, path: str, seen: Tuple[str, ...] = ()) -> Dict[str, Tuple[Optional[str], bool]]:
+        with open(path, 'r', encoding='utf-8') as file:
+            tree = ast.parse(file.read(), filename=path)
+        classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+        # Classes imported from other plugin modules, e.g. a plugin extending another plugin
+        imported = {alias.asname or alias.name: (node.module, alias.name)
+                    for node in tree.body if isinstance(node, ast.ImportFrom) and node.module
+                    for alias in node.names}
+
+        def base_names(node: ast.ClassDef) -> List[str]:
+            return [base.id if isinstance(base, ast.Name) else base.attr
+                    for base in node.bases if isinstance(base, (ast.Name, ast.Attribute))]
+
+        def kind_of(name: str, visited: Tuple[str, ...] = ()) -> Optional[str]:
+            if name in PLUGIN_BASES:
+                return PLUGIN_BASES[name]
+            if name not in classes and name in imported:
+                module, original_name = imported[name]
+                module_path = self._module_path(module)
+                if module_path is None or module_path in seen or not os.path.exists(module_path):
+                    return None
+                return self._class_kinds(module_path, seen + (path,)).get(original_name, (None, False))[0]
+            if name not in classes or name in visited:
+                return None
+            for base in base_names(classes[name]):
+                kind = kind_of(base, visited + (name,))
+                if kind is not None:
+                    return kind
+            return None
+
+        def is_abstract(node: ast.ClassDef) -> bool:
+            return any(isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef)) and
+                       any((decorator.id if isinstance(decorator, ast.Name) else getattr(decorator, 'attr', None)) == 'abstractmethod'
+                           for decorator in member.decorator_list)
+                       for member in node.body)
+
+        return {name: (kind_of(name), is_abstract(node)) for name, node in classes.items()}
+
+    def _plugin_classes(self, path: str) -> List[Tuple[str, str]]:
+        return [(name, kind) for name, (kind, abstract) in self._class_kinds(path).items()
+                if not name.startswith('_') and kind is not None and not abstract]
+
+    def _scan_file(self, relative_path: str) -> List[PluginSpec]:
+        kind_dir, plugin_dir, _ = relative_path.split(os.sep)
+        path = os.path.join(self.plugins_dir, relative_path)
+        config_path = os.path.join(os.path.dirname(path), 'config.yml')
+        module = f"{self.package}.{kind_dir}.{plugin_dir}.plugin"
+        try:
+            classes = self._plugin_classes(path)
+        except (SyntaxError, UnicodeDecodeError) as error:
+            logging.warning(f"Skipping plugin {relative_path}: {error}")
+            return []
+        return [PluginSpec(name, kind, plugin_dir, f"{module}:{name}", config_path if os.path.exists(config_path) else None)
+                for name, kind in classes]
+
+    def _read_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not self.manifest_path:
+            return {}
+        try:
+            with open(self.manifest_path, 'r') as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if (manifest.get('version'), manifest.get('plugins_dir')) != (MANIFEST_VERSION, self.plugins_dir):
+            return {}
+        return manifest.get('files', {})
+
+    def _write_manifest(self, files: Dict[str, Dict[str, Any]]) -> None:
+        if not self.manifest_path:
+            return
+        manifest = {'version': MANIFEST_VERSION, 'plugins_dir': self.plugins_dir, 'files': files}
+        directory = os.path.dirname(os.path.abspath(self.manifest_path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix='.plugin_manifest.', suffix='.part', dir=directory)
+            with os.fdopen(fd, 'w') as file:
+                json.dump(manifest, file, indent=2)
+            os.replace(temp_path, self.manifest_path)
+        except OSError as error:
+            # A read-only home directory only costs a rescan in the next process
+            logging.warning(f"Could not write plugin manifest {self.manifest_path}: {error}")
+
+    def _build(self, use_manifest: bool) -> None:
+        cached = self._read_manifest() if use_manifest else {}
+        files = {}
+        for relative_path, signature in self._plugin_signatures().items():
+            entry = cached.get(relative_path)
+            if entry is not None and entry.get('signature') == signature:
+                specs = [PluginSpec(**spec) for spec in entry['plugins']]
+            else:
+                # Only plugins that were added or edited since the manifest was written are parsed
+                logging.debug(f"Scanning plugin: {relative_path}")
+                specs = self._scan_file(relative_path)
+            files[relative_path] = {'signature': signature, 'plugins': [spec._asdict() for spec in specs]}
+        if files != cached:
+            self._write_manifest(files)
+        self._index([PluginSpec(**spec) for entry in files.values() for spec in entry['plugins']])
+
+    def _index(self, specs: List[PluginSpec]) -> None:
+        names: Dict[Tuple[str, Optional[str]], PluginSpec] = {}
+        per_plugin: Dict[Tuple[str, str], List[PluginSpec]] = {}
+        for spec in specs:
+            per_plugin.setdefault((spec.kind, spec.plugin), []).append(spec)
+        for spec in specs:
+            aliases = [spec.name]
+            if len(per_plugin[(spec.kind, spec.plugin)]) == 1:
+                aliases += [spec.plugin, spec.plugin[:-len('_plugin')] if spec.plugin.endswith('_plugin') else spec.plugin]
+            for alias in aliases:
+                names.setdefault((alias, spec.kind), spec)
+                names.setdefault((alias, None), spec)
+        self._specs, self._names = specs, names
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if self._specs is None:
+                self._build(use_manifest=True)
+
+    def refresh(self) -> List[PluginSpec]:
+        """
+        Scans the plugin tree again and rewrites the manifest.
+
+        Returns:
+            list: The plugins found.
+        """
+        with self._lock:
+            self._build(use_manifest=False)
+            self._classes.clear()
+            return list(self._specs)
+
+    def plugins(self, kind: Optional[str] = None) -> List[PluginSpec]:
+        """
+        Lists the registered plugins without importing any of them.
+
+        Args:
+            kind (str, optional): Only list plugins of this kind: ``extractor``, ``loader`` or ``transformer``.
+
+        Returns:
+            list: The plugins, in plugin tree order.
+        """
+        self._ensure_loaded()
+        return [spec for spec in self._specs if kind is None or spec.kind == kind]
+
+    def get(self, name: str, kind: Optional[str] = None) -> PluginSpec:
+        """
+        Looks up a plugin by class name, or by directory name for single-class plugins.
+
+        Args:
+            name (str): The name of the plugin, e.g. ``SSRSExtractor`` or ``ssrs_extractor``.
+            kind (str, optional): The kind of plugin, to tell apart plugins sharing a name.
+
+        Returns:
+            PluginSpec: The plugin.
+
+        Raises:
+            KeyError: If no such plugin is registered.
+        """
+        self._ensure_loaded()
+        spec = self._names.get((name, kind))
+        if spec is None:
+            available = ', '.join(spec.name for spec in self.plugins(kind))
+            raise KeyError(f"Unknown {kind or 'plugin'}: {name}. Available plugins are: {available}")
+        return spec
+
+    def load(self, name: str, kind: Optional[str] = None) -> type:
+        """
+        Imports a plugin's module and returns its class.
+
+        Args:
+            name (str): The name of the plugin.
+            kind (str, optional): The kind of plugin.
+
+        Returns:
+            type: The plugin class.
+
+        Raises:
+            KeyError: If no such plugin is registered.
+        """
+        spec = self.get(name, kind)
+        plugin_class = self._classes.get(spec.entry_point)
+        if plugin_class is None:
+            module_name, class_name = spec.entry_point.split(':')
+            plugin_class = getattr(import_module(module_name), class_name)
+            self._classes[spec.entry_point] = plugin_class
+        return plugin_class
+
+    def create(self, name: str, *args: Any, kind: Optional[str] = None, **kwargs: Any) -> Any:
+        """
+        Instantiates a plugin, importing its module on first use.
+
+        Args:
+            name (str): The name of the plugin.
+            *args: Positional arguments for the plugin class.
+            kind (str, optional): The kind of plugin.
+            **kwargs: Keyword arguments for the plugin class.
+
+        Returns:
+            The plugin instance.
+
+        Raises:
+            KeyError: If no such plugin is registered.
+        """
+        return self.load(name, kind)(*args, **kwargs)
+
+
+# The registry shared by every module in the process
+plugin_registry = PluginRegistry()
+
+
+def create_plugin(name: str, *args: Any, kind: Optional[str] = None, **kwargs: Any) -> Any:
+    """Instantiates a plugin from the process-wide registry, see ``PluginRegistry.create``."""
+    return plugin_registry.create(name, *args, kind=kind, **kwargs)
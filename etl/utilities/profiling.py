@@ -0,0 +1,327 @@
+"""Opt-in cProfile and tracemalloc capture of extractor and loader calls."""
+
+import os
+import time
+import inspect
+import logging
+import cProfile
+import threading
+import functools
+import tracemalloc
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from config_management.factory import read_config
+
+ENVIRONMENT_VARIABLE = 'DATA_SYNC_REFINERY_PROFILE'
+OUTPUT_DIR_VARIABLE = 'DATA_SYNC_REFINERY_PROFILE_DIR'
+CONFIG_SECTION = 'Profiling'
+MODES = ('cpu', 'memory')
+DEFAULT_TOP_ALLOCATIONS = 25
+DEFAULT_OUTPUT_DIR = 'profiles'
+
+# Allocations made by the profiling machinery itself, left out of the allocation report
+_IGNORED_FRAMES = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                   tracemalloc.Filter(False, '<unknown>'))
+
+
+class Profiler:
+    """
+    Captures a CPU profile and the top allocation sites of extractor and loader calls, when enabled.
+
+    Profiling is off unless the ``DATA_SYNC_REFINERY_PROFILE`` environment variable or ``ENABLED``
+    in the ``[Profiling]`` section of config.ini turns it on. The variable takes ``1``/``true`` for
+    both kinds of capture, or ``cpu`` or ``memory`` for just one, and overrides the config file.
+    Each profiled call writes, next to the file it produced (or to ``output_path`` when it was given
+    one, else to ``DATA_SYNC_REFINERY_PROFILE_DIR``, ``OUTPUT_DIR`` or ``./profiles``):
+
+    - ``<name>.<Plugin>.<method>.<run>.pstats``: the cProfile statistics, for ``pstats`` or snakeviz.
+    - ``<name>.<Plugin>.<method>.<run>.allocations.txt``: the peak traced memory and the source lines
+      that allocated most of the memory still held when the call returned.
+
+    Only the outermost profiled call on a thread is captured, so nested plugin calls and subclasses
+    calling ``super()`` show up inside their caller's profile. cProfile only sees the calling thread,
+    and only one thread at a time is CPU-profiled on Python 3.12 and later. tracemalloc is process-wide:
+    concurrent captures share one trace, which runs until the last of them stops, and only the capture
+    that started it reports a peak.
+    """
+
+    def __init__(self) -> None:
+        self._settings: Optional[Dict[str, Any]] = None
+        self._active = threading.local()
+        self._lock = threading.Lock()
+        self._tracing_lock = threading.Lock()
+        self._tracing_captures = 0
+        self._owns_tracing = False
+
+    @staticmethod
+    def _read_settings() -> Dict[str, Any]:
+        config = read_config()
+        enabled = config.getboolean(CONFIG_SECTION, 'ENABLED', fallback=False)
+        modes = config.get(CONFIG_SECTION, 'MODE', fallback=','.join(MODES))
+        value = os.environ.get(ENVIRONMENT_VARIABLE, '').strip().lower()
+        if value:
+            enabled = value not in ('0', 'false', 'no', 'off')
+            if value in MODES or ',' in value:
+                modes = value
+        modes = tuple(mode for mode in MODES if mode in [part.strip().lower() for part in modes.split(',')])
+        return {
+            'enabled': enabled and bool(modes),
+            'modes': modes,
+            'output_dir': os.environ.get(OUTPUT_DIR_VARIABLE) or config.get(CONFIG_SECTION, 'OUTPUT_DIR', fallback=None),
+            'top_allocations': config.getint(CONFIG_SECTION, 'TOP_ALLOCATIONS', fallback=DEFAULT_TOP_ALLOCATIONS),
+        }
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """The profiling settings, read from the environment and config.ini on first use."""
+        if self._settings is None:
+            with self._lock:
+                if self._settings is None:
+                    self._settings = self._read_settings()
+        return self._settings
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings['enabled']
+
+    def configure(self,
+                  enabled: bool = True,
+                  modes: Iterable[str] = MODES,
+                  output_dir: Optional[str] = None,
+                  top_allocations: int = DEFAULT_TOP_ALLOCATIONS) -> None:
+        """
+        Sets the profiling settings in code, ignoring the environment and config.ini.
+
+        Args:
+            enabled (bool): Whether calls are profiled.
+            modes (iterable): ``cpu`` and/or ``memory``.
+            output_dir (str, optional): Where artifacts of calls without an output file are written.
+            top_allocations (int): The number of allocation sites written to the report.
+
+        Raises:
+            ValueError: If a mode is not supported.
+        """
+        modes = tuple(modes)
+        unsupported = [mode for mode in modes if mode not in MODES]
+        if unsupported:
+            raise ValueError(f"Unsupported profiling mode: {', '.join(unsupported)}. Supported modes are: {', '.join(MODES)}")
+        self._settings = {'enabled': enabled and bool(modes), 'modes': modes, 'output_dir': output_dir,
+                          'top_allocations': top_allocations}
+
+    def reset(self) -> None:
+        """Forgets the settings, so they are read from the environment and config.ini again."""
+        self._settings = None
+
+    def _enter(self) -> bool:
+        if not self.enabled or getattr(self._active, 'running', False):
+            return False
+        self._active.running = True
+        return True
+
+    def _exit(self) -> None:
+        self._active.running = False
+
+    def capture(self, labels: Dict[str, str]) -> 'Capture':
+        """Starts capturing a call; see ``profile``."""
+        return Capture(self.settings, labels)
+
+    def _start_tracing(self) -> bool:
+        """Joins the shared tracemalloc trace, starting it if no capture is tracing; True if it was started."""
+        with self._tracing_lock:
+            started = False
+            if self._tracing_captures == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self._owns_tracing = started = True
+            self._tracing_captures += 1
+            return started
+
+    def _stop_tracing(self) -> None:
+        """Leaves the shared trace, stopping tracemalloc when the last capture that joined it stops."""
+        with self._tracing_lock:
+            self._tracing_captures -= 1
+            if self._tracing_captures == 0 and self._owns_tracing:
+                self._owns_tracing = False
+                tracemalloc.stop()
+
+
+class Capture:
+    """The CPU profile and allocations of one profiled call."""
+
+    def __init__(self, settings: Dict[str, Any], labels: Dict[str, str]) -> None:
+        self.settings = settings
+        self.labels = labels
+        self.profile = cProfile.Profile() if 'cpu' in settings['modes'] else None
+        self.tracing = False
+        self.started_tracing = False
+        self.before: Optional[tracemalloc.Snapshot] = None
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{threading.get_ident() % 100000}"
+
+    def start(self) -> None:
+        if 'memory' in self.settings['modes']:
+            self.tracing = True
+            self.started_tracing = profiler._start_tracing()
+            if not self.started_tracing:
+                # Another capture or the caller is tracing; the peak is theirs, so ours is not reported
+                self.before = tracemalloc.take_snapshot()
+        self.resume()
+
+    def resume(self) -> None:
+        if self.profile is not None:
+            try:
+                self.profile.enable()
+            except ValueError as error:
+                # Python 3.12+ allows a single active profiler per process
+                logging.warning(f"Not CPU-profiling {self.labels['plugin']}.{self.labels['method']}: {error}")
+                self.profile = None
+
+    def pause(self) -> None:
+        if self.profile is not None:
+            self.profile.disable()
+
+    def stop(self, output_file: Optional[str], output_dir: Optional[str]) -> List[str]:
+        """
+        Ends the capture and writes its artifacts.
+
+        Args:
+            output_file (str, optional): The file the call produced; the artifacts are written next to it.
+            output_dir (str, optional): The directory the call wrote to, used when there is no output file.
+
+        Returns:
+            list: The paths of the artifacts written.
+        """
+        self.pause()
+        snapshot, peak = None, None
+        if self.tracing:
+            self.tracing = False
+            try:
+                if tracemalloc.is_tracing():
+                    snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_FRAMES)
+                    if self.started_tracing:
+                        peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                profiler._stop_tracing()
+
+        if output_file:
+            directory, name = os.path.split(os.path.abspath(output_file))
+        else:
+            directory, name = output_dir or self.settings['output_dir'] or DEFAULT_OUTPUT_DIR, 'profile'
+        base = os.path.join(directory, f"{name}.{self.labels['plugin']}.{self.labels['method']}.{self.run_id}")
+        os.makedirs(directory, exist_ok=True)
+
+        paths = []
+        if self.profile is not None:
+            self.profile.dump_stats(f"{base}.pstats")
+            paths.append(f"{base}.pstats")
+        if snapshot is not None:
+            self.write_allocations(f"{base}.allocations.txt", snapshot, peak)
+            paths.append(f"{base}.allocations.txt")
+        logging.info(f"Profile of {self.labels['plugin']}.{self.labels['method']} written to: {', '.join(paths)}")
+        return paths
+
+    def write_allocations(self, path: str, snapshot: tracemalloc.Snapshot, peak: Optional[int]) -> None:
+        if self.before is not None:
+            statistics = [stat for stat in snapshot.compare_to(self.before.filter_traces(_IGNORED_FRAMES), 'lineno')
+                          if stat.size_diff > 0]
+            statistics.sort(key=lambda stat: stat.size_diff, reverse=True)
+            sites = [(stat.traceback, stat.size_diff, stat.count_diff) for stat in statistics]
+        else:
+            sites = [(stat.traceback, stat.size, stat.count) for stat in snapshot.statistics('lineno')]
+
+        with open(path, 'w') as file:
+            file.write(f"{self.labels['plugin']}.{self.labels['method']}\n")
+            file.write(f"Peak traced memory: {'n/a (tracemalloc was already running)' if peak is None else f'{peak} bytes'}\n")
+            file.write(f"Memory allocated during the call and still held when it returned: {sum(site[1] for site in sites)} bytes\n\n")
+            for traceback, size, count in sites[:self.settings['top_allocations']]:
+                frame = traceback[0]
+                file.write(f"{size:>12} bytes {count:>8} blocks  {frame.filename}:{frame.lineno}\n")
+
+
+# The profiler shared by every module in the process
+profiler = Profiler()
+
+
+def _output_file(result: Any) -> Optional[str]:
+    return result if isinstance(result, str) and os.path.isfile(result) else None
+
+
+def _finish(capture: Capture, output_file: Optional[str], output_dir: Optional[str]) -> None:
+    try:
+        capture.stop(output_file, output_dir)
+    except OSError as error:
+        # A profile that cannot be written must not fail the extraction or load
+        logging.warning(f"Could not write the profile of {capture.labels['plugin']}.{capture.labels['method']}: {error}")
+
+
+def profile(cls: type, method_name: str) -> None:
+    """
+    Wraps a plugin method defined by ``cls`` so that it is profiled while profiling is enabled.
+
+    Disabled, a call costs a couple of attribute lookups. The CPU profile of ``extract_batches``
+    covers producing the batches, not the consumer processing them. Coroutine and async generator
+    methods are left alone, since every task interleaved on the event loop would show up in them. Called from ``__init_subclass__`` of the base
+    classes, so every plugin can be profiled without changes.
+
+    Args:
+        cls (type): The plugin class.
+        method_name (str): The method to wrap, if ``cls`` defines it.
+    """
+    method = cls.__dict__.get(method_name)
+    if method is None or not callable(method) or getattr(method, '__profiled__', False):
+        return
+    original = inspect.unwrap(method)
+    if inspect.iscoroutinefunction(original) or inspect.isasyncgenfunction(original):
+        return
+
+    if method_name == 'extract_batches':
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not profiler._enter():
+                return method(self, *args, **kwargs)
+            capture = profiler.capture({'plugin': type(self).__name__, 'method': method_name})
+            capture.start()
+            try:
+                batches = method(self, *args, **kwargs)
+            except BaseException:
+                _finish(capture, None, kwargs.get('output_path'))
+                raise
+            finally:
+                capture.pause()
+                profiler._exit()
+            return _profiled_batches(batches, capture, kwargs.get('output_path'))
+    else:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not profiler._enter():
+                return method(self, *args, **kwargs)
+            capture = profiler.capture({'plugin': type(self).__name__, 'method': method_name})
+            result = None
+            capture.start()
+            try:
+                result = method(self, *args, **kwargs)
+                return result
+            finally:
+                _finish(capture, _output_file(result), kwargs.get('output_path'))
+                profiler._exit()
+
+    wrapper.__profiled__ = True
+    setattr(cls, method_name, wrapper)
+
+
+def _profiled_batches(batches: Iterable[Any], capture: Capture, output_dir: Optional[str]) -> Iterator[Any]:
+    iterator = iter(batches)
+    try:
+        while True:
+            profiler._active.running = True
+            capture.resume()
+            try:
+                batch = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                capture.pause()
+                profiler._active.running = False
+            yield batch
+    finally:
+        if hasattr(iterator, 'close'):
+            iterator.close()
+        _finish(capture, None, output_dir)
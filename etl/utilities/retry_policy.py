@@ -0,0 +1,92 @@
+"""Retry policy with exponential backoff, jitter and an overall time budget."""
+
+import random
+from typing import Iterable, Optional, Tuple, Type
+
+DEFAULT_RETRY_ON_STATUS = (408, 429, 500, 502, 503, 504)
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed operation should be retried and how long to wait before doing so.
+
+    Errors are classified as transient either by type (``retry_on_exceptions``) or by the HTTP status
+    code they carry in a ``status_code`` attribute (``retry_on_status``). Waits grow exponentially
+    with the attempt number, are capped at ``max_backoff`` and, when ``jitter`` is enabled, are drawn
+    uniformly between zero and that bound so that parallel workers do not retry in lockstep.
+
+    Attributes:
+        max_attempts (int): The total number of attempts, including the first one.
+        backoff_factor (float): The wait in seconds before the first retry.
+        max_backoff (float): The upper bound in seconds for any single wait.
+        jitter (bool): Whether to randomize waits.
+        time_budget (float, optional): Seconds after which no further attempts are started.
+        retry_on_status (tuple): HTTP status codes that are considered transient.
+        retry_on_exceptions (tuple): Exception types that are considered transient.
+    """
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 backoff_factor: float = 1.0,
+                 max_backoff: float = 60.0,
+                 jitter: bool = True,
+                 time_budget: Optional[float] = None,
+                 retry_on_status: Iterable[int] = DEFAULT_RETRY_ON_STATUS,
+                 retry_on_exceptions: Tuple[Type[BaseException], ...] = (ConnectionError, TimeoutError)) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.time_budget = time_budget
+        self.retry_on_status = tuple(retry_on_status)
+        self.retry_on_exceptions = tuple(retry_on_exceptions)
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """
+        Classifies an error as transient or permanent.
+
+        Args:
+            error (BaseException): The error raised by the failed attempt.
+
+        Returns:
+            bool: True if the operation may succeed when attempted again.
+        """
+        if isinstance(error, self.retry_on_exceptions):
+            return True
+        return getattr(error, 'status_code', None) in self.retry_on_status
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Returns the number of seconds to wait after the given failed attempt.
+
+        Args:
+            attempt (int): The number of the attempt that failed, starting at 1.
+
+        Returns:
+            float: The wait in seconds.
+        """
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** (attempt - 1)))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def next_delay(self, error: BaseException, attempt: int, elapsed: float) -> Optional[float]:
+        """
+        Decides whether to retry after a failed attempt.
+
+        Args:
+            error (BaseException): The error raised by the failed attempt.
+            attempt (int): The number of the attempt that failed, starting at 1.
+            elapsed (float): Seconds spent on the operation so far, including earlier waits.
+
+        Returns:
+            float, optional: The wait in seconds before the next attempt, or None if the error should
+                be raised because it is permanent, the attempts are exhausted or the wait would
+                exceed the time budget.
+        """
+        if attempt >= self.max_attempts or not self.is_retryable(error):
+            return None
+        delay = self.backoff(attempt)
+        if self.time_budget is not None and elapsed + delay >= self.time_budget:
+            return None
+        return delay
@@ -5,8 +5,11 @@ from config_management.factory import get_secret_manager
 
 class ShareDriveManager:
 
-    secret_manager = get_secret_manager()
-    
+    @property
+    def secret_manager(self):
+        # Resolved on first use rather than at import time
+        return get_secret_manager()
+
     def __init__(self, mount_point):
         self.mount_point = mount_point
         self.share_drive_path = self.secret_manager.get_secret('share_drive', 'UNC_path')
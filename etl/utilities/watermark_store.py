@@ -0,0 +1,91 @@
+"""SQLite-backed store for incremental extraction watermarks."""
+
+import os
+import json
+import sqlite3
+import contextlib
+from typing import Any, Optional, Iterator
+
+DEFAULT_WATERMARK_PATH = os.path.join(os.path.expanduser('~'), '.data_sync_refinery', 'watermarks.db')
+
+
+class WatermarkStore:
+    """
+    Persists the last extraction point (high-water mark) of each extractor and source.
+
+    Watermarks live in a local SQLite database so that every read and write is atomic, also across
+    processes sharing the same file. Values are stored as JSON, so numbers and strings round-trip
+    unchanged; other types such as datetimes are stored as their string representation.
+
+    Attributes:
+        db_path (str): The path of the SQLite database file.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_WATERMARK_PATH, timeout: float = 30.0) -> None:
+        self.db_path = db_path
+        self.timeout = timeout
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                " namespace TEXT NOT NULL,"
+                " source TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,"
+                " PRIMARY KEY (namespace, source))"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Yields a connection whose statements are committed together, or rolled back on error."""
+        connection = sqlite3.connect(self.db_path, timeout=self.timeout)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, namespace: str, source: str) -> Optional[Any]:
+        """
+        Returns the stored watermark.
+
+        Args:
+            namespace (str): Groups the watermarks of one extractor, usually its class name.
+            source (str): The data source, table or report within the namespace.
+
+        Returns:
+            The stored value, or None if no watermark has been recorded yet.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM watermarks WHERE namespace = ? AND source = ?", (namespace, source)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, source: str, value: Any) -> None:
+        """
+        Records a watermark, replacing any previous value in a single transaction.
+
+        Args:
+            namespace (str): Groups the watermarks of one extractor, usually its class name.
+            source (str): The data source, table or report within the namespace.
+            value: The new watermark.
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO watermarks (namespace, source, value, updated_at)"
+                " VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+                (namespace, source, json.dumps(value, default=str)),
+            )
+
+    def delete(self, namespace: str, source: str) -> None:
+        """
+        Forgets a watermark so the next extraction of the source is a full pull.
+
+        Args:
+            namespace (str): Groups the watermarks of one extractor, usually its class name.
+            source (str): The data source, table or report within the namespace.
+        """
+        with self._connect() as connection:
+            connection.execute("DELETE FROM watermarks WHERE namespace = ? AND source = ?", (namespace, source))
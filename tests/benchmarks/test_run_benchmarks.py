@@ -0,0 +1,33 @@
+# Run test with
+# python3 -m unittest tests.benchmarks.test_run_benchmarks
+import unittest
+
+from benchmarks.run_benchmarks import run_benchmarks, compare
+
+
+class TestRunBenchmarks(unittest.TestCase):
+
+    def test_small_run_reports_every_benchmark(self):
+        results = run_benchmarks(rows=50, latency=0, batch_sizes=(10, 50), repeat=1, only=('ssrs', 'load'))
+
+        names = [(result['name'], result['parameters'].get('batch_size')) for result in results['results']]
+        self.assertIn(('ssrs_extract', None), names)
+        self.assertIn(('sqlalchemy_load', 10), names)
+        self.assertIn(('sqlalchemy_load', 50), names)
+        for result in results['results']:
+            self.assertGreater(result['seconds']['median'], 0)
+            self.assertGreater(result['throughput']['rows_per_second'], 0)
+            self.assertGreater(result['peak_memory_bytes'], 0)
+
+    def test_slower_medians_are_regressions(self):
+        def results(median):
+            return {'results': [{'name': 'sqlalchemy_load', 'parameters': {'batch_size': 10},
+                                 'seconds': {'median': median}}]}
+
+        self.assertFalse(compare(results(1.0), results(1.1), threshold=0.2)[0]['regression'])
+        self.assertTrue(compare(results(1.0), results(1.5), threshold=0.2)[0]['regression'])
+        self.assertEqual(compare(results(1.0), {'results': []}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# test_cached_manager.py
+# Run test with
+# python3 -m unittest tests.config_management.test_cached_manager
+import unittest
+from unittest.mock import Mock
+
+from config_management.abstract_manager import AbstractSecretManager
+from config_management.cached_manager import CachedSecretManager
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SectionManager(AbstractSecretManager):
+    """A manager that counts its calls and can fetch whole sections."""
+
+    def __init__(self, secrets):
+        self.secrets = secrets
+        self.calls = 0
+
+    def get_secret(self, section, key):
+        self.calls += 1
+        return self.secrets[section][key]
+
+    def get_secrets(self, section):
+        self.calls += 1
+        return dict(self.secrets[section])
+
+    def set_secret(self, section, key, value):
+        self.secrets[section][key] = value
+
+
+class TestCachedSecretManager(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.inner = SectionManager({'ssrs_credentials': {'domain': 'CORP', 'username': 'svc', 'password': 'one'}})
+        self.manager = CachedSecretManager(self.inner, ttl=60, clock=self.clock)
+
+    def test_keys_of_a_section_are_fetched_in_one_call(self):
+        self.assertEqual(self.manager.get_secret('ssrs_credentials', 'domain'), 'CORP')
+        self.assertEqual(self.manager.get_secret('ssrs_credentials', 'username'), 'svc')
+        self.assertEqual(self.manager.get_secret('ssrs_credentials', 'password'), 'one')
+
+        self.assertEqual(self.inner.calls, 1)
+        self.assertEqual(self.manager.stats()['hits'], 2)
+
+    def test_entries_expire_after_ttl(self):
+        self.manager.get_secret('ssrs_credentials', 'password')
+        self.inner.secrets['ssrs_credentials']['password'] = 'two'
+
+        self.clock.now = 59
+        self.assertEqual(self.manager.get_secret('ssrs_credentials', 'password'), 'one')
+        self.clock.now = 61
+        self.assertEqual(self.manager.get_secret('ssrs_credentials', 'password'), 'two')
+        self.assertEqual(self.inner.calls, 2)
+
+    def test_refresh_picks_up_a_rotated_secret(self):
+        self.manager.get_secret('ssrs_credentials', 'password')
+        self.inner.secrets['ssrs_credentials']['password'] = 'two'
+
+        self.assertTrue(self.manager.refresh('ssrs_credentials', 'password'))
+        self.assertEqual(self.manager.get_secret('ssrs_credentials', 'password'), 'two')
+        self.assertFalse(self.manager.refresh('ssrs_credentials', 'password'))
+
+    def test_invalidate_and_set_secret_drop_cached_values(self):
+        self.manager.get_secret('ssrs_credentials', 'domain')
+        self.manager.invalidate('ssrs_credentials')
+        self.manager.get_secret('ssrs_credentials', 'domain')
+        self.assertEqual(self.inner.calls, 2)
+
+        self.manager.set_secret('ssrs_credentials', 'domain', 'NEW')
+        self.assertEqual(self.manager.get_secret('ssrs_credentials', 'domain'), 'NEW')
+
+    def test_missing_key_raises(self):
+        with self.assertRaises(ValueError):
+            self.manager.get_secret('ssrs_credentials', 'missing')
+
+    def test_stale_value_is_served_when_refresh_fails(self):
+        self.manager.stale_if_error = 30
+        self.manager.get_secret('ssrs_credentials', 'domain')
+        self.inner.get_secrets = Mock(side_effect=ConnectionError("throttled"))
+
+        self.clock.now = 80
+        self.assertEqual(self.manager.get_secret('ssrs_credentials', 'domain'), 'CORP')
+        self.clock.now = 100
+        with self.assertRaises(ConnectionError):
+            self.manager.get_secret('ssrs_credentials', 'domain')
+
+    def test_managers_without_batch_support_are_queried_per_key(self):
+        inner = Mock(spec=['get_secret', 'set_secret', 'get_secrets'])
+        inner.get_secrets.side_effect = NotImplementedError
+        inner.get_secret.side_effect = lambda *key: '/'.join(key)
+        manager = CachedSecretManager(inner, ttl=60, clock=self.clock)
+
+        self.assertEqual(manager.get_secret('KEY1'), 'KEY1')
+        self.assertEqual(manager.get_secret('share_drive', 'UNC_path'), 'share_drive/UNC_path')
+        self.assertEqual(manager.get_secret('share_drive', 'UNC_path'), 'share_drive/UNC_path')
+        self.assertEqual(inner.get_secret.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
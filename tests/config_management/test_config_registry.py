@@ -0,0 +1,80 @@
+# test_config_registry.py
+# Run test with
+# python3 -m unittest tests.config_management.test_config_registry
+import os
+import tempfile
+import configparser
+import unittest
+
+from config_management.config_registry import ConfigRegistry
+
+
+class TestConfigRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.registry = ConfigRegistry()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def test_yaml_is_parsed_once(self):
+        path = self.write('config.yml', "ssrs:\n  max_concurrency: 4\n")
+
+        first = self.registry.load_yaml(path)
+        second = self.registry.load_yaml(path)
+
+        self.assertIs(first, second)
+        self.assertEqual(first, {'ssrs': {'max_concurrency': 4}})
+        self.assertEqual(self.registry.stats(), {'hits': 1, 'loads': 1})
+
+    def test_changed_file_is_reloaded(self):
+        path = self.write('config.yml', "value: 1\n")
+        self.registry.load_yaml(path)
+
+        self.write('config.yml', "value: 22\n")
+
+        self.assertEqual(self.registry.load_yaml(path), {'value': 22})
+
+    def test_replaced_file_is_reloaded(self):
+        path = self.write('config.ini', "[General]\nSECRET_MANAGER = YAML\n")
+        stat = os.stat(path)
+        self.registry.load_ini(path)
+
+        # Same size and modification time, but a new inode
+        replacement = self.write('replacement.ini', "[General]\nSECRET_MANAGER = AWS1\n")
+        os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(replacement, path)
+
+        self.assertEqual(self.registry.load_ini(path)['General']['SECRET_MANAGER'], 'AWS1')
+
+    def test_missing_ini_file_is_read_once_it_appears(self):
+        path = os.path.join(self.directory.name, 'config.ini')
+        self.assertEqual(self.registry.load_ini(path).sections(), [])
+
+        self.write('config.ini', "[General]\nSECRET_MANAGER = YAML\n")
+
+        self.assertEqual(self.registry.load_ini(path)['General']['SECRET_MANAGER'], 'YAML')
+
+    def test_interpolation_is_part_of_the_key(self):
+        path = self.write('db.ini', "[postgres]\ndb_password = 100%(secret)s\n")
+
+        self.assertEqual(self.registry.load_ini(path, interpolation=False)['postgres']['db_password'], '100%(secret)s')
+        with self.assertRaises(configparser.InterpolationMissingOptionError):
+            self.registry.load_ini(path)['postgres']['db_password']
+
+    def test_invalidate_forces_a_reload(self):
+        path = self.write('config.yml', "value: 1\n")
+        first = self.registry.load_yaml(path)
+
+        self.registry.invalidate(path)
+
+        self.assertIsNot(self.registry.load_yaml(path), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
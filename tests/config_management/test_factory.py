@@ -0,0 +1,65 @@
+# test_factory.py
+# Run test with
+# python3 -m unittest tests.config_management.test_factory
+import os
+import configparser
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from config_management import factory
+from config_management.cached_manager import CachedSecretManager
+from config_management.yaml_manager import YAMLSecretManager
+
+
+class TestGetSecretManager(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        secrets_path = os.path.join(self.directory.name, 'secrets.yml')
+        with open(secrets_path, 'w') as file:
+            file.write("share_drive:\n  UNC_path: //server/share\n")
+        self.config_path = Path(self.directory.name) / 'config.ini'
+        self.write_config(f"[General]\nSECRET_MANAGER = YAML\n\n[YAML]\nSECRETS_PATH = {secrets_path}\n")
+
+        patcher = patch.object(factory, 'CONFIG_PATH', self.config_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        factory.reset_secret_manager()
+        self.addCleanup(factory.reset_secret_manager)
+
+    def write_config(self, content):
+        with open(self.config_path, 'w') as file:
+            file.write(content)
+
+    def test_manager_is_created_once_and_cached(self):
+        with patch.object(configparser.ConfigParser, 'read', autospec=True,
+                          side_effect=configparser.ConfigParser.read) as mock_read:
+            first = factory.get_secret_manager()
+            second = factory.get_secret_manager()
+
+        self.assertIs(first, second)
+        self.assertIsInstance(first, CachedSecretManager)
+        self.assertIsInstance(first.manager, YAMLSecretManager)
+        self.assertEqual(first.get_secret('share_drive', 'UNC_path'), '//server/share')
+        mock_read.assert_called_once()
+
+    def test_cache_can_be_disabled(self):
+        self.write_config(self.config_path.read_text().replace("SECRET_MANAGER = YAML\n",
+                                                               "SECRET_MANAGER = YAML\nSECRET_CACHE_TTL = 0\n"))
+
+        self.assertIsInstance(factory.get_secret_manager(), YAMLSecretManager)
+
+    def test_reset_rereads_the_configuration(self):
+        factory.get_secret_manager()
+        self.write_config("[General]\nSECRET_MANAGER = NOPE\n")
+        factory.reset_secret_manager()
+
+        with self.assertRaises(ValueError):
+            factory.get_secret_manager()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,8 +26,9 @@ class TestINISecretManager(unittest.TestCase):
     def test_set_secret(self, mock_file_open):
         self.ini_manager.set_secret('NEW_KEY', 'NEW_VALUE')
         
-        # Check if the correct value is set
-        self.assertEqual(self.mock_config['Secrets']['NEW_KEY'], 'NEW_VALUE')
+        # Check if the correct value is set, without changing the shared parser
+        self.assertEqual(self.ini_manager.config['Secrets']['NEW_KEY'], 'NEW_VALUE')
+        self.assertFalse(self.mock_config.has_section('Secrets'))
 
         # Check if file write has been triggered
         mock_file_open.assert_called_with('../secrets.ini', 'w')
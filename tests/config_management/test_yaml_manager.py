@@ -1,9 +1,11 @@
 # test_yaml_manager.py
 # Run test with
 # python3.6 -m unittest tests.config_management.test_yaml_manager
+import os
 import warnings
+import tempfile
 import unittest
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 from config_management.yaml_manager import YAMLSecretManager
 
 try:
@@ -22,9 +24,13 @@ Database:
 Secrets:
   KEY1: VALUE1
 '''
-        self.mock_open = mock_open(read_data=self.mock_yaml_content)
-        with patch('config_management.yaml_manager.open', self.mock_open):
-            self.yaml_manager = YAMLSecretManager('mock_file.yaml')  # The filename doesn't matter because it's mocked.
+        # The file is parsed through the config registry, so it has to exist on disk.
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.filepath = os.path.join(self.directory.name, 'mock_file.yaml')
+        with open(self.filepath, 'w') as file:
+            file.write(self.mock_yaml_content)
+        self.yaml_manager = YAMLSecretManager(self.filepath)
 
     def test_get_valid(self):
         host = self.yaml_manager.get_secret('Database', 'Host')
@@ -51,5 +57,13 @@ Secrets:
         # Check if the YAML dump method was called
         mock_safe_dump.assert_called_once()
 
+    def test_set_leaves_the_shared_document_alone(self):
+        shared = self.yaml_manager.config
+
+        self.yaml_manager.set_secret('Database', 'Port', '3306')
+
+        self.assertNotIn('Port', shared['Database'])
+        self.assertEqual(YAMLSecretManager(self.filepath).get_secret('Database', 'Port'), '3306')
+
 if __name__ == '__main__':
     unittest.main()
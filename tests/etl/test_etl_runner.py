@@ -0,0 +1,224 @@
+# Run test with
+# python3 -m unittest tests.etl.test_etl_runner
+import os
+import time
+import threading
+import unittest
+from unittest.mock import Mock
+
+from etl.etl_runner import PipelineRunner, PipelineError, ProcessPoolStage
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def square_in_worker(batch):
+    # Later batches finish first, so unordered results come back out of order
+    time.sleep(0.05 / (batch[0] + 1))
+    return [(value * value, os.getpid()) for value in batch]
+
+
+def fail_on_three(batch):
+    if batch[0] == 3:
+        raise ValueError("bad batch")
+    return batch
+
+
+def keep_even_ids(rows):
+    return [row for row in rows if row['id'] % 2 == 0] or None
+
+
+class RecordingExtractor:
+    """Extractor stand-in producing numbered batches and tracking how far it ran ahead."""
+
+    def __init__(self, batches, fail_at=None):
+        self.batches = batches
+        self.fail_at = fail_at
+        self.produced = 0
+        self.closed = False
+
+    def extract_batches(self, **options):
+        self.options = options
+        try:
+            for index in range(self.batches):
+                if index == self.fail_at:
+                    raise RuntimeError("source went away")
+                self.produced += 1
+                yield [index]
+        finally:
+            self.closed = True
+
+
+class IncrementalExtractor(RecordingExtractor):
+    """Defers a watermark once its batches run out, as incremental extractors do."""
+
+    def __init__(self, batches):
+        super().__init__(batches)
+        self.pending = None
+        self.committed = None
+
+    def extract_batches(self, **options):
+        yield from super().extract_batches(**options)
+        self.pending = self.produced
+
+    def commit_extraction_points(self):
+        self.committed, self.pending = self.pending, None
+
+    def discard_extraction_points(self):
+        self.pending = None
+
+
+class RecordingLoader:
+
+    def __init__(self, extractor=None, fail_at=None):
+        self.extractor = extractor
+        self.fail_at = fail_at
+        self.loaded = []
+        self.max_lead = 0
+        self.options = None
+
+    def load(self, batch, **options):
+        self.options = options
+        if len(self.loaded) == self.fail_at:
+            raise RuntimeError("database went away")
+        if self.extractor is not None:
+            self.max_lead = max(self.max_lead, self.extractor.produced - len(self.loaded))
+        self.loaded.append(batch)
+
+
+class TestPipelineRunner(unittest.TestCase):
+
+    def test_batches_flow_through_transforms_in_order(self):
+        extractor = RecordingExtractor(6)
+        loader = RecordingLoader()
+        doubler = Mock()
+        doubler.transform.side_effect = lambda batch: [value * 2 for value in batch]
+
+        def drop_multiples_of_four(batch):
+            return None if batch[0] % 4 == 0 else batch
+
+        runner = PipelineRunner(extractor, loader, [doubler, drop_multiples_of_four],
+                                extract_options={'data_source_name': 'ed_events'}, load_options={'table': 'events'})
+        stats = runner.run()
+
+        self.assertEqual(loader.loaded, [[2], [6], [10]])
+        self.assertEqual(extractor.options, {'data_source_name': 'ed_events'})
+        self.assertEqual(loader.options, {'table': 'events'})
+        self.assertEqual((stats['batches_extracted'], stats['batches_loaded']), (6, 3))
+        self.assertIn('transform[1]:drop_multiples_of_four', stats['busy_seconds'])
+
+    def test_queues_bound_how_far_the_extractor_runs_ahead(self):
+        extractor = RecordingExtractor(50)
+        loader = RecordingLoader(extractor)
+        slow = threading.Event()
+
+        def slow_load(batch, **options):
+            slow.wait(0.001)
+            RecordingLoader.load(loader, batch)
+        loader.load = slow_load
+
+        PipelineRunner(extractor, loader, queue_size=2).run()
+
+        self.assertEqual(len(loader.loaded), 50)
+        # queue depth, plus one batch in the loader's hands and one the extractor is waiting to enqueue
+        self.assertLessEqual(loader.max_lead, 2 + 2)
+
+    def test_loader_failure_stops_the_extractor(self):
+        extractor = RecordingExtractor(1000)
+        loader = RecordingLoader(fail_at=2)
+
+        with self.assertRaises(PipelineError) as context:
+            PipelineRunner(extractor, loader, queue_size=1).run()
+
+        self.assertIsInstance(context.exception.__cause__, RuntimeError)
+        self.assertTrue(extractor.closed)
+        self.assertLess(extractor.produced, 1000)
+
+    def test_extractor_failure_is_raised(self):
+        loader = RecordingLoader()
+
+        with self.assertRaises(PipelineError):
+            PipelineRunner(RecordingExtractor(5, fail_at=3), loader, [lambda batch: batch]).run()
+
+        self.assertLessEqual(len(loader.loaded), 3)
+
+    def test_watermark_is_committed_only_after_the_last_batch_is_loaded(self):
+        extractor = IncrementalExtractor(4)
+
+        # The extractor is exhausted while its last batches are still queued for the loader
+        with self.assertRaises(PipelineError):
+            PipelineRunner(extractor, RecordingLoader(fail_at=3), queue_size=4).run()
+        self.assertEqual((extractor.pending, extractor.committed), (None, None))
+
+        extractor = IncrementalExtractor(4)
+        PipelineRunner(extractor, RecordingLoader(), queue_size=4).run()
+        self.assertEqual(extractor.committed, 4)
+
+
+class TestProcessPoolStage(unittest.TestCase):
+
+    def test_results_keep_input_order_across_processes(self):
+        loader = RecordingLoader()
+
+        stats = PipelineRunner(RecordingExtractor(8), loader, [ProcessPoolStage(square_in_worker, max_workers=2)]).run()
+
+        self.assertEqual([batch[0][0] for batch in loader.loaded], [index * index for index in range(8)])
+        self.assertNotIn(os.getpid(), {batch[0][1] for batch in loader.loaded})
+        self.assertGreater(stats['busy_seconds']['transform[0]:process_pool(square_in_worker)'], 0)
+
+    def test_unordered_results_are_yielded_when_ready(self):
+        stage = ProcessPoolStage(square_in_worker, max_workers=4, ordered=False, max_in_flight=4)
+
+        results = [batch[0][0] for batch in stage.map([[index] for index in range(4)])]
+
+        self.assertEqual(sorted(results), [0, 1, 4, 9])
+        self.assertEqual(stage.stats['batches'], 4)
+
+    def test_workers_are_not_forked(self):
+        self.assertNotEqual(ProcessPoolStage(square_in_worker).mp_context.get_start_method(), 'fork')
+
+    def test_finished_results_are_yielded_before_the_window_fills(self):
+        events = []
+
+        def slow_source():
+            # A slow extractor: the first batch is long done before the window of 20 could fill
+            for index in range(20):
+                events.append('in')
+                yield [index]
+                time.sleep(0.1)
+
+        stage = ProcessPoolStage(square_in_worker, max_workers=1, max_in_flight=20)
+        for _ in stage.map(slow_source()):
+            events.append('out')
+
+        self.assertEqual(events.count('out'), 20)
+        self.assertLess(events.index('out'), len(events) - 20)
+
+    def test_worker_errors_fail_the_pipeline(self):
+        with self.assertRaises(PipelineError) as context:
+            PipelineRunner(RecordingExtractor(6), RecordingLoader(), [ProcessPoolStage(fail_on_three, max_workers=2)]).run()
+
+        self.assertIsInstance(context.exception.__cause__, ValueError)
+
+    @unittest.skipIf(pa is None, "pyarrow is required to pass batches as Arrow IPC buffers")
+    def test_row_batches_travel_as_arrow_buffers(self):
+        stage = ProcessPoolStage(keep_even_ids, max_workers=2)
+        batches = [[{'id': index, 'name': f"row {index}"} for index in range(start, start + 3)] for start in (0, 3, 6)]
+
+        self.assertEqual(list(stage.map(batches)), [[{'id': 0, 'name': 'row 0'}, {'id': 2, 'name': 'row 2'}],
+                                                    [{'id': 4, 'name': 'row 4'}],
+                                                    [{'id': 6, 'name': 'row 6'}, {'id': 8, 'name': 'row 8'}]])
+
+    @unittest.skipIf(pa is None, "pyarrow is required for Arrow transformers")
+    def test_arrow_transformers_receive_tables(self):
+        from etl.plugins.transformers.arrow_transformer_plugin.plugin import CastColumns
+
+        stage = ProcessPoolStage(CastColumns({'id': 'int64'}), max_workers=2)
+
+        self.assertEqual(list(stage.map([pa.record_batch({'id': ['1', '2']})]))[0].column(0).to_pylist(), [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
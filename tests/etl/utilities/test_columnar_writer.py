@@ -0,0 +1,78 @@
+# Run test with
+# python3 -m unittest tests.etl.utilities.test_columnar_writer
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from etl.utilities import columnar_writer
+from etl.utilities.columnar_writer import write_columnar
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+CSV = b"id,mrn,department\n" + b"".join(f"{index},{index:08d},ED\n".encode() for index in range(1, 101))
+
+
+@unittest.skipIf(pa is None, "pyarrow is required for columnar output")
+class TestWriteColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_parquet_is_written_in_full_row_groups(self):
+        path = os.path.join(self.directory.name, "events.parquet")
+
+        stats = write_columnar(io.BytesIO(CSV), path, 'parquet', block_size=256, row_group_size=40,
+                               column_types={'mrn': 'string'})
+
+        metadata = pq.ParquetFile(path).metadata
+        self.assertEqual((stats['rows'], stats['row_groups']), (100, 3))
+        self.assertEqual([metadata.row_group(index).num_rows for index in range(metadata.num_row_groups)], [40, 40, 20])
+        table = pq.read_table(path)
+        self.assertEqual(table.column('mrn')[0].as_py(), '00000001')
+        self.assertEqual(table.schema.field('id').type, pa.int64())
+        self.assertEqual(stats['bytes'], os.path.getsize(path))
+
+    def test_arrow_file_can_be_memory_mapped(self):
+        path = os.path.join(self.directory.name, "events.arrow")
+
+        stats = write_columnar(io.BytesIO(CSV), path, 'arrow', block_size=256)
+
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        self.assertEqual(table.num_rows, 100)
+        self.assertEqual(stats['batches'], pa.ipc.open_file(pa.memory_map(path)).num_record_batches)
+
+    def test_failed_conversion_keeps_previous_file(self):
+        path = os.path.join(self.directory.name, "events.parquet")
+        with open(path, 'wb') as file:
+            file.write(b"previous")
+
+        with self.assertRaises(pa.ArrowInvalid):
+            write_columnar(io.BytesIO(b"id\n1\nnot a number\n"), path, column_types={'id': 'int64'})
+
+        with open(path, 'rb') as file:
+            self.assertEqual(file.read(), b"previous")
+        self.assertEqual(os.listdir(self.directory.name), ["events.parquet"])
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            write_columnar(io.BytesIO(CSV), os.path.join(self.directory.name, "events.orc"), 'orc')
+
+
+class TestRequirePyarrow(unittest.TestCase):
+
+    def test_missing_pyarrow_raises_a_helpful_error(self):
+        with patch.object(columnar_writer, 'pa', None):
+            with self.assertRaisesRegex(ImportError, "pip install pyarrow"):
+                write_columnar(io.BytesIO(CSV), "events.parquet")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# Run test with
+# python3 -m unittest tests.etl.utilities.test_engine_registry
+import os
+import asyncio
+import tempfile
+import unittest
+import importlib.util
+
+from sqlalchemy import exc, text
+
+from etl.utilities.engine_registry import EngineRegistry, InstrumentedQueuePool, InstrumentedAsyncQueuePool
+
+
+class TestEngineRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.registry = EngineRegistry()
+        self.addCleanup(self.registry.dispose)
+        self.url = f"sqlite:///{os.path.join(self.directory.name, 'target.db')}"
+
+    def test_same_url_and_options_share_one_engine(self):
+        first = self.registry.get_engine(self.url, pool_size=2)
+        second = self.registry.get_engine(self.url, pool_size=2)
+        other = self.registry.get_engine(self.url, pool_size=3)
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertIsInstance(first.pool, InstrumentedQueuePool)
+        self.assertEqual(first.pool.size(), 2)
+
+    def test_defaults_are_part_of_the_key(self):
+        self.assertIs(self.registry.get_engine(self.url), self.registry.get_engine(self.url, pool_pre_ping=True))
+
+    def test_stats_report_checkouts_and_saturation(self):
+        engine = self.registry.get_engine(self.url, pool_size=1, max_overflow=1)
+
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            stats = self.registry.stats()[f"{self.url} (max_overflow=1, pool_size=1)"]
+            self.assertEqual((stats['size'], stats['checked_out'], stats['saturation']), (1, 1, 0.5))
+
+        stats = self.registry.stats()[f"{self.url} (max_overflow=1, pool_size=1)"]
+        self.assertEqual((stats['checked_out'], stats['checkouts'], stats['timeouts']), (0, 1, 0))
+        self.assertGreaterEqual(stats['max_wait_seconds'], 0)
+
+    def test_checkout_timeouts_are_counted(self):
+        engine = self.registry.get_engine(self.url, pool_size=1, max_overflow=0, pool_timeout=0.05)
+
+        with engine.connect():
+            with self.assertRaises(exc.TimeoutError):
+                engine.connect()
+
+        self.assertEqual(self.registry.stats()[f"{self.url} (max_overflow=0, pool_size=1, pool_timeout=0.05)"]['timeouts'], 1)
+
+    def test_empty_connect_args_share_the_default_engine(self):
+        self.assertIs(self.registry.get_engine(self.url), self.registry.get_engine(self.url, connect_args={}))
+
+    def test_stats_list_every_engine_of_a_url(self):
+        self.registry.get_engine(self.url)
+        self.registry.get_engine(self.url, pool_size=2, connect_args={'timeout': 5})
+
+        self.assertEqual(sorted(self.registry.stats()), [self.url, f"{self.url} (connect_args, pool_size=2)"])
+
+    def test_dispose_forgets_the_engine(self):
+        engine = self.registry.get_engine(self.url)
+
+        self.registry.dispose(self.url)
+
+        self.assertIsNot(self.registry.get_engine(self.url), engine)
+
+    def test_in_memory_sqlite_keeps_its_own_pool(self):
+        engine = self.registry.get_engine("sqlite://")
+
+        self.assertNotIsInstance(engine.pool, InstrumentedQueuePool)
+        self.assertEqual(self.registry.stats()["sqlite://"]['pool'], type(engine.pool).__name__)
+
+    @unittest.skipUnless(importlib.util.find_spec('greenlet') and importlib.util.find_spec('aiosqlite'),
+                         "greenlet and aiosqlite are required for async engines")
+    def test_async_engines_are_shared_and_instrumented(self):
+        url = self.url.replace('sqlite://', 'sqlite+aiosqlite://')
+        engine = self.registry.get_async_engine(url, pool_size=1)
+
+        async def query():
+            async with engine.connect() as connection:
+                return (await connection.execute(text("SELECT 1"))).scalar()
+
+        self.assertEqual(asyncio.run(query()), 1)
+        self.assertIs(self.registry.get_async_engine(url, pool_size=1), engine)
+        self.assertIsInstance(engine.sync_engine.pool, InstrumentedAsyncQueuePool)
+        self.assertEqual(self.registry.stats()[f"{url} (async, pool_size=1)"]['checkouts'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# Run test with
+# python3 -m unittest tests.etl.utilities.test_extraction_cache
+import os
+import time
+import tempfile
+import unittest
+
+from etl.utilities.extraction_cache import ExtractionCache
+
+
+class TestExtractionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = ExtractionCache(os.path.join(self.directory.name, 'cache'), ttl=60)
+
+    def _write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as file:
+            file.write(content)
+        return path
+
+    def _read(self, path):
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def test_key_ignores_parameter_order(self):
+        first = ExtractionCache.make_key("https://host/ReportServer?%2FReport&a=1&b=2")
+        second = ExtractionCache.make_key("https://HOST/ReportServer?%2FReport&b=2&a=1")
+        other = ExtractionCache.make_key("https://host/ReportServer?%2FReport&a=1&b=3")
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test_fetch_after_put_is_a_hit(self):
+        source = self._write('report.csv', b"a,b\n1,2\n")
+        self.assertFalse(self.cache.fetch('key', os.path.join(self.directory.name, 'miss.csv')))
+
+        self.cache.put('key', source)
+        destination = os.path.join(self.directory.name, 'copy.csv')
+        self.assertTrue(self.cache.fetch('key', destination))
+
+        self.assertEqual(self._read(destination), b"a,b\n1,2\n")
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['stores']), (1, 1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_copy_mode_does_not_share_the_entry(self):
+        self.cache.link = False
+        self.cache.put('key', self._write('report.csv', b"data"))
+        destination = os.path.join(self.directory.name, 'copy.csv')
+        self.cache.fetch('key', destination)
+        self.assertNotEqual(os.stat(destination).st_ino, os.stat(self.cache.get('key')).st_ino)
+
+    def test_expired_entries_are_misses(self):
+        entry = self.cache.put('key', self._write('report.csv', b"data"))
+        stale = time.time() - 120
+        os.utime(entry, (stale, stale))
+
+        self.assertIsNone(self.cache.get('key'))
+        self.assertFalse(os.path.exists(entry))
+
+    def test_least_recently_used_entries_are_evicted_first(self):
+        self.cache.max_bytes = 10
+        now = time.time()
+        old = self.cache.put('old', self._write('old.csv', b"1234"))
+        recent = self.cache.put('recent', self._write('recent.csv', b"5678"))
+        os.utime(old, (now - 30, now - 30))
+        os.utime(recent, (now - 20, now - 40))
+
+        self.cache.put('new', self._write('new.csv', b"9012"))
+
+        self.assertIsNone(self.cache.get('old'))
+        self.assertIsNotNone(self.cache.get('recent'))
+        self.assertIsNotNone(self.cache.get('new'))
+
+
+if __name__ == '__main__':
+    unittest.main()
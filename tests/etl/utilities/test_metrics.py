@@ -0,0 +1,180 @@
+# Run test with
+# python3 -m unittest tests.etl.utilities.test_metrics
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+
+from etl.base.base_loader import BaseLoader
+from etl.utilities.metrics import (MetricsRegistry, InMemorySink, JsonLinesSink, PrometheusSink, metrics_registry,
+                                   instrument)
+
+
+class RecordingLoader(BaseLoader):
+
+    def connect(self):
+        pass
+
+    def validate(self, data):
+        pass
+
+    def load(self, data):
+        if data == 'broken':
+            raise RuntimeError("database went away")
+        return {'rows': len(data)}
+
+    def close(self):
+        pass
+
+
+class BatchingLoader(RecordingLoader):
+
+    def load(self, data):
+        # Calls the instrumented parent, which must not be counted a second time
+        return super().load(data)
+
+
+class BatchSource:
+
+    def extract_batches(self, batches):
+        for batch in batches:
+            yield batch
+
+
+instrument(BatchSource, 'extract_batches')
+
+
+class FilteringSource(BatchSource):
+
+    def extract_batches(self, batches):
+        # Yields from the instrumented parent, whose batches must not be counted a second time
+        for batch in super().extract_batches(batches):
+            yield [row for row in batch if row]
+
+
+instrument(FilteringSource, 'extract_batches')
+
+
+class AsyncSource:
+
+    async def extract(self, delay):
+        await asyncio.sleep(delay)
+        return delay
+
+
+instrument(AsyncSource, 'extract')
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry(buckets=(0.1, 1.0))
+
+    def test_counters_and_histograms_are_aggregated_per_label_set(self):
+        self.registry.increment('rows', 10, plugin='A')
+        self.registry.increment('rows', 5, plugin='A')
+        self.registry.increment('rows', 1, plugin='B')
+        for value in (0.05, 0.5, 5.0):
+            self.registry.observe('batch_seconds', value, plugin='A')
+
+        snapshot = self.registry.snapshot()
+
+        self.assertEqual(snapshot['counters']['rows'], {(('plugin', 'A'),): 15, (('plugin', 'B'),): 1})
+        histogram = snapshot['histograms']['batch_seconds'][(('plugin', 'A'),)]
+        self.assertEqual((histogram['count'], histogram['sum']), (3, 5.55))
+        self.assertEqual(histogram['buckets'], [(0.1, 1), (1.0, 2), (float('inf'), 3)])
+
+    def test_prometheus_text_format(self):
+        self.registry.increment('retries', plugin='SSRSExtractor')
+        self.registry.observe('download_seconds', 0.5, plugin='SSRSExtractor')
+
+        text = self.registry.render_prometheus()
+
+        self.assertIn('# TYPE data_sync_refinery_retries_total counter\n'
+                      'data_sync_refinery_retries_total{plugin="SSRSExtractor"} 1\n', text)
+        self.assertIn('data_sync_refinery_download_seconds_bucket{plugin="SSRSExtractor",le="0.1"} 0\n', text)
+        self.assertIn('data_sync_refinery_download_seconds_bucket{plugin="SSRSExtractor",le="+Inf"} 1\n', text)
+        self.assertIn('data_sync_refinery_download_seconds_count{plugin="SSRSExtractor"} 1\n', text)
+
+    def test_sinks_receive_every_measurement(self):
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, 'metrics.jsonl')
+            prometheus_path = os.path.join(directory, 'metrics.prom')
+            memory = self.registry.add_sink(InMemorySink())
+            json_lines = self.registry.add_sink(JsonLinesSink(json_path))
+            self.registry.add_sink(PrometheusSink(prometheus_path, namespace=''))
+
+            with self.registry.timer('connect_seconds', plugin='SQLExtractor'):
+                pass
+            self.registry.increment('bytes', 2048, plugin='SSRSExtractor')
+            self.registry.flush()
+            json_lines.close()
+
+            with open(json_path) as file:
+                events = [json.loads(line) for line in file]
+            with open(prometheus_path) as file:
+                exposition = file.read()
+
+        self.assertEqual([event['name'] for event in events], ['connect_seconds', 'bytes'])
+        self.assertEqual(events[1]['labels'], {'plugin': 'SSRSExtractor'})
+        self.assertEqual(len(memory.find('bytes', plugin='SSRSExtractor')), 1)
+        self.assertIn('bytes_total{plugin="SSRSExtractor"} 2048', exposition)
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.sink = metrics_registry.add_sink(InMemorySink())
+        self.addCleanup(metrics_registry.remove_sink, self.sink)
+
+    def test_loader_subclasses_are_instrumented(self):
+        loader = BatchingLoader()
+
+        loader.load([1, 2, 3])
+        with self.assertRaises(RuntimeError):
+            loader.load('broken')
+
+        self.assertEqual(len(self.sink.find('stage_calls', plugin='BatchingLoader', method='load')), 1)
+        self.assertEqual(len(self.sink.find('stage_seconds', plugin='BatchingLoader', method='load')), 2)
+        self.assertEqual(len(self.sink.find('stage_errors', plugin='BatchingLoader', method='load')), 1)
+        self.assertEqual([event['value'] for event in self.sink.find('rows', plugin='BatchingLoader')], [3])
+
+    def test_batches_are_timed_and_counted(self):
+        batches = list(BatchSource().extract_batches([[1, 2], [3]]))
+
+        self.assertEqual(batches, [[1, 2], [3]])
+        self.assertEqual(len(self.sink.find('first_batch_seconds', plugin='BatchSource')), 1)
+        self.assertEqual(len(self.sink.find('batch_seconds', plugin='BatchSource')), 2)
+        self.assertEqual(sum(event['value'] for event in self.sink.find('rows', plugin='BatchSource')), 3)
+        self.assertEqual(len(self.sink.find('stage_calls', plugin='BatchSource', method='extract_batches')), 1)
+
+    def test_abandoned_batch_streams_are_not_errors(self):
+        batches = BatchSource().extract_batches([[1], [2]])
+        next(batches)
+        batches.close()
+
+        self.assertFalse(self.sink.find('stage_errors', plugin='BatchSource'))
+        self.assertEqual(len(self.sink.find('stage_seconds', plugin='BatchSource')), 1)
+
+    def test_subclass_batches_are_counted_once(self):
+        self.assertEqual(list(FilteringSource().extract_batches([[1, 0], [2]])), [[1], [2]])
+
+        self.assertEqual(len(self.sink.find('batches')), 2)
+        self.assertEqual(sum(event['value'] for event in self.sink.find('rows')), 2)
+        self.assertEqual({event['labels']['plugin'] for event in self.sink.find('batches')}, {'FilteringSource'})
+
+    def test_concurrent_coroutines_are_each_counted(self):
+        source = AsyncSource()
+
+        async def extract_concurrently():
+            return await asyncio.gather(source.extract(0.01), source.extract(0.02))
+
+        self.assertEqual(asyncio.run(extract_concurrently()), [0.01, 0.02])
+        self.assertEqual(len(self.sink.find('stage_calls', plugin='AsyncSource', method='extract')), 2)
+        durations = [event['value'] for event in self.sink.find('stage_seconds', plugin='AsyncSource')]
+        self.assertTrue(all(duration >= 0.01 for duration in durations))
+
+
+if __name__ == '__main__':
+    unittest.main()
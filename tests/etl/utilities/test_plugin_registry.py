@@ -0,0 +1,152 @@
+# Run test with
+# python3 -m unittest tests.etl.utilities.test_plugin_registry
+import os
+import sys
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from etl.utilities import plugin_registry
+from etl.utilities.plugin_registry import PluginRegistry
+
+LOADER_PLUGIN = '''
+from etl.base.base_loader import BaseLoader
+
+
+class _Helper:
+    pass
+
+
+class CsvLoader(BaseLoader):
+
+    def __init__(self, path=None):
+        self.path = path
+
+    def connect(self):
+        pass
+
+    def validate(self, data):
+        pass
+
+    def load(self, data):
+        pass
+
+    def close(self):
+        pass
+'''
+
+TRANSFORMER_PLUGIN = '''
+from abc import abstractmethod
+
+from etl.base.base_transformer import BaseTransformer
+
+
+class ColumnTransformer(BaseTransformer):
+
+    @abstractmethod
+    def transform_column(self, column):
+        pass
+
+
+class Upper(ColumnTransformer):
+    pass
+
+
+class Lower(ColumnTransformer):
+    pass
+'''
+
+
+class TestPluginRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        # A throwaway package on sys.path, so the plugins can be imported without touching the real tree
+        self.package = f"registry_plugins_{id(self)}"
+        self.plugins_dir = os.path.join(self.directory.name, self.package)
+        sys.path.insert(0, self.directory.name)
+        self.addCleanup(sys.path.remove, self.directory.name)
+        self.write('loaders/csv_loader_plugin/plugin.py', LOADER_PLUGIN)
+        self.write('loaders/csv_loader_plugin/config.yml', "csv:\n  delimiter: ','\n")
+        self.write('transformers/case_plugin/plugin.py', TRANSFORMER_PLUGIN)
+        self.manifest_path = os.path.join(self.directory.name, 'manifest.json')
+
+    def write(self, relative_path, content):
+        path = os.path.join(self.plugins_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(content)
+
+    def registry(self):
+        return PluginRegistry(self.plugins_dir, package=self.package, manifest_path=self.manifest_path)
+
+    def test_concrete_plugin_classes_are_found_without_importing(self):
+        specs = self.registry().plugins()
+
+        self.assertEqual([(spec.name, spec.kind) for spec in specs],
+                         [('CsvLoader', 'loader'), ('Upper', 'transformer'), ('Lower', 'transformer')])
+        self.assertEqual(specs[0].entry_point, f"{self.package}.loaders.csv_loader_plugin.plugin:CsvLoader")
+        self.assertTrue(specs[0].config_path.endswith(os.path.join('csv_loader_plugin', 'config.yml')))
+        self.assertIsNone(specs[1].config_path)
+        self.assertFalse([name for name in sys.modules if name.startswith(self.package)])
+
+    def test_manifest_is_reused_until_a_plugin_changes(self):
+        self.registry().plugins()
+        with open(self.manifest_path) as file:
+            self.assertEqual(sum(len(entry['plugins']) for entry in json.load(file)['files'].values()), 3)
+
+        with patch.object(plugin_registry.ast, 'parse', wraps=plugin_registry.ast.parse) as parse:
+            self.registry().plugins()
+            parse.assert_not_called()
+
+            self.write('transformers/case_plugin/plugin.py', TRANSFORMER_PLUGIN + "\n\nclass Title(ColumnTransformer):\n    pass\n")
+            self.assertIn('Title', [spec.name for spec in self.registry().plugins()])
+            parse.assert_called_once()
+
+    def test_plugins_are_imported_on_creation(self):
+        registry = self.registry()
+
+        loader = registry.create('csv_loader', path='out.csv')
+
+        self.assertEqual((type(loader).__name__, loader.path), ('CsvLoader', 'out.csv'))
+        self.assertIn(f"{self.package}.loaders.csv_loader_plugin.plugin", sys.modules)
+        self.assertIs(registry.load('CsvLoader', kind='loader'), type(loader))
+
+    def test_directory_names_only_resolve_single_class_plugins(self):
+        registry = self.registry()
+
+        self.assertEqual(registry.get('csv_loader_plugin').name, 'CsvLoader')
+        with self.assertRaises(KeyError):
+            registry.get('case')
+        with self.assertRaises(KeyError):
+            registry.get('CsvLoader', kind='extractor')
+
+    def test_plugins_extending_another_plugin_are_found(self):
+        self.write('loaders/gzip_loader_plugin/plugin.py',
+                   f"from {self.package}.loaders.csv_loader_plugin.plugin import CsvLoader\n\n\n"
+                   "class GzipLoader(CsvLoader):\n    pass\n")
+
+        self.assertEqual(self.registry().get('gzip_loader').kind, 'loader')
+
+    def test_unwritable_manifest_only_disables_caching(self):
+        blocker = os.path.join(self.directory.name, 'not_a_directory')
+        with open(blocker, 'w'):
+            pass
+        registry = PluginRegistry(self.plugins_dir, package=self.package, manifest_path=os.path.join(blocker, 'manifest.json'))
+
+        self.assertEqual(len(registry.plugins()), 3)
+
+    def test_repository_plugins_are_registered(self):
+        registry = PluginRegistry(manifest_path=None)
+
+        self.assertEqual(registry.get('ssrs_extractor').name, 'SSRSExtractor')
+        self.assertEqual(registry.get('SQLAlchemyLoader').kind, 'loader')
+        # Extends SSRSExtractor, which it imports from the synchronous plugin
+        self.assertEqual(registry.get('async_ssrs_extractor').name, 'AsyncSSRSExtractor')
+        self.assertNotIn('ArrowTransformer', [spec.name for spec in registry.plugins('transformer')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# Run test with
+# python3 -m unittest tests.etl.utilities.test_profiling
+import os
+import pstats
+import tempfile
+import unittest
+import tracemalloc
+from unittest.mock import patch
+
+from etl.base.base_extractor import BaseExtractor
+from etl.base.base_loader import BaseLoader
+from etl.utilities.profiling import profiler, ENVIRONMENT_VARIABLE
+
+
+class FileExtractor(BaseExtractor):
+    connect = validate_connection = preview = set_query = transform_at_source = get_metadata = lambda self, *args: None
+    handle_error = retry = log = close = lambda self, *args: None
+
+    def extract(self, output_path=None, filename='report.csv'):
+        path = os.path.join(output_path, filename)
+        with open(path, 'w') as file:
+            file.write(','.join(str(number) for number in range(10000)))
+        return path
+
+    def extract_batches(self, batch_size=10000, **kwargs):
+        for start in range(0, 30, batch_size):
+            yield list(range(start, start + batch_size))
+
+
+class ListLoader(BaseLoader):
+    connect = validate = close = lambda self, *args: None
+
+    def load(self, data):
+        self.rows = [dict(value=value) for value in data]
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(profiler.reset)
+
+    def artifacts(self, directory=None):
+        return sorted(os.listdir(directory or self.directory.name))
+
+    def test_disabled_by_default(self):
+        with patch.dict(os.environ, {ENVIRONMENT_VARIABLE: ''}):
+            profiler.reset()
+            FileExtractor().extract(output_path=self.directory.name)
+
+        self.assertEqual(self.artifacts(), ['report.csv'])
+
+    def test_artifacts_are_written_next_to_the_output_file(self):
+        with patch.dict(os.environ, {ENVIRONMENT_VARIABLE: '1'}):
+            profiler.reset()
+            FileExtractor().extract(output_path=self.directory.name)
+
+        artifacts = self.artifacts()
+        self.assertEqual(len(artifacts), 3)
+        profile_path = os.path.join(self.directory.name, next(name for name in artifacts if name.endswith('.pstats')))
+        self.assertTrue(os.path.basename(profile_path).startswith('report.csv.FileExtractor.extract.'))
+        functions = [function for _, _, function in pstats.Stats(profile_path).stats]
+        self.assertIn('extract', functions)
+        with open(profile_path.replace('.pstats', '.allocations.txt')) as file:
+            report = file.read()
+        self.assertIn('Peak traced memory:', report)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_loads_and_batches_without_output_file_go_to_the_output_dir(self):
+        profiler.configure(modes=('cpu',), output_dir=self.directory.name)
+
+        ListLoader().load(range(100))
+        batches = list(FileExtractor().extract_batches(batch_size=10))
+
+        self.assertEqual(len(batches), 3)
+        artifacts = self.artifacts()
+        self.assertEqual(len(artifacts), 2)
+        self.assertTrue(artifacts[0].startswith('profile.FileExtractor.extract_batches.'))
+        self.assertTrue(artifacts[1].startswith('profile.ListLoader.load.'))
+
+    def test_memory_only_keeps_an_existing_trace_running(self):
+        profiler.configure(modes=('memory',), output_dir=self.directory.name)
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+
+        loader = ListLoader()
+        loader.load(range(1000))
+
+        self.assertTrue(tracemalloc.is_tracing())
+        [report] = self.artifacts()
+        with open(os.path.join(self.directory.name, report)) as file:
+            content = file.read()
+        self.assertIn('n/a (tracemalloc was already running)', content)
+        self.assertIn('test_profiling.py', content)
+
+    def test_concurrent_captures_share_the_trace_until_the_last_one_stops(self):
+        profiler.configure(modes=('memory',), output_dir=self.directory.name)
+        first = profiler.capture({'plugin': 'FileExtractor', 'method': 'extract'})
+        second = profiler.capture({'plugin': 'ListLoader', 'method': 'load'})
+
+        first.start()
+        second.start()
+        first.stop(None, None)
+        self.assertTrue(tracemalloc.is_tracing())
+        second.stop(None, None)
+
+        self.assertFalse(tracemalloc.is_tracing())
+        reports = {}
+        for name in self.artifacts():
+            with open(os.path.join(self.directory.name, name)) as file:
+                reports[name.split('.')[1]] = file.read()
+        self.assertRegex(reports['FileExtractor'], r'Peak traced memory: \d+ bytes')
+        self.assertIn('Peak traced memory: n/a', reports['ListLoader'])
+
+    def test_unsupported_mode(self):
+        with self.assertRaises(ValueError):
+            profiler.configure(modes=('gpu',))
+
+
+if __name__ == '__main__':
+    unittest.main()
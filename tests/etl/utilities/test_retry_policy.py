@@ -0,0 +1,50 @@
+# Run test with
+# python3 -m unittest tests.etl.utilities.test_retry_policy
+import unittest
+from unittest.mock import patch
+
+from etl.utilities.retry_policy import RetryPolicy
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_classification_by_exception_type_and_status(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable(ConnectionError()))
+        self.assertTrue(policy.is_retryable(HTTPError(503)))
+        self.assertFalse(policy.is_retryable(HTTPError(404)))
+        self.assertFalse(policy.is_retryable(ValueError()))
+
+    def test_backoff_grows_exponentially_up_to_the_cap(self):
+        policy = RetryPolicy(backoff_factor=2, max_backoff=10, jitter=False)
+        self.assertEqual([policy.backoff(attempt) for attempt in range(1, 5)], [2, 4, 8, 10])
+
+    @patch('etl.utilities.retry_policy.random.uniform', side_effect=lambda low, high: high / 2)
+    def test_jitter_stays_within_the_backoff_bound(self, mock_uniform):
+        policy = RetryPolicy(backoff_factor=4)
+        self.assertEqual(policy.backoff(2), 4)
+        mock_uniform.assert_called_with(0, 8)
+
+    def test_next_delay_stops_after_max_attempts(self):
+        policy = RetryPolicy(max_attempts=3, backoff_factor=1, jitter=False)
+        self.assertEqual(policy.next_delay(ConnectionError(), 1, 0), 1)
+        self.assertEqual(policy.next_delay(ConnectionError(), 2, 0), 2)
+        self.assertIsNone(policy.next_delay(ConnectionError(), 3, 0))
+
+    def test_next_delay_respects_time_budget(self):
+        policy = RetryPolicy(max_attempts=10, backoff_factor=5, jitter=False, time_budget=30)
+        self.assertEqual(policy.next_delay(ConnectionError(), 1, 20), 5)
+        self.assertIsNone(policy.next_delay(ConnectionError(), 1, 26))
+
+    def test_permanent_errors_are_not_retried(self):
+        self.assertIsNone(RetryPolicy().next_delay(HTTPError(400), 1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
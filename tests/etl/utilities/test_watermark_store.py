@@ -0,0 +1,40 @@
+# Run test with
+# python3 -m unittest tests.etl.utilities.test_watermark_store
+import os
+import tempfile
+import unittest
+
+from etl.utilities.watermark_store import WatermarkStore
+
+
+class TestWatermarkStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.db_path = os.path.join(self.directory.name, 'state', 'watermarks.db')
+        self.store = WatermarkStore(self.db_path)
+
+    def test_missing_watermark_is_none(self):
+        self.assertIsNone(self.store.get('SSRSExtractor', 'ed_events'))
+
+    def test_set_replaces_previous_value(self):
+        self.store.set('SSRSExtractor', 'ed_events', '09/27/2023 00:00:00')
+        self.store.set('SSRSExtractor', 'ed_events', '09/28/2023 00:00:00')
+        self.store.set('SQLExtractor', 'ed_events', 42)
+
+        self.assertEqual(self.store.get('SSRSExtractor', 'ed_events'), '09/28/2023 00:00:00')
+        self.assertEqual(self.store.get('SQLExtractor', 'ed_events'), 42)
+
+    def test_watermarks_persist_across_instances(self):
+        self.store.set('SSRSExtractor', 'ed_events', '09/27/2023 00:00:00')
+        self.assertEqual(WatermarkStore(self.db_path).get('SSRSExtractor', 'ed_events'), '09/27/2023 00:00:00')
+
+    def test_delete_forgets_watermark(self):
+        self.store.set('SSRSExtractor', 'ed_events', 1)
+        self.store.delete('SSRSExtractor', 'ed_events')
+        self.assertIsNone(self.store.get('SSRSExtractor', 'ed_events'))
+
+
+if __name__ == '__main__':
+    unittest.main()